@@ -1,63 +1,105 @@
 import os
-import json
 import sys
-from typing import List, Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional
 
-# Add the project root to the Python path
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+# Heavy state is built on first use by _engine(), so importing this module loads no data
+_engine_lock = threading.Lock()
+_engine_state = None
 
-from src.symptom_matcher import SymptomMatcher
+class _EngineState:
+    """The matcher behind the diagnosis engine, built once per process, and its recommendation memo."""
 
-# Initialize symptom matcher
-symptom_matcher = SymptomMatcher()
+    def __init__(self):
+        from src.registry import get_symptom_matcher
 
-# Load drug reference data
-DRUG_REFERENCE = {}
-DRUG_REFERENCE_FILE = os.path.join(project_root, 'data', 'drug_reference.json')
+        # Shared symptom matcher, the same instance the web app and voice assistant use
+        self.symptom_matcher = get_symptom_matcher()
 
-try:
-    with open(DRUG_REFERENCE_FILE, 'r', encoding='utf-8') as f:
-        DRUG_REFERENCE = json.load(f)
-except Exception as e:
-    print(f"Warning: Could not load drug reference data: {e}")
-    DRUG_REFERENCE = {}
+        # Formatted recommendations memoized per condition, for the data version they were built from
+        self.recommendations_version = None
+        self.medication_recommendations = {}
+
+def _engine() -> _EngineState:
+    """Return the engine state, building it on first use; concurrent first callers share one build."""
+    global _engine_state
+    state = _engine_state
+    if state is None:
+        with _engine_lock:
+            if _engine_state is None:
+                _engine_state = _EngineState()
+            state = _engine_state
+    return state
+
+def warmup(background: bool = False):
+    """
+    Build the matcher and drug reference lookups now instead of on the first diagnosis.
+
+    Servers can call this before accepting traffic, or with ``background`` set to
+    overlap the load with the rest of their startup.
+
+    Args:
+        background: Build in a daemon thread and return immediately
+
+    Returns:
+        The started thread if ``background`` is set, otherwise True if the engine is ready.
+    """
+    if background:
+        thread = threading.Thread(target=warmup, name='DiagnosisEngineWarmup', daemon=True)
+        thread.start()
+        return thread
+
+    try:
+        _engine()
+    except Exception as e:
+        print(f"Warning: Could not warm up the diagnosis engine: {e}")
+        return False
+    return True
+
+# Names that used to be module globals, now resolved lazily from the matcher's current data
+_LAZY_ATTRIBUTES = {
+    'symptom_matcher': lambda matcher: matcher,
+    'DRUG_REFERENCE': lambda matcher: matcher.prescription_data,
+    'DRUG_REFERENCE_FILE': lambda matcher: matcher.drug_reference_path,
+    'DRUG_REFERENCE_INDEX': lambda matcher: matcher.prescription_index,
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name](_engine().symptom_matcher)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_medication_recommendations(condition: str) -> Optional[Dict[str, Any]]:
     """
     Get medication recommendations for a specific condition.
     Returns a dictionary with medication information or None if no match found.
     """
-    if not condition or not DRUG_REFERENCE:
+    engine = _engine()
+    matcher = engine.symptom_matcher
+    # Read through the matcher on every call, so a reload is picked up
+    prescription_index = matcher.prescription_index
+    if not condition or not len(prescription_index):
         return None
         
-    # Try to find the best match in our drug reference
-    condition_lower = condition.lower()
-    
-    # First try exact match
-    for ref_condition, meds in DRUG_REFERENCE.items():
-        if condition_lower == ref_condition.lower():
-            return {
-                'condition': ref_condition,
-                'medications': meds.get('otc_medications', []),
-                'home_remedies': meds.get('home_remedies', []),
-                'medical_attention': meds.get('medical_attention', ''),
-                'emergency_note': meds.get('emergency_note', '')
-            }
-    
-    # Then try partial match
-    for ref_condition, meds in DRUG_REFERENCE.items():
-        if condition_lower in ref_condition.lower() or ref_condition.lower() in condition_lower:
-            return {
-                'condition': ref_condition,
-                'medications': meds.get('otc_medications', []),
-                'home_remedies': meds.get('home_remedies', []),
-                'medical_attention': meds.get('medical_attention', ''),
-                'emergency_note': meds.get('emergency_note', '')
-            }
+    # Exact match first, then the first condition overlapping the name in either direction
+    match = prescription_index.find(condition, match_contained=True)
+    if match is None:
+        return None
     
-    return None
+    ref_condition, meds = match
+    if engine.recommendations_version != matcher.data_version:
+        engine.medication_recommendations = {}
+        engine.recommendations_version = matcher.data_version
+    recommendations = engine.medication_recommendations
+    if ref_condition not in recommendations:
+        recommendations[ref_condition] = {
+            'condition': ref_condition,
+            'medications': meds.get('otc_medications', []),
+            'home_remedies': meds.get('home_remedies', []),
+            'medical_attention': meds.get('medical_attention', ''),
+            'emergency_note': meds.get('emergency_note', '')
+        }
+    return recommendations[ref_condition]
 
 def format_condition_name(condition: str) -> str:
     """Format condition name for display."""
@@ -84,7 +126,7 @@ def get_diagnosis(vitals: Dict, symptoms: str) -> Dict:
     
     # Get matching conditions from symptom matcher
     try:
-        matches = symptom_matcher.match_symptoms(user_symptoms, top_n=5)
+        matches = _engine().symptom_matcher.match_symptoms(user_symptoms, top_n=5)
         print(f"Found {len(matches)} potential matches")
         
         # Prepare response
@@ -134,6 +176,11 @@ def get_diagnosis(vitals: Dict, symptoms: str) -> Dict:
 
 # Example test
 if __name__ == "__main__":
+    # Running as a script, so make the project root importable
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
     test_vitals = {
         "temperature": {"object_temp": 38.4},
         "blood_pressure": {"systolic": 145, "diastolic": 95, "pulse": 105},
@@ -0,0 +1,6 @@
+"""
+Health Assistant - Benchmarks
+
+Seeded synthetic data generators and the benchmark runner for the symptom
+matching hot path. Run ``python benchmarks/run_benchmarks.py --help``.
+"""
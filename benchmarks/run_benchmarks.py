@@ -0,0 +1,258 @@
+"""
+Benchmark the symptom matching hot path on seeded synthetic databases.
+
+For every database size this measures loading, SymptomMatcher.match_symptoms,
+prescription enrichment, end-to-end HealthAssistant.diagnose and follow-up
+suggestions, reporting
+p50/p95/p99 latency, throughput and peak traced memory, plus the heap the
+loaded matcher retains and the memory each query allocates. Results are
+written as JSON so runs can be compared:
+
+    python benchmarks/run_benchmarks.py --sizes 300 10000 --output before.json
+    python benchmarks/run_benchmarks.py --sizes 300 10000 --compare before.json
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+# Go up one directory to the project root so the src package can be imported
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic_data import write_dataset, generate_queries
+from src.assistant import HealthAssistant
+from src.symptom_matcher import SymptomMatcher, SCORING_BACKENDS, SUGGESTION_CANDIDATES
+
+DEFAULT_SIZES = [300, 10000, 100000]
+
+# Timed stages reported for every size, in report order
+STAGES = ('load', 'match', 'enrichment', 'diagnose', 'suggest')
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Summarize per-operation latencies in seconds as milliseconds and operations per second."""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4) if ordered else 0.0,
+        'mean_ms': round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        'throughput_per_s': round(len(ordered) / total, 2) if total else 0.0,
+    }
+
+def time_each(operation: Callable[[Any], Any], items: List[Any]) -> List[float]:
+    """Run ``operation`` on every item and return the wall-clock time of each call."""
+    latencies = []
+    clock = time.perf_counter
+    for item in items:
+        start = clock()
+        operation(item)
+        latencies.append(clock() - start)
+    return latencies
+
+def peak_memory(operation: Callable[[], Any]) -> float:
+    """Run ``operation`` under tracemalloc and return its peak traced allocation in MiB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+def retained_memory(operation: Callable[[], Any]) -> float:
+    """Run ``operation`` under tracemalloc and return the MiB still allocated by its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = operation()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return round(current / (1024 * 1024), 2)
+
+def allocation_per_call(operation: Callable[[Any], Any], items: List[Any]) -> Dict[str, float]:
+    """Return the mean and largest peak KiB allocated by one call of ``operation`` over ``items``."""
+    gc.collect()
+    tracemalloc.start()
+    allocated = []
+    try:
+        for item in items:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            operation(item)
+            allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        'mean_kib': round(sum(allocated) / len(allocated) / 1024, 2) if allocated else 0.0,
+        'max_kib': round(max(allocated) / 1024, 2) if allocated else 0.0,
+    }
+
+def bench_size(n_diseases: int, n_queries: int, seed: int, backend: str, data_dir: str,
+               load_repeats: int, top_n: int, stage_metrics: bool = False) -> Dict[str, Any]:
+    """Run every benchmark against one synthetic database size."""
+    dataset = write_dataset(data_dir, n_diseases, seed)
+    queries = generate_queries(dataset['diseases'], dataset['vocabulary'], n_queries, seed)
+    symptom_lists = [query['symptoms'] for query in queries]
+
+    def load(collect_metrics=False):
+        return SymptomMatcher(dataset['csv_path'], scoring_backend=backend,
+                              drug_reference_path=dataset['drug_reference_path'],
+                              use_compiled_index=False, collect_metrics=collect_metrics)
+
+    # Loading; the first load also pays one-off imports, so it is not timed
+    load()
+    load_latencies = time_each(lambda _: load(), range(load_repeats))
+    results = {'load': summarize(load_latencies)}
+    results['load']['peak_memory_mib'] = peak_memory(load)
+    results['load']['retained_memory_mib'] = retained_memory(load)
+
+    # Matching, on a fresh matcher so the first queries pay for cold resolution memos
+    matcher = load()
+    match_latencies = time_each(lambda symptoms: matcher.match_symptoms(symptoms, top_n=top_n), symptom_lists)
+    results['match'] = summarize(match_latencies)
+    results['match']['by_kind'] = {
+        kind: summarize([latency for latency, query in zip(match_latencies, queries) if query['kind'] == kind])
+        for kind in sorted({query['kind'] for query in queries})
+    }
+    matcher = load()
+    results['match']['peak_memory_mib'] = peak_memory(
+        lambda: [matcher.match_symptoms(symptoms, top_n=top_n) for symptoms in symptom_lists])
+    matcher = load()
+    results['match']['allocated_per_query'] = allocation_per_call(
+        lambda symptoms: matcher.match_symptoms(symptoms, top_n=top_n), symptom_lists)
+
+    # Prescription enrichment for the diseases the queries returned, in traffic order
+    index = matcher._index
+    returned = [match['disease'] for symptoms in symptom_lists
+                for match in matcher.match_symptoms(symptoms, top_n=top_n)]
+    fresh_index = load()._index
+    results['enrichment'] = summarize(time_each(fresh_index.prescription_info, returned))
+    fresh_index = load()._index
+    results['enrichment']['peak_memory_mib'] = peak_memory(
+        lambda: [fresh_index.prescription_info(disease) for disease in returned])
+
+    # End to end through the assistant
+    assistant = HealthAssistant(load())
+    results['diagnose'] = summarize(time_each(lambda symptoms: assistant.diagnose(symptoms, top_n=top_n),
+                                              symptom_lists))
+
+    # Follow-up suggestions alone, over the candidates a diagnosis ranks for them (requires NumPy)
+    candidates = [matcher.match_symptoms(symptoms, top_n=SUGGESTION_CANDIDATES) for symptoms in symptom_lists]
+    results['suggest'] = summarize(time_each(
+        lambda item: matcher.suggest_symptoms(item[0], candidates=item[1]), list(zip(symptom_lists, candidates))))
+
+    # Per-stage breakdown, in a separate pass so the instrumentation never skews the latencies above
+    if stage_metrics:
+        assistant = HealthAssistant(load(collect_metrics=True))
+        for symptoms in symptom_lists:
+            assistant.diagnose(symptoms, top_n=top_n)
+        results['stages'] = assistant.matcher.metrics_stats()
+
+    results['database'] = {
+        'diseases': index.disease_count,
+        'known_symptoms': len(index.vocabulary),
+        'prescription_conditions': len(index.prescription_data),
+        'queries': len(queries),
+    }
+    return results
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the change in p50/p95/p99 latency against a previous run."""
+    print(f"\nComparison against baseline from {baseline['meta']['timestamp']}")
+    for size, stages in current['results'].items():
+        if size not in baseline['results']:
+            continue
+        for stage in STAGES:
+            before, after = baseline['results'][size].get(stage), stages.get(stage)
+            if not before or not after:
+                continue
+            changes = []
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+                ratio = after[metric] / before[metric] if before[metric] else float('inf')
+                changes.append(f"{metric[:-3]} {before[metric]:.3f} -> {after[metric]:.3f} ms ({ratio:.2f}x)")
+            print(f"  {size:>7} {stage:<10} " + ', '.join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the symptom matcher on synthetic databases')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Database sizes (number of diseases) to benchmark')
+    parser.add_argument('--queries', type=int, default=2000, help='Queries per database size')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the data and query generators')
+    parser.add_argument('--backend', choices=SCORING_BACKENDS, default='python', help='Scoring backend')
+    parser.add_argument('--top-n', type=int, default=5, help='Matches returned per query')
+    parser.add_argument('--load-repeats', type=int, default=3, help='Number of timed loads per size')
+    parser.add_argument('--stage-metrics', action='store_true',
+                        help='Also record a per-stage breakdown of match_symptoms')
+    parser.add_argument('--data-dir', default=None,
+                        help='Where to write the synthetic data (defaults to a temporary directory)')
+    parser.add_argument('--output', default=None, help='Where to write the JSON results')
+    parser.add_argument('--compare', default=None, help='Previous JSON results to compare against')
+    args = parser.parse_args()
+
+    # Per-query log lines would dominate the measurements
+    logging.basicConfig(level=logging.WARNING)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'backend': args.backend,
+            'top_n': args.top_n,
+        },
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        for n_diseases in args.sizes:
+            print(f"Benchmarking {n_diseases} diseases...", flush=True)
+            results = bench_size(n_diseases, args.queries, args.seed, args.backend, data_dir,
+                                 args.load_repeats, args.top_n, args.stage_metrics)
+            report['results'][str(n_diseases)] = results
+            for stage in STAGES:
+                stats = results[stage]
+                memory = f", peak {stats['peak_memory_mib']} MiB" if 'peak_memory_mib' in stats else ''
+                if 'retained_memory_mib' in stats:
+                    memory += f", retained {stats['retained_memory_mib']} MiB"
+                if 'allocated_per_query' in stats:
+                    memory += f", {stats['allocated_per_query']['mean_kib']} KiB/query"
+                print(f"  {stage:<10} p50 {stats['p50_ms']:.3f} ms, p95 {stats['p95_ms']:.3f} ms, "
+                      f"p99 {stats['p99_ms']:.3f} ms, {stats['throughput_per_s']:.1f}/s{memory}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote benchmark results to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# /benchmarks/synthetic_data.py
+
+import csv
+import itertools
+import json
+import os
+import random
+from typing import Any, Dict, List, Tuple
+
+# Building blocks for symptom phrases, loosely modelled on the real database
+BODY_PARTS = [
+    'head', 'chest', 'abdominal', 'back', 'neck', 'joint', 'muscle', 'throat', 'skin', 'eye',
+    'ear', 'stomach', 'lower back', 'knee', 'shoulder', 'pelvic', 'jaw', 'wrist', 'foot', 'gum',
+]
+SENSATIONS = [
+    'pain', 'ache', 'swelling', 'stiffness', 'burning', 'itching', 'numbness', 'tenderness',
+    'cramps', 'bleeding', 'rash', 'redness', 'weakness', 'discharge', 'tingling',
+]
+QUALIFIERS = ['sharp', 'dull', 'chronic', 'sudden', 'severe', 'mild', 'persistent', 'recurring', 'night']
+CONTEXTS = ['after eating', 'at night', 'on exertion', 'when lying down', 'in the morning', 'after exercise']
+GENERAL_SYMPTOMS = [
+    'fever', 'cough', 'fatigue', 'nausea', 'vomiting', 'dizziness', 'headache', 'chills',
+    'sweating', 'runny nose', 'sneezing', 'loss of appetite', 'weight loss', 'shortness of breath',
+    'blurred vision', 'dry mouth', 'frequent urination', 'dark urine', 'insomnia', 'anxiety',
+    'diarrhea', 'constipation', 'palpitations', 'sore throat', 'high blood pressure',
+]
+DISEASE_STEMS = [
+    'itis', 'osis', 'emia', 'algia', 'pathy', 'plasia', 'trophy', 'rrhea', 'spasm', 'syndrome',
+]
+DISEASE_ROOTS = [
+    'gastro', 'neuro', 'derma', 'cardio', 'hepat', 'nephr', 'arthr', 'pulmo', 'oto', 'rhino',
+    'myo', 'osteo', 'hemo', 'lympho', 'cysto', 'encephal', 'pharyng', 'laryng', 'col', 'thyro',
+]
+
+# Query mix: name -> (share of queries, min symptoms, max symptoms)
+QUERY_MIX = {
+    'broad': (0.35, 1, 3),
+    'narrow': (0.35, 4, 10),
+    'typo': (0.2, 1, 6),
+    'unknown': (0.1, 1, 4),
+}
+
+def build_vocabulary(rng: random.Random, size: int) -> List[str]:
+    """Return ``size`` distinct symptom phrases, general symptoms first."""
+    capacity = len(GENERAL_SYMPTOMS) + len(BODY_PARTS) * len(SENSATIONS) * (1 + len(QUALIFIERS) + len(CONTEXTS))
+    if size > capacity:
+        raise ValueError(f"Cannot build {size} distinct symptoms, at most {capacity} are available")
+
+    vocabulary = list(GENERAL_SYMPTOMS)
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        phrase = f"{rng.choice(BODY_PARTS)} {rng.choice(SENSATIONS)}"
+        form = rng.random()
+        if form < 0.4:
+            phrase = f"{rng.choice(QUALIFIERS)} {phrase}"
+        elif form < 0.6:
+            phrase = f"{phrase} {rng.choice(CONTEXTS)}"
+        if phrase not in seen:
+            seen.add(phrase)
+            vocabulary.append(phrase)
+    return vocabulary[:size]
+
+def disease_names(rng: random.Random, count: int) -> List[str]:
+    """Return ``count`` distinct disease names."""
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = f"{rng.choice(DISEASE_ROOTS)}{rng.choice(DISEASE_STEMS)}".capitalize()
+        if name in seen:
+            # Larger databases run out of plain names; number the variants like subtypes
+            name = f"{name} type {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+def _vocabulary_size(n_diseases: int) -> int:
+    # Vocabulary grows sublinearly with the database, as in real symptom ontologies
+    return min(3000, max(150, int(30 * n_diseases ** 0.5)))
+
+def _weighted_sample(rng: random.Random, vocabulary: List[str], cum_weights: List[float], k: int) -> List[str]:
+    """Draw ``k`` distinct symptoms, favouring the common ones."""
+    chosen = []
+    seen = set()
+    while len(chosen) < k:
+        symptom = rng.choices(vocabulary, cum_weights=cum_weights)[0]
+        if symptom not in seen:
+            seen.add(symptom)
+            chosen.append(symptom)
+    return chosen
+
+def generate_database(n_diseases: int, seed: int = 42) -> Tuple[List[Tuple[str, List[str]]], List[str]]:
+    """
+    Generate a synthetic disease-symptom database.
+
+    Symptom frequency follows a Zipf-like distribution, so general symptoms such as
+    fever appear across many diseases while most symptoms are specific to a few.
+
+    Args:
+        n_diseases: Number of diseases to generate
+        seed: Random seed; the same seed always produces the same database
+
+    Returns:
+        Tuple ``(diseases, vocabulary)`` where ``diseases`` lists ``(name, symptoms)`` pairs.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng, _vocabulary_size(n_diseases))
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(vocabulary))))
+
+    diseases = []
+    for name in disease_names(rng, n_diseases):
+        symptoms = _weighted_sample(rng, vocabulary, cum_weights, rng.randint(3, 12))
+        diseases.append((name, symptoms))
+    return diseases, vocabulary
+
+def write_disease_csv(diseases: List[Tuple[str, List[str]]], csv_path: str, seed: int = 42) -> None:
+    """Write diseases in the layout of the shipped CSV, with some of its formatting noise."""
+    rng = random.Random(seed)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Disease', 'Symptoms'])
+        for name, symptoms in diseases:
+            # Mixed case and stray whitespace exercise the loader's normalization
+            cells = [symptom.upper() if rng.random() < 0.05 else f" {symptom}  " if rng.random() < 0.05
+                     else symptom for symptom in symptoms]
+            writer.writerow([name, ', '.join(cells)])
+
+def generate_drug_reference(diseases: List[Tuple[str, List[str]]], seed: int = 42,
+                            coverage: float = 0.5) -> Dict[str, Any]:
+    """
+    Generate a drug reference covering a share of the diseases.
+
+    Most covered conditions use the disease name as is; some use a longer name
+    containing it, which exercises the substring fallback of the prescription lookup.
+    """
+    rng = random.Random(seed)
+    reference = {}
+    for name, _ in diseases:
+        if rng.random() >= coverage:
+            continue
+        condition = name if rng.random() < 0.8 else f"{name} (acute)"
+        reference[condition] = {
+            'otc_medications': [
+                {'name': f"Medication {rng.randint(1, 500)}", 'dosage': '500mg twice daily',
+                 'purpose': 'symptom relief'}
+                for _ in range(rng.randint(0, 3))
+            ],
+            'home_remedies': ['Rest', 'Stay hydrated'][:rng.randint(0, 2)],
+            'medical_attention': 'If symptoms last longer than a week' if rng.random() < 0.7 else '',
+            'emergency_note': '',
+        }
+    return reference
+
+def _typo(rng: random.Random, symptom: str) -> str:
+    """Introduce one keyboard-style typo into a symptom."""
+    if len(symptom) < 4:
+        return symptom
+    i = rng.randrange(1, len(symptom) - 1)
+    edit = rng.choice(('drop', 'swap', 'double'))
+    if edit == 'drop':
+        return symptom[:i] + symptom[i + 1:]
+    if edit == 'swap':
+        return symptom[:i - 1] + symptom[i] + symptom[i - 1] + symptom[i + 1:]
+    return symptom[:i] + symptom[i] + symptom[i:]
+
+def generate_queries(diseases: List[Tuple[str, List[str]]], vocabulary: List[str], count: int,
+                     seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate a realistic mix of user queries.
+
+    ``broad`` queries use one to three common symptoms, ``narrow`` queries take four to
+    ten symptoms mostly from one disease, ``typo`` queries misspell some symptoms and
+    ``unknown`` queries mix in symptoms missing from the database.
+
+    Returns:
+        List of ``{'kind': ..., 'symptoms': [...]}`` dictionaries.
+    """
+    rng = random.Random(seed)
+    kinds = list(QUERY_MIX)
+    shares = [QUERY_MIX[kind][0] for kind in kinds]
+    common = vocabulary[:max(10, len(vocabulary) // 20)]
+
+    queries = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights=shares)[0]
+        _, low, high = QUERY_MIX[kind]
+        k = rng.randint(low, high)
+
+        if kind == 'broad':
+            symptoms = rng.sample(common, min(k, len(common)))
+        else:
+            _, disease_symptoms = rng.choice(diseases)
+            symptoms = rng.sample(disease_symptoms, min(k, len(disease_symptoms)))
+            while len(symptoms) < k:
+                symptoms.append(rng.choice(vocabulary))
+
+        if kind == 'typo':
+            symptoms = [_typo(rng, symptom) if rng.random() < 0.6 else symptom for symptom in symptoms]
+        elif kind == 'unknown':
+            symptoms = [f"{rng.choice(QUALIFIERS)} {rng.choice(['tremor', 'hiccups', 'halitosis', 'vertigo'])}"
+                        if rng.random() < 0.5 else symptom for symptom in symptoms]
+
+        queries.append({'kind': kind, 'symptoms': symptoms})
+    return queries
+
+def write_dataset(output_dir: str, n_diseases: int, seed: int = 42) -> Dict[str, Any]:
+    """
+    Write a synthetic disease CSV and drug reference into ``output_dir``.
+
+    Returns:
+        Dictionary with the ``csv_path``, ``drug_reference_path``, ``diseases`` and ``vocabulary``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    diseases, vocabulary = generate_database(n_diseases, seed)
+
+    csv_path = os.path.join(output_dir, f"diseases_{n_diseases}.csv")
+    drug_reference_path = os.path.join(output_dir, f"drug_reference_{n_diseases}.json")
+    write_disease_csv(diseases, csv_path, seed)
+    with open(drug_reference_path, 'w', encoding='utf-8') as f:
+        json.dump(generate_drug_reference(diseases, seed), f)
+
+    return {
+        'csv_path': csv_path,
+        'drug_reference_path': drug_reference_path,
+        'diseases': diseases,
+        'vocabulary': vocabulary,
+    }
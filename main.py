@@ -85,8 +85,9 @@ class VoiceAssistant:
     def _initialize_health_assistant(self) -> HealthAssistant:
         """Initialize the health assistant component."""
         try:
-            # Initialize with default parameters
-            return HealthAssistant()
+            # Shared with every other assistant in the process, so the data is loaded once
+            from src.registry import get_health_assistant
+            return get_health_assistant()
         except Exception as e:
             logger.error(f"Failed to initialize health assistant: {e}")
             # Return a basic health assistant if initialization fails
@@ -347,10 +348,16 @@ class VoiceAssistant:
             if symptoms:
                 # If symptoms are detected, analyze them
                 try:
-                    from src.assistant import HealthAssistant
-                    assistant = HealthAssistant()
-                    matches = assistant.diagnose(symptoms, top_n=3)
+                    # The shared assistant keeps the data loaded between queries
+                    from src.registry import get_health_assistant
+                    assistant = get_health_assistant()
+                    # Rank once for both the analysis and the question about the symptom
+                    # that best separates the likely conditions
+                    matches, follow_up = assistant.diagnose_with_follow_up(symptoms, top_n=3)
                     response_text, voice_response = self._format_symptom_analysis(matches)
+                    if follow_up:
+                        response_text += f"\n\n{follow_up}"
+                        voice_response += f" {follow_up}"
                 except Exception as e:
                     logger.error(f"Error in symptom analysis: {e}", exc_info=True)
                     error_msg = "I encountered an error while analyzing your symptoms. Please try again or consult a healthcare professional."
@@ -0,0 +1,62 @@
+"""
+Compile the disease-symptom CSV and drug reference JSON into the binary index
+that SymptomMatcher loads at startup instead of parsing the source files.
+
+With --shared, also write the memory-mapped layout that several worker
+processes on one host can map instead of each holding its own copy.
+
+With --sqlite, also import the data into the on-disk SQLite store served by
+SymptomMatcher(storage_backend='sqlite') for databases too large to hold in memory.
+
+Rerun after editing either data file; a stale index is detected by its content
+hash and ignored until it is rebuilt.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Go up one directory to the project root so the src package can be imported
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.index_snapshot import build_index_snapshot, build_shared_index
+from src.sqlite_store import build_sqlite_store
+
+def main():
+    data_dir = os.path.join(project_root, 'data')
+    parser = argparse.ArgumentParser(description='Build the compiled symptom matcher index')
+    parser.add_argument('--csv', default=os.path.join(data_dir, 'disease_symptom_database_300.csv'),
+                        help='Path to the disease-symptom CSV file')
+    parser.add_argument('--drugs', default=os.path.join(data_dir, 'drug_reference.json'),
+                        help='Path to the drug reference JSON file')
+    parser.add_argument('--output', default=os.path.join(data_dir, 'matcher_index.bin'),
+                        help='Where to write the compiled index')
+    parser.add_argument('--shared', action='store_true',
+                        help='Also write the memory-mapped index shared across processes')
+    parser.add_argument('--shared-output', default=os.path.join(data_dir, 'matcher_index.mmap'),
+                        help='Where to write the shared index')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Also import the data into the on-disk SQLite store')
+    parser.add_argument('--sqlite-output', default=os.path.join(data_dir, 'matcher_store.sqlite'),
+                        help='Where to write the SQLite store')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    index = build_index_snapshot(args.csv, args.drugs, args.output)
+    print(f"Compiled {index.disease_count} diseases and {len(index.prescription_data)} "
+          f"prescription conditions into: {args.output}")
+
+    if args.shared:
+        build_shared_index(args.csv, args.drugs, args.shared_output)
+        print(f"Wrote shared memory-mapped index to: {args.shared_output}")
+
+    if args.sqlite:
+        counts = build_sqlite_store(args.csv, args.drugs, args.sqlite_output)
+        print(f"Imported {counts['diseases']} diseases and {counts['symptoms']} symptoms "
+              f"into SQLite store: {args.sqlite_output}")
+
+if __name__ == "__main__":
+    main()
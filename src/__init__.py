@@ -7,11 +7,15 @@ including symptom matching, data loading, and assistant logic.
 
 # Import key components to make them available at the package level
 from .assistant import HealthAssistant
-from .data_loader import load_disease_symptom_data
+from .data_loader import iter_disease_symptom_records, load_disease_symptom_data
+from .registry import get_health_assistant, get_symptom_matcher
 from .symptom_matcher import SymptomMatcher
 
 __all__ = [
     'HealthAssistant',
+    'iter_disease_symptom_records',
+    'get_health_assistant',
+    'get_symptom_matcher',
     'load_disease_symptom_data',
     'SymptomMatcher'
 ]
\ No newline at end of file
@@ -1,30 +1,130 @@
 # /src/assistant.py
 
-from src.symptom_matcher import SymptomMatcher
+from src.registry import get_symptom_matcher
+from src.symptom_matcher import SUGGESTION_CANDIDATES
 import os
+import time
 
 class HealthAssistant:
     def __init__(self, matcher=None):
-        self.matcher = matcher or SymptomMatcher()
+        # Without a matcher of its own, share the process-wide one instead of loading the data again
+        self.matcher = matcher or get_symptom_matcher()
 
-    def diagnose(self, user_symptoms, top_n=5):
+    def diagnose(self, user_symptoms, top_n=5, budget_ms=None, deadline=None):
         """
         Returns top disease matches based on symptoms with prescription information.
         
         Args:
             user_symptoms (list): List of symptoms entered by the user
             top_n (int): Number of top matches to return
+            budget_ms (float): Milliseconds matching may take before the best matches found so far
+                are returned; see SymptomMatcher.match_symptoms
+            deadline (float): Absolute time.perf_counter() value to stop matching at
             
         Returns:
-            list: List of dictionaries containing disease information, match scores, and prescriptions
+            list: List of dictionaries containing disease information, match scores, and prescriptions.
+            Results cut short by the time budget carry 'partial': True.
         """
         if not user_symptoms or not isinstance(user_symptoms, list):
             raise ValueError("Expected a non-empty list of symptoms.")
 
         # Get matches from symptom matcher
-        matches = self.matcher.match_symptoms(user_symptoms, top_n=top_n)
+        if budget_ms is None and deadline is None:
+            matches = self.matcher.match_symptoms(user_symptoms, top_n=top_n)
+        else:
+            matches = self.matcher.match_symptoms(user_symptoms, top_n=top_n, budget_ms=budget_ms, deadline=deadline)
+        return self._format_timed(matches)
+
+    def diagnose_with_follow_up(self, user_symptoms, top_n=5, exclude=()):
+        """
+        Diagnose symptoms and suggest a follow-up question from a single ranking.
+        
+        The matches are ranked once, deep enough for the follow-up suggestion, and the
+        returned results are the first top_n of that same ranking, so the result is the
+        same as calling diagnose and then suggest_question without ranking twice.
+        
+        Args:
+            user_symptoms (list): List of symptoms entered by the user
+            top_n (int): Number of top matches to return
+            exclude (list): Symptoms already asked about, such as ones the user denied
+            
+        Returns:
+            tuple: (results, follow_up) where results is what diagnose would return and
+            follow_up is what suggest_question would return, or None if there are no results
+        """
+        if not user_symptoms or not isinstance(user_symptoms, list):
+            raise ValueError("Expected a non-empty list of symptoms.")
+        
+        matches = self.matcher.match_symptoms(user_symptoms, top_n=max(top_n, SUGGESTION_CANDIDATES))
+        results = self._format_timed(matches[:top_n])
+        if not results:
+            return results, None
+        return results, self.suggest_question(user_symptoms, exclude=exclude, candidates=matches)
+
+    def _format_timed(self, matches):
+        """Format matches, charging the time to the matcher's metrics when it collects them."""
+        metrics = getattr(self.matcher, 'metrics', None)
+        if metrics is None:
+            return self._format_matches(matches)
+        
+        # Charge result formatting to the same metrics as the matcher stages
+        start = time.perf_counter()
+        formatted_results = self._format_matches(matches)
+        metrics.add_stage('format', time.perf_counter() - start)
+        return formatted_results
+
+    def _validate_batch(self, symptom_lists):
+        """Check every query of a batch up front so a bad entry fails before any work is done."""
+        symptom_lists = list(symptom_lists)
+        for index, user_symptoms in enumerate(symptom_lists):
+            if not user_symptoms or not isinstance(user_symptoms, list):
+                raise ValueError(f"Expected a non-empty list of symptoms at index {index}.")
+        return symptom_lists
+
+    def iter_diagnose_many(self, symptom_lists, top_n=5, processes=None):
+        """
+        Diagnose a batch of symptom lists, yielding each result as soon as it is ready.
+        
+        Args:
+            symptom_lists (list): List of symptom lists, each as accepted by diagnose
+            top_n (int): Number of top matches to return per query
+            processes (int): Number of worker processes to fan out to. None or 1 runs in this process.
+            
+        Yields:
+            tuple: (index, results) where index is the position of the query in symptom_lists
+            and results is what diagnose would return for it
+        """
+        symptom_lists = self._validate_batch(symptom_lists)
+        
+        # Duplicate queries share one matches list, so format each list only once
+        formatted = {}
+        for index, matches in self.matcher.iter_match_symptoms_many(symptom_lists, top_n=top_n,
+                                                                    processes=processes):
+            if id(matches) not in formatted:
+                formatted[id(matches)] = (matches, self._format_matches(matches))
+            yield index, formatted[id(matches)][1]
+
+    def diagnose_many(self, symptom_lists, top_n=5, processes=None):
+        """
+        Diagnose a batch of symptom lists.
         
-        # Format the results for the frontend
+        Args:
+            symptom_lists (list): List of symptom lists, each as accepted by diagnose
+            top_n (int): Number of top matches to return per query
+            processes (int): Number of worker processes to fan out to. None or 1 runs in this process.
+            
+        Returns:
+            list: One diagnose result per query, in the same order as symptom_lists
+        """
+        symptom_lists = list(symptom_lists)
+        results = [None] * len(symptom_lists)
+        for index, formatted_results in self.iter_diagnose_many(symptom_lists, top_n=top_n,
+                                                                processes=processes):
+            results[index] = formatted_results
+        return results
+
+    def _format_matches(self, matches):
+        """Format symptom matcher results for the frontend."""
         formatted_results = []
         for match in matches:
             result = {
@@ -39,10 +139,33 @@ class HealthAssistant:
             if 'prescription' in match and 'recommendations' in match['prescription']:
                 result['recommendations'] = match['prescription']['recommendations']
             
+            if match.get('partial'):
+                result['partial'] = True
+            
             formatted_results.append(result)
         
         return formatted_results
 
+    def suggest_question(self, user_symptoms, exclude=(), candidates=None):
+        """
+        Suggest a follow-up question about the symptom that best narrows down the current matches.
+
+        Args:
+            user_symptoms (list): Symptoms reported so far
+            exclude (list): Symptoms already asked about, such as ones the user denied
+            candidates (list): Matches of a ranking already made, as returned by match_symptoms;
+                ranked again from user_symptoms if omitted
+
+        Returns:
+            str: A question such as "Do you also have rash?", or None if no symptom would help
+        """
+        if not user_symptoms or not isinstance(user_symptoms, list):
+            return None
+        suggestions = self.matcher.suggest_symptoms(user_symptoms, limit=1, candidates=candidates, exclude=exclude)
+        if not suggestions:
+            return None
+        return f"Do you also have {suggestions[0][0]}?"
+
     def explain(self, match_result):
         """
         Optional method to provide an explanation for a given match.
@@ -1,11 +1,123 @@
 # /src/data_loader.py
 
-import pandas as pd
 import os
+import csv
 import logging
+import sys
 
 logger = logging.getLogger(__name__)
 
+# Field values pandas.read_csv reads as missing by default; such rows are dropped the same way here
+MISSING_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+})
+
+def clean_symptom_list(symptoms_str):
+    """
+    Split a comma-separated symptom field into normalized symptoms.
+    
+    Args:
+        symptoms_str (str): Raw symptoms field; anything else yields no symptoms
+        
+    Returns:
+        list: Lowercased, whitespace-collapsed symptoms longer than two characters, interned so
+        every row listing a symptom shares one string object
+    """
+    if not isinstance(symptoms_str, str):
+        return []
+    
+    # Split by comma and clean each symptom
+    symptoms = []
+    for symptom in symptoms_str.split(','):
+        symptom = symptom.strip().lower()
+        # Remove any extra spaces and special characters
+        symptom = ' '.join(symptom.split())
+        if symptom and len(symptom) > 2:  # Only include non-trivial symptoms
+            symptoms.append(sys.intern(symptom))
+    return symptoms
+
+def _find_columns(columns):
+    """
+    Return the positions of the disease and symptoms columns among cleaned column names.
+    
+    Exact 'disease' and 'symptoms' headers win; otherwise the first columns containing
+    'disease' and 'symptom' are used.
+    """
+    if 'disease' in columns and 'symptoms' in columns:
+        return columns.index('disease'), columns.index('symptoms')
+    
+    # Try to find the columns with different cases or extra spaces
+    disease_cols = [i for i, col in enumerate(columns) if 'disease' in col]
+    symptom_cols = [i for i, col in enumerate(columns) if 'symptom' in col]
+    if disease_cols and symptom_cols:
+        return disease_cols[0], symptom_cols[0]
+    
+    error_msg = "CSV must contain 'Disease' and 'Symptoms' columns."
+    logger.error(f"{error_msg} Found columns: {columns}")
+    raise ValueError(error_msg)
+
+def iter_disease_symptom_records(csv_path):
+    """
+    Stream cleaned ``(disease, symptoms)`` records from the disease-symptom CSV.
+    
+    Reads the file in one pass with the csv module, without pandas, and yields
+    exactly the rows load_disease_symptom_data keeps, with the same cleaning:
+    blank lines and rows with too many fields are skipped, missing fields and
+    pandas' default missing-value markers drop the row, and symptoms are
+    cleaned with clean_symptom_list.
+    
+    The file is opened and its header checked on the first ``next()``, so a
+    missing file or column raises there rather than when the generator is created.
+    
+    Args:
+        csv_path (str): Path to the CSV file containing disease and symptoms data
+        
+    Yields:
+        tuple: ``(disease, symptoms)`` with the disease name as written and a list of cleaned symptoms
+    """
+    logger.info(f"Streaming disease-symptom data from: {csv_path}")
+    
+    if not os.path.exists(csv_path):
+        error_msg = f"CSV file not found at: {csv_path}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+    
+    # utf-8-sig drops a leading byte order mark, as pandas does
+    with open(csv_path, encoding='utf-8-sig', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next((row for row in reader if row), None)
+        if header is None:
+            error_msg = f"CSV file is empty: {csv_path}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        columns = [str(col).strip().lower() for col in header]
+        disease_col, symptoms_col = _find_columns(columns)
+        
+        kept = skipped = total_symptoms = 0
+        for row in reader:
+            if not row:
+                continue
+            if len(row) > len(columns):
+                logger.warning(f"Skipping line {reader.line_num}: expected {len(columns)} fields, saw {len(row)}")
+                skipped += 1
+                continue
+            # Short rows are missing their trailing fields
+            disease = row[disease_col] if disease_col < len(row) else ''
+            symptoms_str = row[symptoms_col] if symptoms_col < len(row) else ''
+            if disease in MISSING_VALUES or symptoms_str in MISSING_VALUES:
+                continue
+            symptoms = clean_symptom_list(symptoms_str)
+            if not symptoms:
+                continue
+            kept += 1
+            total_symptoms += len(symptoms)
+            yield disease, symptoms
+    
+    logger.info(f"Streamed {kept} diseases with {total_symptoms} total symptom occurrences"
+                + (f", skipped {skipped} malformed lines" if skipped else ""))
+
 def load_disease_symptom_data(csv_path):
     """
     Loads disease-symptom data from a CSV file and parses symptoms into lists.
@@ -16,6 +128,9 @@ def load_disease_symptom_data(csv_path):
     Returns:
         pd.DataFrame: DataFrame with 'disease' and 'symptoms' columns
     """
+    # Imported here so processes serving from a compiled index never load pandas
+    import pandas as pd
+    
     logger.info(f"Loading disease-symptom data from: {csv_path}")
     
     if not os.path.exists(csv_path):
@@ -46,21 +161,6 @@ def load_disease_symptom_data(csv_path):
                 logger.error(f"{error_msg} Found columns: {list(df.columns)}")
                 raise ValueError(error_msg)
         
-        # Clean and process symptoms with better normalization
-        def clean_symptom_list(symptoms_str):
-            if not isinstance(symptoms_str, str):
-                return []
-            
-            # Split by comma and clean each symptom
-            symptoms = []
-            for symptom in symptoms_str.split(','):
-                symptom = symptom.strip().lower()
-                # Remove any extra spaces and special characters
-                symptom = ' '.join(symptom.split())
-                if symptom and len(symptom) > 2:  # Only include non-trivial symptoms
-                    symptoms.append(symptom)
-            return symptoms
-        
         # Apply cleaning to symptoms
         df['symptoms'] = df['symptoms'].apply(clean_symptom_list)
         
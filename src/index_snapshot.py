@@ -0,0 +1,134 @@
+# /src/index_snapshot.py
+
+import hashlib
+import logging
+import os
+import pickle
+from typing import Optional
+
+from src.matcher_index import MatcherIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout of MatcherIndex changes so stale artifacts are ignored
+INDEX_FORMAT_VERSION = 2
+
+# Every artifact starts with this marker, the format version and the source hash
+INDEX_MAGIC = b'SMIDX'
+
+def source_hash(csv_path: str, drug_reference_path: str) -> str:
+    """
+    Return the content hash identifying one version of the matcher's source data.
+
+    A missing drug reference hashes differently from an empty one, matching how
+    the matcher treats it.
+    """
+    digest = hashlib.sha256(f"format:{INDEX_FORMAT_VERSION}".encode())
+    for path in (csv_path, drug_reference_path):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            digest.update(b'<end>')
+        else:
+            digest.update(b'<missing>')
+    return digest.hexdigest()
+
+def write_index_snapshot(index: MatcherIndex, output_path: str, content_hash: str) -> None:
+    """
+    Write a compiled matcher snapshot to disk.
+
+    The file is written next to its destination and renamed into place, so readers
+    never see a partially written artifact.
+    """
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(INDEX_FORMAT_VERSION.to_bytes(2, 'big'))
+        f.write(content_hash.encode('ascii'))
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, output_path)
+    logger.info(f"Wrote compiled matcher index to: {output_path}")
+
+def load_index_snapshot(index_path: str, content_hash: str) -> Optional[MatcherIndex]:
+    """
+    Load a compiled matcher snapshot if it was built from the current source data.
+
+    Artifacts are produced by ``scripts/build_matcher_index.py`` and are trusted local
+    files; only load artifacts your own deployment wrote.
+
+    Args:
+        index_path: Path of the compiled artifact
+        content_hash: ``source_hash`` of the current CSV and drug reference
+
+    Returns:
+        The loaded MatcherIndex, or None if the artifact is missing, from another
+        format version, or built from different source data.
+    """
+    if not os.path.exists(index_path):
+        return None
+
+    try:
+        with open(index_path, 'rb') as f:
+            magic = f.read(len(INDEX_MAGIC))
+            format_version = int.from_bytes(f.read(2), 'big')
+            stored_hash = f.read(len(content_hash)).decode('ascii', errors='replace')
+
+            if magic != INDEX_MAGIC or format_version != INDEX_FORMAT_VERSION:
+                logger.warning(f"Ignoring compiled matcher index with unsupported format: {index_path}")
+                return None
+            if stored_hash != content_hash:
+                logger.info(f"Compiled matcher index is out of date, ignoring: {index_path}")
+                return None
+
+            index = pickle.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load compiled matcher index: {e}", exc_info=True)
+        return None
+
+    logger.info(f"Loaded compiled matcher index from: {index_path}")
+    return index
+
+def _build_from_sources(csv_path: str, drug_reference_path: str) -> MatcherIndex:
+    """Build a MatcherIndex straight from the source files, ignoring any compiled artifact."""
+    from src.symptom_matcher import SymptomMatcher
+
+    matcher = SymptomMatcher(csv_path, drug_reference_path=drug_reference_path, use_compiled_index=False)
+    return matcher._index
+
+def build_shared_index(csv_path: str, drug_reference_path: str, output_path: str) -> MatcherIndex:
+    """
+    Compile the disease CSV into the memory-mapped layout shared across processes.
+
+    Args:
+        csv_path: Path to the disease-symptom CSV file
+        drug_reference_path: Path to the drug reference JSON file
+        output_path: Where to write the shared index file
+
+    Returns:
+        The MatcherIndex the file was written from.
+    """
+    from src.shared_index import write_shared_index
+
+    content_hash = source_hash(csv_path, drug_reference_path)
+    index = _build_from_sources(csv_path, drug_reference_path)
+    write_shared_index(index, output_path, content_hash)
+    return index
+
+def build_index_snapshot(csv_path: str, drug_reference_path: str, output_path: str) -> MatcherIndex:
+    """
+    Compile the disease CSV and drug reference into a matcher snapshot artifact.
+
+    Args:
+        csv_path: Path to the disease-symptom CSV file
+        drug_reference_path: Path to the drug reference JSON file
+        output_path: Where to write the artifact
+
+    Returns:
+        The compiled MatcherIndex.
+    """
+    # Hash first, so data edited during the build produces an artifact that is never used
+    content_hash = source_hash(csv_path, drug_reference_path)
+    index = _build_from_sources(csv_path, drug_reference_path)
+    write_index_snapshot(index, output_path, content_hash)
+    return index
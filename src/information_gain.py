@@ -0,0 +1,47 @@
+# /src/information_gain.py
+
+from typing import Sequence
+
+import numpy as np
+
+def symptom_information_gain(disease_indptr: np.ndarray, disease_symptoms: np.ndarray, vocabulary_size: int,
+                             positions: Sequence[int], weights: Sequence[float]) -> np.ndarray:
+    """
+    Expected information gain, in bits, of asking about each known symptom.
+
+    The candidate diseases are taken as a probability distribution proportional
+    to ``weights``, and a patient is assumed to answer "yes" exactly when their
+    disease lists the symptom. The expected drop in entropy of the distribution
+    then reduces to the binary entropy of the probability of a "yes", which is
+    the weighted share of candidates listing the symptom. Those shares for the
+    whole vocabulary are one weighted ``bincount`` over the disease-symptom
+    incidence matrix in CSR layout.
+
+    Args:
+        disease_indptr: CSR row pointers of the incidence matrix, one row per disease
+        disease_symptoms: CSR column indices, the symptom IDs of every disease
+        vocabulary_size: Number of known symptoms
+        positions: Database positions of the candidate diseases
+        weights: Non-negative weight of each candidate, such as its match score
+
+    Returns:
+        Array of length ``vocabulary_size`` with the gain of every symptom; symptoms
+        every candidate or no candidate lists gain nothing.
+    """
+    probabilities = np.zeros(len(disease_indptr) - 1)
+    np.add.at(probabilities, np.asarray(positions, dtype=np.int64), np.asarray(weights, dtype=np.float64))
+    total = probabilities.sum()
+    if total <= 0:
+        return np.zeros(vocabulary_size)
+    probabilities /= total
+
+    # Probability of a "yes" for every symptom: the candidate mass of the diseases listing it
+    yes = np.bincount(disease_symptoms, weights=np.repeat(probabilities, np.diff(disease_indptr)),
+                      minlength=vocabulary_size)
+    yes = np.clip(yes, 0.0, 1.0)
+    no = 1.0 - yes
+
+    gain = np.zeros(vocabulary_size)
+    mask = (yes > 0) & (no > 0)
+    gain[mask] = -(yes[mask] * np.log2(yes[mask]) + no[mask] * np.log2(no[mask]))
+    return gain
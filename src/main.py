@@ -6,20 +6,23 @@ def main():
     print("=== Offline AI Health Assistant ===\n")
     print("Enter your symptoms one by one. Type 'done' when finished.\n")
 
-    user_symptoms = []
+    assistant = HealthAssistant()
+    # Each symptom only updates the diseases it touches, so the running top match is cheap to show
+    session = assistant.matcher.start_session()
     while True:
         symptom = input("Enter a symptom: ").strip()
         if symptom.lower() == "done":
             break
         if symptom:
-            user_symptoms.append(symptom)
+            matches = session.add(symptom)
+            if matches:
+                print(f"   Leading match so far: {matches[0]['disease']} (Score: {matches[0]['match_score']})")
 
-    if not user_symptoms:
+    if not session.symptoms:
         print("\n⚠️  No symptoms entered. Exiting.")
         return
 
-    assistant = HealthAssistant()
-    results = assistant.diagnose(user_symptoms)
+    results = session.matches()
 
     print("\nTop Matches:")
     for idx, result in enumerate(results, 1):
@@ -0,0 +1,121 @@
+# /src/match_metrics.py
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Stages of a match_symptoms call, in the order they run
+MATCH_STAGES = ('normalize', 'cache', 'resolve', 'scan', 'scoring', 'sort', 'prescriptions', 'logging', 'format')
+
+class QueryTimings:
+    """
+    Stage durations and counters collected while serving one query.
+
+    ``mark(stage)`` charges the time since the previous mark to ``stage``, so a
+    query is timed with one clock read per stage.
+    """
+
+    __slots__ = ('stages', 'counts', '_last')
+
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Charge the time elapsed since the previous mark to ``stage``."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add ``amount`` to the counter ``name``."""
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+class _NullTimings:
+    """Stand-in for QueryTimings when metrics are disabled; every call is a no-op."""
+
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+NULL_TIMINGS = _NullTimings()
+
+class MatchMetrics:
+    """
+    Thread-safe aggregate of per-stage durations and counters across queries.
+
+    Queries record into their own QueryTimings and merge it here once they
+    finish, so the lock is taken once per query rather than once per stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.stage_totals = {}
+        self.stage_max = {}
+        self.counts = {}
+        self.last_query = None
+
+    def start(self) -> QueryTimings:
+        """Return a fresh QueryTimings for one query."""
+        return QueryTimings()
+
+    def record(self, timings: QueryTimings) -> None:
+        """Merge one finished query into the totals."""
+        with self._lock:
+            self.queries += 1
+            for stage, seconds in timings.stages.items():
+                self.stage_totals[stage] = self.stage_totals.get(stage, 0.0) + seconds
+                self.stage_max[stage] = max(self.stage_max.get(stage, 0.0), seconds)
+            for name, amount in timings.counts.items():
+                self.counts[name] = self.counts.get(name, 0) + amount
+            self.last_query = {
+                'stages_ms': {stage: round(seconds * 1000, 4) for stage, seconds in timings.stages.items()},
+                'counts': dict(timings.counts),
+            }
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """Add time spent in ``stage`` outside a match_symptoms call, such as result formatting."""
+        with self._lock:
+            self.stage_totals[stage] = self.stage_totals.get(stage, 0.0) + seconds
+            self.stage_max[stage] = max(self.stage_max.get(stage, 0.0), seconds)
+            if self.last_query is not None:
+                stages = self.last_query['stages_ms']
+                stages[stage] = round(stages.get(stage, 0.0) + seconds * 1000, 4)
+
+    def reset(self) -> None:
+        """Zero every total and counter."""
+        with self._lock:
+            self.queries = 0
+            self.stage_totals.clear()
+            self.stage_max.clear()
+            self.counts.clear()
+            self.last_query = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the totals, with stage times in milliseconds."""
+        with self._lock:
+            ordered = [stage for stage in MATCH_STAGES if stage in self.stage_totals]
+            ordered += sorted(stage for stage in self.stage_totals if stage not in MATCH_STAGES)
+            return {
+                'queries': self.queries,
+                'stages': {
+                    stage: {
+                        'total_ms': round(self.stage_totals[stage] * 1000, 4),
+                        'mean_ms': round(self.stage_totals[stage] * 1000 / self.queries, 4) if self.queries else 0.0,
+                        'max_ms': round(self.stage_max[stage] * 1000, 4),
+                    }
+                    for stage in ordered
+                },
+                'counts': dict(self.counts),
+                'last_query': self.last_query,
+            }
+
+def timings_for(metrics: Optional[MatchMetrics]):
+    """Return a QueryTimings for ``metrics``, or the shared no-op stand-in if metrics are disabled."""
+    return metrics.start() if metrics is not None else NULL_TIMINGS
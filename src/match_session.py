@@ -0,0 +1,267 @@
+# /src/match_session.py
+
+import heapq
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rank by scanning every disease instead of the sorted terms once more than 1 in this many changed
+DIRTY_SCAN_FRACTION = 4
+
+class MatchSession:
+    """
+    Running match of a symptom list that grows and shrinks one symptom at a time.
+
+    For every disease that lists a resolved symptom, the session keeps the best
+    known symptom each user symptom matches and the partial sums the score
+    formula needs. Adding or removing a symptom only revisits the diseases
+    listing one of its resolved known symptoms; the current ranking is then
+    derived from the partial sums, without rescanning postings or re-comparing
+    known symptoms. Results are the same as ``match_symptoms`` on the current
+    symptoms, in the order they were added.
+
+    A session keeps the data snapshot it started with, so a reload of the
+    matcher never changes the scores of a conversation halfway through.
+    """
+
+    def __init__(self, matcher, top_n: int = 5):
+        """
+        Args:
+            matcher: SymptomMatcher to resolve symptoms and build result records with
+            top_n: Number of matches ``add``, ``remove`` and ``matches`` return by default
+        """
+        self.matcher = matcher
+        self.top_n = top_n
+        self.index = matcher._index
+
+        # Normalized user symptoms in the order they were added; match_symptoms sums in input order too
+        self._order = []
+        # Normalized user symptom -> resolved ((known, known_id, similarity), ...)
+        self._resolved = {}
+        # Disease position -> {user symptom: (known_id, similarity)} of the best known symptom it lists
+        self._best = {}
+        # Disease position -> (a, b); its score is min(1, a + b / len(self._order)) up to float rounding
+        self._partials = {}
+        # (-a, position) and (-b, position) of every matching disease, sorted, so the ranking can
+        # visit diseases best term first and stop early; _dirty holds positions changed since the sort
+        self._by_ratio = []
+        self._by_coverage = []
+        self._dirty = set()
+        # (top_n, results) of the last ranking, until a symptom is added or removed
+        self._ranking = None
+
+    @property
+    def symptoms(self) -> List[str]:
+        """Normalized symptoms currently in the session, in the order they were added."""
+        return list(self._order)
+
+    @property
+    def match_count(self) -> int:
+        """Number of diseases matching at least one current symptom."""
+        return len(self._partials)
+
+    @staticmethod
+    def _normalize(symptom) -> Optional[str]:
+        if not symptom or not isinstance(symptom, str):
+            return None
+        return symptom.strip().lower() or None
+
+    def add(self, symptom: str) -> List[Dict[str, Any]]:
+        """
+        Add a symptom and return the updated top matches.
+
+        Adding a symptom already in the session changes nothing.
+        """
+        symptom = self._normalize(symptom)
+        if symptom is None or symptom in self._resolved:
+            return self.matches()
+
+        index = self.index
+        symptom_ids = index.symptom_ids
+        # Best match first, ties alphabetical, which is also symptom ID order
+        resolved = tuple((known, symptom_ids[known], score) for known, score in index.resolve_symptom(symptom))
+        self._resolved[symptom] = resolved
+        self._order.append(symptom)
+
+        touched = set()
+        for known, known_id, score in resolved:
+            for position in index.diseases_with(known):
+                best = self._best.setdefault(position, {})
+                # The first hit is the best known symptom this disease lists for the new symptom
+                if symptom not in best:
+                    best[symptom] = (known_id, score)
+                    touched.add(position)
+        self._update(touched)
+
+        logger.debug(f"Added '{symptom}' to session, {len(touched)} diseases updated")
+        return self.matches()
+
+    def remove(self, symptom: str) -> List[Dict[str, Any]]:
+        """Remove a symptom and return the updated top matches. Unknown symptoms are ignored."""
+        symptom = self._normalize(symptom)
+        if symptom is None or symptom not in self._resolved:
+            return self.matches()
+
+        index = self.index
+        self._order.remove(symptom)
+        touched = set()
+        for known, _, _ in self._resolved.pop(symptom):
+            for position in index.diseases_with(known):
+                best = self._best.get(position)
+                if best is not None and best.pop(symptom, None) is not None:
+                    touched.add(position)
+        self._update(touched)
+
+        logger.debug(f"Removed '{symptom}' from session, {len(touched)} diseases updated")
+        return self.matches()
+
+    def clear(self) -> None:
+        """Remove every symptom."""
+        self._order.clear()
+        self._resolved.clear()
+        self._best.clear()
+        self._partials.clear()
+        self._by_ratio.clear()
+        self._by_coverage.clear()
+        self._dirty.clear()
+        self._ranking = None
+
+    def _update(self, positions) -> None:
+        """Recompute the matches and score terms of the given diseases from their best matches."""
+        index = self.index
+        word_counts = index.word_counts
+        self._dirty.update(positions)
+        self._ranking = None
+        for position in positions:
+            best = self._best.get(position)
+            if not best:
+                self._best.pop(position, None)
+                self._partials.pop(position, None)
+                continue
+            # A known symptom matched by several user symptoms counts once, at its best score
+            matching_ids = {}
+            for known_id, score in best.values():
+                if score > matching_ids.get(known_id, 0):
+                    matching_ids[known_id] = score
+            # The score is min(1, a + b / user symptom count); only the count changes between steps
+            matched = len(matching_ids)
+            boost = 1.0 + 0.1 * sum(word_counts[known_id] for known_id in matching_ids) / matched
+            self._partials[position] = (sum(matching_ids.values()) / index.known_count(position) * 0.6 * boost,
+                                        matched * 0.4 * boost)
+
+    def _sorted_terms(self):
+        """
+        Return the term lists sorted best first, bringing in the diseases changed since the last call.
+
+        Changed diseases get new entries merged in. Their old entries stay behind until the lists
+        are rebuilt; they are harmless, as a disease is estimated from its current terms whichever
+        of its entries the ranking reaches first.
+        """
+        dirty = self._dirty
+        if dirty:
+            partials = self._partials
+            live = [position for position in dirty if position in partials]
+            if len(self._by_ratio) + len(live) > 2 * len(partials):
+                # Mostly stale: rebuild from the current terms
+                self._by_ratio = sorted((-a, position) for position, (a, _) in partials.items())
+                self._by_coverage = sorted((-b, position) for position, (_, b) in partials.items())
+            else:
+                # Two sorted runs, which the sort merges in linear time
+                self._by_ratio += sorted((-partials[position][0], position) for position in live)
+                self._by_ratio.sort()
+                self._by_coverage += sorted((-partials[position][1], position) for position in live)
+                self._by_coverage.sort()
+            dirty.clear()
+        return self._by_ratio, self._by_coverage
+
+    def _matching_ids(self, position: int) -> Dict[int, float]:
+        """Return a disease's matched symptom IDs and similarities, built in the order match_symptoms uses."""
+        best = self._best[position]
+        matching_ids = {}
+        for symptom in self._order:
+            match = best.get(symptom)
+            if match is not None:
+                known_id, score = match
+                matching_ids[known_id] = max(matching_ids.get(known_id, 0), score)
+        return matching_ids
+
+    def _score(self, position: int, matching_ids: Dict[int, float]) -> float:
+        """Apply the match score formula to one disease exactly as match_symptoms does."""
+        match_ratio = sum(matching_ids.values()) / self.index.known_count(position)
+        symptom_coverage = len(matching_ids) / len(self._order)
+        match_score = (match_ratio * 0.6) + (symptom_coverage * 0.4)
+        symptom_specificity = sum(self.index.word_counts[known] for known in matching_ids) / len(matching_ids)
+        return min(1.0, match_score * (1.0 + 0.1 * symptom_specificity))
+
+    def _estimates(self, top_n: int, inverse_count: float):
+        """
+        Estimate the scores of the diseases that may make the top N from their cached terms.
+
+        Returns:
+            Tuple ``(estimates, kth_estimate)``: ``{position: estimate}`` covering every disease
+            whose estimate can reach the N-th best, and that N-th best estimate.
+        """
+        partials = self._partials
+        # When most diseases changed since the last ranking, one pass over them all is cheapest
+        if len(self._dirty) * DIRTY_SCAN_FRACTION > len(partials):
+            estimates = {position: a + b * inverse_count for position, (a, b) in partials.items()}
+            return estimates, heapq.nlargest(top_n, estimates.values())[-1]
+
+        # Otherwise visit diseases best ratio term and best coverage term in turn, and stop once an
+        # unvisited disease, whose terms are at most the current ones, cannot reach the N-th best
+        by_ratio, by_coverage = self._sorted_terms()
+        estimates = {}
+        best_estimates = []
+        for rank in range(len(by_ratio)):
+            for _, position in (by_ratio[rank], by_coverage[rank]):
+                if position not in estimates and position in partials:
+                    a, b = partials[position]
+                    estimate = estimates[position] = a + b * inverse_count
+                    if len(best_estimates) < top_n:
+                        heapq.heappush(best_estimates, estimate)
+                    elif estimate > best_estimates[0]:
+                        heapq.heapreplace(best_estimates, estimate)
+            if len(best_estimates) == top_n:
+                bound = -by_ratio[rank][0] - by_coverage[rank][0] * inverse_count
+                if bound < min(1.0, best_estimates[0]) - 1e-4 - 1e-9:
+                    break
+        return estimates, best_estimates[0]
+
+    def matches(self, top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return the current top matches, as match_symptoms would for the current symptoms.
+
+        Args:
+            top_n: Number of matches to return; defaults to the session's ``top_n``
+        """
+        top_n = self.top_n if top_n is None else top_n
+        if top_n <= 0 or not self._partials:
+            return []
+        if self._ranking is not None and self._ranking[0] == top_n:
+            return list(self._ranking[1])
+
+        # Cheap scores from the cached terms pick the few diseases that can make the top N
+        estimates, kth_estimate = self._estimates(top_n, 1.0 / len(self._order))
+        cutoff = min(1.0, kth_estimate)
+        # Results are ranked on scores rounded to 4 places, so anything within rounding of the cutoff may tie
+        cutoff -= 1e-4 + 1e-9
+
+        index = self.index
+        known_count = index.known_count
+        ranked = []
+        for position, estimate in estimates.items():
+            if estimate >= cutoff:
+                matching_ids = self._matching_ids(position)
+                score = self._score(position, matching_ids)
+                ranked.append((round(score, 4), known_count(position), -position, score, matching_ids))
+        # Same ordering as match_symptoms: rounded score, then known symptom count, then database order
+        ranked = heapq.nlargest(top_n, ranked, key=lambda entry: entry[:3])
+
+        vocabulary = index.vocabulary
+        results = []
+        for _, _, negative_position, score, matching_ids in ranked:
+            matching_symptoms = {vocabulary[known_id]: similarity for known_id, similarity in matching_ids.items()}
+            results.append(self.matcher._build_match_result(index, -negative_position, matching_symptoms, score))
+        self._ranking = (top_n, results)
+        return list(results)
@@ -0,0 +1,429 @@
+# /src/matcher_index.py
+
+import logging
+import sys
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.prescriptions import PrescriptionIndex
+
+logger = logging.getLogger(__name__)
+
+# Similarity a known symptom must exceed to count as a match
+MATCH_THRESHOLD = 0.5
+
+# Fraction of its similarity a typo-corrected phrase loses per edit the correction took
+TYPO_PENALTY = 0.05
+
+# Number of distinct user symptoms whose vocabulary resolution is memoized
+RESOLUTION_CACHE_SIZE = 4096
+
+class DiseaseRecord:
+    """Metadata of one disease. Its symptoms live in the index's CSR arrays."""
+
+    __slots__ = ('name', 'symptom_count')
+
+    def __init__(self, name: str, symptom_count: int):
+        self.name = name
+        self.symptom_count = symptom_count
+
+    def __getstate__(self):
+        return self.name, self.symptom_count
+
+    def __setstate__(self, state):
+        self.name, self.symptom_count = state
+
+    def __repr__(self):
+        return f"DiseaseRecord({self.name!r}, {self.symptom_count})"
+
+class DiseaseRecordsView:
+    """Sequence of ``(disease, known_symptoms)`` tuples decoded on access from an index's arrays."""
+
+    def __init__(self, index: 'MatcherIndex'):
+        self._index = index
+
+    def __len__(self):
+        return self._index.disease_count
+
+    def __getitem__(self, position: int) -> Tuple[str, Tuple[str, ...]]:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        vocabulary = self._index.vocabulary
+        return (self._index.disease_name(position),
+                tuple(vocabulary[i] for i in self._index.known_symptom_ids(position)))
+
+    def __iter__(self) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        for position in range(len(self)):
+            yield self[position]
+
+class MatcherIndex:
+    """
+    Read-only snapshot of everything SymptomMatcher serves queries from.
+
+    Holds the disease records, the symptom and word indexes, the optional
+    vectorized scorer and the prescription index built from one load of the
+    disease CSV and drug reference. A snapshot is never modified after
+    construction, so a matcher can replace it with a freshly built one while
+    queries that already hold the old snapshot run to completion.
+
+    Symptoms are stored once, in alphabetical order, and referred to everywhere
+    else by their integer ID. Each disease's symptom IDs form one slice of a
+    flat ``array`` in CSR layout, and the diseases listing each symptom form one
+    slice of a second array, so a snapshot holds no per-disease lists or sets.
+    """
+
+    def __init__(self, disease_records: Iterable[Tuple[str, List[str]]], prescription_data: Dict[str, Any],
+                 scoring_backend: str = 'python', version: int = 1,
+                 source_mtimes: Optional[Dict[str, float]] = None):
+        """
+        Build the indexes for one load of the data.
+
+        Args:
+            disease_records: ``(disease, symptoms)`` pairs in database order
+            prescription_data: Parsed drug reference, keyed by condition name
+            scoring_backend: 'vectorized' to also build the sparse-matrix scorer
+            version: Data version, incremented by the matcher on every load
+            source_mtimes: Modification times of the source files when they were read
+        """
+        self.version = version
+        self.source_mtimes = source_mtimes or {}
+
+        self.prescription_data = prescription_data
+        self.prescription_index = PrescriptionIndex(prescription_data)
+        self._formatted_prescriptions = {}
+
+        self._build_symptom_index(disease_records)
+
+        # Resolutions depend on the vocabulary, so each snapshot has its own memo
+        self.resolve_symptom = lru_cache(maxsize=RESOLUTION_CACHE_SIZE)(self._resolve_symptom)
+
+        self.vectorized_scorer = None
+        if scoring_backend == 'vectorized':
+            self.attach_vectorized_scorer()
+
+        self.typo_index = None
+        self.tfidf_scorer = None
+        self.naive_bayes_scorer = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Memos and optional models are rebuilt after loading
+        for key in ('resolve_symptom', 'vectorized_scorer', 'typo_index', 'tfidf_scorer',
+                    'naive_bayes_scorer', '_formatted_prescriptions', 'symptom_tokens'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.vectorized_scorer = None
+        self.typo_index = None
+        self.tfidf_scorer = None
+        self.naive_bayes_scorer = None
+        self._formatted_prescriptions = {}
+        self.symptom_tokens = self._tokenize_vocabulary()
+        self.resolve_symptom = lru_cache(maxsize=RESOLUTION_CACHE_SIZE)(self._resolve_symptom)
+
+    def attach_vectorized_scorer(self) -> bool:
+        """
+        Build the sparse-matrix scorer for this snapshot.
+
+        Returns:
+            True if the scorer is available, False if NumPy or SciPy is missing.
+        """
+        try:
+            import numpy as np
+            from src.vectorized_scorer import VectorizedScorer
+        except ImportError as e:
+            logger.warning(f"Vectorized scoring unavailable ({e}), falling back to Python scoring")
+            return False
+
+        # Zero-copy views of the CSR arrays
+        self.vectorized_scorer = VectorizedScorer(
+            self.vocabulary, self.symptom_ids,
+            np.frombuffer(self.disease_indptr, dtype=np.int64), np.frombuffer(self.disease_symptoms, dtype=np.int32),
+            np.frombuffer(self.symptom_indptr, dtype=np.int64), np.frombuffer(self.symptom_diseases, dtype=np.int32),
+            np.frombuffer(self.word_counts, dtype=np.int32)
+        )
+        return True
+
+    def attach_naive_bayes_scorer(self) -> bool:
+        """
+        Build the naive Bayes log-likelihood model used by the 'naive_bayes' ranking mode.
+
+        Returns:
+            True if the model is available, False if NumPy or SciPy is missing.
+        """
+        try:
+            import numpy as np
+            from src.naive_bayes import NaiveBayesScorer
+        except ImportError as e:
+            logger.warning(f"Naive Bayes ranking unavailable ({e}), falling back to heuristic ranking")
+            return False
+
+        self.naive_bayes_scorer = NaiveBayesScorer(
+            self.vocabulary, self.symptom_ids,
+            np.frombuffer(self.disease_indptr, dtype=np.int64), np.frombuffer(self.disease_symptoms, dtype=np.int32)
+        )
+        return True
+
+    def attach_typo_index(self, max_distance: int) -> None:
+        """
+        Build the spelling index that lets misspelled user symptoms match.
+
+        Args:
+            max_distance: Largest number of edits a misspelled word may be corrected by
+        """
+        from src.typo_index import SymSpellIndex
+        self.typo_index = SymSpellIndex(dict(self.word_frequencies()), max_distance)
+        # Resolutions memoized before the index existed would miss the corrections
+        self.resolve_symptom.cache_clear()
+
+    def attach_tfidf_scorer(self) -> bool:
+        """
+        Fit the character n-gram TF-IDF model used to resolve free-text symptom phrases.
+
+        Returns:
+            True if the model is available, False if scikit-learn is missing.
+        """
+        try:
+            from src.tfidf_similarity import TfidfSymptomScorer
+        except ImportError as e:
+            logger.warning(f"TF-IDF similarity unavailable ({e}), falling back to rule-based similarity")
+            return False
+        self.tfidf_scorer = TfidfSymptomScorer(iter(self.vocabulary))
+        self.resolve_symptom.cache_clear()
+        return True
+
+    def word_frequencies(self) -> Iterable[Tuple[str, int]]:
+        """Yield every word of the symptom vocabulary with the number of known symptoms using it."""
+        for token, symptoms in self.token_index.items():
+            yield token, len(symptoms)
+
+    def _build_symptom_index(self, disease_records: Iterable[Tuple[str, List[str]]]):
+        """
+        Build the symptom vocabulary, the CSR arrays and the word index.
+
+        Each disease is reduced once to its distinct known symptoms. Symptom IDs
+        follow alphabetical order, so every disease's ID slice is sorted the same
+        way its symptom names would be. ``token_index`` maps every symptom word
+        to the known symptoms containing it.
+
+        Every distinct symptom and word is interned, so each is held by one string
+        object shared by the vocabulary, the word sets and the word index.
+        """
+        records = []
+        for disease, symptoms in disease_records:
+            # Sorted so that ties between equally similar symptoms resolve the same way every run
+            known_symptoms = sorted(set(symptoms))
+            if known_symptoms:
+                records.append((disease, known_symptoms))
+
+        self.vocabulary = sorted({sys.intern(symptom) for _, known_symptoms in records for symptom in known_symptoms})
+        self.symptom_ids = {symptom: i for i, symptom in enumerate(self.vocabulary)}
+        self.word_counts = array('i', (len(symptom.split()) for symptom in self.vocabulary))
+        self.symptom_tokens = self._tokenize_vocabulary()
+
+        self.diseases = []
+        self.disease_indptr = array('q', [0])
+        self.disease_symptoms = array('i')
+        postings_counts = [0] * len(self.vocabulary)
+        for disease, known_symptoms in records:
+            self.diseases.append(DiseaseRecord(disease, len(known_symptoms)))
+            for symptom in known_symptoms:
+                symptom_id = self.symptom_ids[symptom]
+                self.disease_symptoms.append(symptom_id)
+                postings_counts[symptom_id] += 1
+            self.disease_indptr.append(len(self.disease_symptoms))
+
+        # Transpose into the symptom -> diseases postings, positions ascending within each slice
+        self.symptom_indptr = array('q', [0])
+        for count in postings_counts:
+            self.symptom_indptr.append(self.symptom_indptr[-1] + count)
+        self.symptom_diseases = array('i', bytes(4 * len(self.disease_symptoms)))
+        cursors = list(self.symptom_indptr[:-1])
+        for position in range(len(self.diseases)):
+            for symptom_id in self.known_symptom_ids(position):
+                self.symptom_diseases[cursors[symptom_id]] = position
+                cursors[symptom_id] += 1
+
+        self.token_index = {}
+        for symptom, tokens in zip(self.vocabulary, self.symptom_tokens):
+            for token in tokens:
+                self.token_index.setdefault(token, set()).add(symptom)
+
+        logger.info(f"Indexed {len(self.vocabulary)} distinct symptoms across "
+                    f"{len(self.diseases)} diseases")
+
+    def _tokenize_vocabulary(self) -> List[frozenset]:
+        """Return the set of interned words of every known symptom, indexed by symptom ID."""
+        return [frozenset(sys.intern(token) for token in symptom.split()) for symptom in self.vocabulary]
+
+    def known_words(self, symptom: str) -> frozenset:
+        """Return the precomputed set of words of a known symptom."""
+        return self.symptom_tokens[self.symptom_ids[symptom]]
+
+    @property
+    def disease_count(self) -> int:
+        """Number of diseases in the snapshot."""
+        return len(self.diseases)
+
+    @property
+    def disease_records(self) -> DiseaseRecordsView:
+        """``(disease, known_symptoms)`` tuples in database order, decoded on access."""
+        return DiseaseRecordsView(self)
+
+    def disease_name(self, position: int) -> str:
+        """Return the name of the disease at ``position``."""
+        return self.diseases[position].name
+
+    def known_count(self, position: int) -> int:
+        """Return the number of distinct known symptoms of the disease at ``position``."""
+        return self.diseases[position].symptom_count
+
+    def incidence_arrays(self):
+        """
+        Return the disease-symptom incidence matrix as NumPy views of its CSR arrays (requires NumPy).
+
+        Returns:
+            Tuple ``(disease_indptr, disease_symptoms)``, or None if the index does not hold
+            the arrays in memory.
+        """
+        import numpy as np
+        return np.frombuffer(self.disease_indptr, dtype=np.int64), np.frombuffer(self.disease_symptoms, dtype=np.int32)
+
+    def known_symptom_ids(self, position: int) -> Sequence[int]:
+        """Return the sorted symptom IDs of the disease at ``position``."""
+        return self.disease_symptoms[self.disease_indptr[position]:self.disease_indptr[position + 1]]
+
+    def diseases_with(self, symptom: str) -> Sequence[int]:
+        """Return the positions of the diseases listing a known symptom, ascending."""
+        symptom_id = self.symptom_ids[symptom]
+        return self.symptom_diseases[self.symptom_indptr[symptom_id]:self.symptom_indptr[symptom_id + 1]]
+
+    @staticmethod
+    def symptom_similarity(symptom1: str, symptom2: str, words1: Optional[frozenset] = None,
+                           words2: Optional[frozenset] = None) -> float:
+        """
+        Calculate similarity between two symptoms.
+
+        Identical symptoms score 1.0 and symptoms where one contains the other 0.8.
+        Otherwise symptoms sharing words score 0.3 plus 0.1 per shared word, at most
+        0.7, and symptoms with nothing in common 0.0.
+
+        ``words1`` and ``words2`` are the word sets of the symptoms, when already known.
+        """
+        # Simple implementation - can be replaced with more sophisticated string similarity if needed
+        if not symptom1 or not symptom2:
+            return 0.0
+
+        # Exact match
+        if symptom1 == symptom2:
+            return 1.0
+
+        # Check for substring matches
+        if symptom1 in symptom2 or symptom2 in symptom1:
+            return 0.8
+
+        # Check for common words
+        if words1 is None:
+            words1 = set(symptom1.split())
+        if words2 is None:
+            words2 = set(symptom2.split())
+        common_words = words1.intersection(words2)
+
+        if common_words:
+            # More weight to matches with more common words
+            return min(0.7, 0.3 + 0.1 * len(common_words))
+
+        return 0.0
+
+    def candidate_symptoms(self, user_symptom: str) -> set:
+        """
+        Return the known symptoms that can score above the match threshold for a user symptom.
+
+        Mirrors the rules in ``symptom_similarity``: exact and substring matches, or at
+        least two words in common.
+        """
+        candidates = {known for known in self.vocabulary
+                      if user_symptom in known or known in user_symptom}
+
+        shared_words = {}
+        for token in set(user_symptom.split()):
+            for known in self.token_index.get(token, ()):
+                shared_words[known] = shared_words.get(known, 0) + 1
+        candidates.update(known for known, count in shared_words.items() if count >= 2)
+
+        return candidates
+
+    def _resolve_symptom(self, user_symptom: str) -> Tuple[Tuple[str, float], ...]:
+        """Score one normalized user symptom against the known-symptom vocabulary."""
+        # Each phrase with the factor its scores are scaled by
+        phrases = [(user_symptom, 1.0)]
+        if self.typo_index is not None:
+            corrected, distance = self.typo_index.correct_with_distance(user_symptom)
+            if corrected != user_symptom:
+                # Every edit costs, so a corrected phrase never outranks an exact match
+                phrases.append((corrected, max(0.0, 1.0 - TYPO_PENALTY * distance)))
+
+        best_scores = {}
+        for phrase, scale in phrases:
+            # Split once per phrase; known symptoms come with their word sets precomputed
+            phrase_words = frozenset(phrase.split())
+            for known in self.candidate_symptoms(phrase):
+                score = self.symptom_similarity(phrase, known, phrase_words, self.known_words(known)) * scale
+                if score > MATCH_THRESHOLD and score > best_scores.get(known, 0.0):
+                    best_scores[known] = score
+            # Paraphrases the rules miss, scored by their n-gram cosine similarity
+            if self.tfidf_scorer is not None:
+                for known, score in self.tfidf_scorer.similar(phrase, MATCH_THRESHOLD):
+                    score *= scale
+                    if score > MATCH_THRESHOLD and score > best_scores.get(known, 0.0):
+                        best_scores[known] = score
+        # Best match first; ties resolve alphabetically
+        return tuple(sorted(best_scores.items(), key=lambda match: (-match[1], match[0])))
+
+    def prescription_info(self, disease_name: str) -> Optional[Dict[str, Any]]:
+        """Get prescription information for a specific disease."""
+        if not self.prescription_data:
+            return None
+
+        # Exact match first, then the first condition whose name contains the disease name
+        match = self.prescription_index.find(disease_name)
+        if match is None:
+            return None
+
+        # Formatted recommendations are shared by every disease resolving to the same condition
+        condition_name, condition_data = match
+        formatted = self._formatted_prescriptions.get(condition_name)
+        if formatted is None:
+            formatted = self.format_prescription_info(condition_data)
+            self._formatted_prescriptions[condition_name] = formatted
+        return formatted
+
+    @staticmethod
+    def format_prescription_info(condition_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format prescription information from the condition data."""
+        recommendations = []
+
+        # Add OTC medications if available
+        if 'otc_medications' in condition_data and condition_data['otc_medications']:
+            for med in condition_data['otc_medications']:
+                recommendations.append(f"{med['name']}: {med['dosage']} - {med['purpose']}")
+
+        # Add home remedies if available
+        if 'home_remedies' in condition_data and condition_data['home_remedies']:
+            recommendations.extend(condition_data['home_remedies'])
+
+        # Add medical attention note if available
+        if 'medical_attention' in condition_data and condition_data['medical_attention']:
+            recommendations.append(f"Medical Attention: {condition_data['medical_attention']}")
+
+        # Add a note to consult a doctor if symptoms persist
+        recommendations.append("If symptoms persist or worsen, please consult a healthcare professional.")
+
+        return {
+            'recommendations': recommendations
+        }
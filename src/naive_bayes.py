@@ -0,0 +1,151 @@
+# /src/naive_bayes.py
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.match_metrics import NULL_TIMINGS
+
+logger = logging.getLogger(__name__)
+
+# Lidstone smoothing added to every symptom count, so symptoms a disease does not list keep a small probability
+NAIVE_BAYES_SMOOTHING = 0.01
+
+class NaiveBayesScorer:
+    """
+    Multinomial naive Bayes model of the disease-symptom table.
+
+    With Lidstone smoothing ``alpha`` over a vocabulary of ``V`` symptoms, a
+    disease listing ``k_d`` symptoms emits symptom ``s`` with probability
+    ``(x_ds + alpha) / (k_d + alpha * V)``, where ``x_ds`` is 1 if it lists the
+    symptom. The log-likelihood matrix is therefore a per-disease constant plus
+    ``log((1 + alpha) / alpha)`` on the listed entries, so only that sparse part
+    is stored. A query is one sparse matrix-vector product plus the per-disease
+    constants and the log prior, and a softmax turns the scores into posterior
+    probabilities over every disease.
+
+    Over a large table even a good match keeps only a sliver of that posterior,
+    so the ranked matches are also scored by their share of the posterior mass
+    among the matches returned, which is what ``match_score`` reports.
+
+    Each user symptom counts as one observation, spread over the known symptoms
+    it resolves to in proportion to their similarity. User symptoms matching no
+    known symptom carry no evidence and are left out.
+    """
+
+    def __init__(self, vocabulary, symptom_ids, indptr: np.ndarray, indices: np.ndarray,
+                 smoothing: float = NAIVE_BAYES_SMOOTHING, log_prior: Optional[np.ndarray] = None):
+        """
+        Precompute the log-likelihood terms.
+
+        Args:
+            vocabulary: Sequence of known symptoms, indexed by symptom ID in alphabetical order
+            symptom_ids: Mapping from known symptom to symptom ID
+            indptr, indices: CSR layout of the disease x symptom incidence
+            smoothing: Lidstone smoothing constant; must be positive
+            log_prior: Log prior probability of every disease; uniform if omitted
+        """
+        if smoothing <= 0:
+            raise ValueError("smoothing must be positive")
+        self.vocabulary = vocabulary
+        self.symptom_ids = symptom_ids
+        self.smoothing = smoothing
+        disease_count, vocabulary_size = len(indptr) - 1, len(vocabulary)
+
+        self.log_likelihood = sp.csr_matrix(
+            (np.full(len(indices), np.log1p(smoothing) - np.log(smoothing)), indices, indptr),
+            shape=(disease_count, vocabulary_size)
+        )
+        # Log-probability of an unlisted symptom; a listed one adds the stored entry on top
+        self.log_unlisted = np.log(smoothing) - np.log(np.diff(indptr) + smoothing * vocabulary_size)
+        self.log_prior = (np.asarray(log_prior, dtype=np.float64) if log_prior is not None
+                          else np.full(disease_count, -np.log(max(disease_count, 1))))
+        self._indptr = indptr
+        self._indices = indices
+
+        logger.info(f"Built {disease_count}x{vocabulary_size} naive Bayes log-likelihood matrix "
+                    f"with {self.log_likelihood.nnz} stored entries")
+
+    def evidence(self, resolved: Dict[str, List[Tuple[str, float]]]) -> Tuple[np.ndarray, int]:
+        """
+        Return the observation vector of a resolved query and the number of observations in it.
+
+        Every user symptom with matches adds a total weight of 1, shared between its
+        known symptoms in proportion to their similarity.
+        """
+        counts = np.zeros(len(self.vocabulary))
+        observations = 0
+        for known_matches in resolved.values():
+            total = sum(score for _, score in known_matches)
+            if total <= 0:
+                continue
+            observations += 1
+            for known, score in known_matches:
+                counts[self.symptom_ids[known]] += score / total
+        return counts, observations
+
+    def posterior(self, resolved: Dict[str, List[Tuple[str, float]]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the posterior probability of every disease and the listed-symptom evidence behind it.
+
+        Returns:
+            Tuple ``(probabilities, listed)``: ``probabilities`` sums to 1 over all diseases
+            (it is the prior if the query has no evidence) and ``listed`` is the stored part
+            of the log-likelihood, positive exactly for diseases listing a matched symptom.
+        """
+        counts, observations = self.evidence(resolved)
+        listed = self.log_likelihood @ counts
+        scores = self.log_prior + observations * self.log_unlisted + listed
+        scores -= scores.max()
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum()
+        return probabilities, listed
+
+    def rank(self, resolved: Dict[str, List[Tuple[str, float]]], top_n: int, timings=NULL_TIMINGS):
+        """
+        Rank the diseases listing any matched symptom by posterior probability.
+
+        Args:
+            resolved: Output of ``SymptomMatcher.resolve_symptoms``
+            top_n: Number of ranked diseases to return
+            timings: QueryTimings to record the scoring and sort stages into
+
+        Returns:
+            Tuple ``(ranked, match_count)`` where ``ranked`` lists up to ``top_n``
+            ``(position, share, matching_symptoms, probability)`` tuples in rank order and
+            ``match_count`` is the number of diseases with any match. ``probability`` is the
+            posterior over every disease and ``share`` that posterior renormalized over the
+            returned diseases, so the shares add up to 1.
+        """
+        probabilities, listed = self.posterior(resolved)
+        candidates = np.flatnonzero(listed > 0)
+        timings.count('diseases_scanned', len(candidates))
+        timings.mark('scoring')
+        if not len(candidates) or top_n <= 0:
+            return [], len(candidates)
+
+        # Most probable first, then database order
+        order = np.lexsort((candidates, -probabilities[candidates]))[:top_n]
+        returned_mass = float(probabilities[candidates[order]].sum())
+
+        # Best similarity of each matched known symptom over the user symptoms
+        best = {}
+        for known_matches in resolved.values():
+            for known, score in known_matches:
+                symptom_id = self.symptom_ids[known]
+                best[symptom_id] = max(best.get(symptom_id, 0.0), score)
+
+        ranked = []
+        for i in order:
+            position = int(candidates[i])
+            known_ids = self._indices[self._indptr[position]:self._indptr[position + 1]]
+            matching_symptoms = {self.vocabulary[int(symptom_id)]: best[int(symptom_id)]
+                                 for symptom_id in known_ids if int(symptom_id) in best}
+            probability = float(probabilities[position])
+            share = probability / returned_mass if returned_mass > 0 else 1.0 / len(order)
+            ranked.append((position, share, matching_symptoms, probability))
+        timings.mark('sort')
+
+        return ranked, len(candidates)
@@ -0,0 +1,102 @@
+# /src/prescriptions.py
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Number of distinct condition lookups memoized per index
+LOOKUP_CACHE_SIZE = 4096
+
+class PrescriptionIndex:
+    """
+    Precompiled lookup over the drug reference data.
+
+    Condition names are indexed once at load time: a lowercase exact-match
+    dictionary answers exact lookups, and a character trigram index narrows
+    partial (substring) lookups to a few candidates. Lookups follow the same
+    precedence as a scan of the reference in file order: an exact match wins,
+    otherwise the first condition in file order that matches partially.
+    """
+
+    def __init__(self, drug_reference: Dict[str, Any]):
+        """
+        Args:
+            drug_reference: Parsed drug reference JSON, keyed by condition name
+        """
+        self.conditions = list(drug_reference.items())
+        self._names = [name.lower() for name, _ in self.conditions]
+
+        # First position of each lowercase name, so duplicates resolve to the earliest entry
+        self._exact = {}
+        for position, name in enumerate(self._names):
+            self._exact.setdefault(name, position)
+
+        # Trigram -> positions of the names containing it, in file order
+        self._trigrams = {}
+        for position, name in enumerate(self._names):
+            for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                self._trigrams.setdefault(trigram, []).append(position)
+
+        self._find_cached = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._find)
+        logger.debug(f"Indexed {len(self.conditions)} prescription conditions")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_find_cached', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._find_cached = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._find)
+
+    def __len__(self):
+        return len(self.conditions)
+
+    def _first_containing(self, name: str) -> Optional[int]:
+        """Return the first position whose condition name contains ``name``."""
+        if len(name) < 3:
+            # Too short for the trigram index
+            return next((position for position, known in enumerate(self._names) if name in known), None)
+
+        # Every name containing the query contains all of its trigrams, so the rarest one
+        # gives the shortest list of candidates to verify
+        trigrams = {name[i:i + 3] for i in range(len(name) - 2)}
+        postings = min((self._trigrams.get(trigram, []) for trigram in trigrams), key=len)
+        return next((position for position in postings if name in self._names[position]), None)
+
+    def _first_contained(self, name: str) -> Optional[int]:
+        """Return the first position whose condition name is a substring of ``name``."""
+        positions = [self._exact[name[start:end]]
+                     for start in range(len(name))
+                     for end in range(start + 1, len(name) + 1)
+                     if name[start:end] in self._exact]
+        return min(positions, default=None)
+
+    def _find(self, condition: str, match_contained: bool = False) -> Optional[Tuple[str, Dict[str, Any]]]:
+        condition = condition.lower()
+
+        position = self._exact.get(condition)
+        if position is None:
+            position = self._first_containing(condition)
+            if match_contained:
+                contained = self._first_contained(condition)
+                if contained is not None and (position is None or contained < position):
+                    position = contained
+
+        return None if position is None else self.conditions[position]
+
+    def find(self, condition: str, match_contained: bool = False) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Find the drug reference entry for a condition.
+
+        Args:
+            condition: Condition or disease name, in any case
+            match_contained: Also accept reference conditions whose name appears
+                inside ``condition``, not only ones containing it
+
+        Returns:
+            ``(condition_name, condition_data)`` from the reference, or None if nothing matches.
+        """
+        return self._find_cached(condition, match_contained)
@@ -0,0 +1,110 @@
+# /src/registry.py
+
+import inspect
+import logging
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+from src.symptom_matcher import DEFAULT_DATA_FILES, SymptomMatcher, default_data_path
+from src.typo_index import MAX_EDIT_DISTANCE
+
+logger = logging.getLogger(__name__)
+
+# Guards the registries and the per-configuration construction locks
+_registry_lock = threading.Lock()
+_construction_locks: Dict[Tuple, threading.Lock] = {}
+_matchers: Dict[Tuple, SymptomMatcher] = {}
+_assistants: Dict[Tuple, Any] = {}
+
+# Settings the shared matchers use unless the caller overrides them; the web app and
+# voice assistant take free-text symptoms, so misspellings are corrected by default
+DEFAULT_MATCHER_CONFIG: Dict[str, Any] = {
+    'typo_tolerance': MAX_EDIT_DISTANCE,
+}
+
+def _matcher_config(matcher_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the SymptomMatcher arguments for a configuration, registry defaults included."""
+    return {**DEFAULT_MATCHER_CONFIG, **matcher_config}
+
+def _config_key(matcher_config: Dict[str, Any]) -> Tuple:
+    """Return a hashable key identifying one data configuration."""
+    # Every argument is spelled out, so leaving one at its default and passing the default share one matcher
+    arguments = inspect.signature(SymptomMatcher).bind_partial(**_matcher_config(matcher_config))
+    arguments.apply_defaults()
+    config = arguments.arguments
+    for name in DEFAULT_DATA_FILES:
+        if config[name] is None:
+            config[name] = default_data_path(name)
+    # Relative and absolute spellings of the same file share one matcher
+    return tuple(sorted(
+        (name, os.path.abspath(value) if name.endswith('_path') and isinstance(value, str) else value)
+        for name, value in config.items()
+    ))
+
+def get_symptom_matcher(**matcher_config) -> SymptomMatcher:
+    """
+    Return the process-wide SymptomMatcher for a data configuration, building it on first use.
+
+    Every caller asking for the same configuration gets the same instance, so the
+    disease and drug data are loaded once per process. When several threads ask
+    for a configuration that is not built yet, one builds it while the others wait
+    for it; different configurations build independently. A failed build is not
+    remembered, so the next call tries again.
+
+    Settings not given are taken from ``DEFAULT_MATCHER_CONFIG``, so shared matchers
+    correct misspelled symptoms unless ``typo_tolerance=0`` is passed.
+
+    Args:
+        **matcher_config: SymptomMatcher arguments, such as ``data_path`` or ``cache_size``
+
+    Returns:
+        The shared SymptomMatcher.
+    """
+    key = _config_key(matcher_config)
+    matcher = _matchers.get(key)
+    if matcher is not None:
+        return matcher
+
+    with _registry_lock:
+        lock = _construction_locks.setdefault(key, threading.Lock())
+    with lock:
+        # Another thread may have finished building it while this one waited
+        matcher = _matchers.get(key)
+        if matcher is None:
+            logger.info(f"Building shared symptom matcher for configuration: {matcher_config or 'default'}")
+            matcher = SymptomMatcher(**_matcher_config(matcher_config))
+            with _registry_lock:
+                _matchers[key] = matcher
+    return matcher
+
+def get_health_assistant(**matcher_config):
+    """
+    Return the process-wide HealthAssistant over the shared matcher for a data configuration.
+
+    Args:
+        **matcher_config: SymptomMatcher arguments, as for ``get_symptom_matcher``
+
+    Returns:
+        The shared HealthAssistant.
+    """
+    from src.assistant import HealthAssistant
+
+    key = _config_key(matcher_config)
+    assistant = _assistants.get(key)
+    if assistant is None:
+        matcher = get_symptom_matcher(**matcher_config)
+        with _registry_lock:
+            assistant = _assistants.setdefault(key, HealthAssistant(matcher))
+    return assistant
+
+def clear_registry() -> None:
+    """
+    Forget every shared instance, so the next request builds fresh ones.
+
+    Instances already handed out keep working; callers holding them are unaffected.
+    """
+    with _registry_lock:
+        _matchers.clear()
+        _assistants.clear()
+        _construction_locks.clear()
@@ -0,0 +1,240 @@
+# /src/sharded_matcher.py
+
+import heapq
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.matcher_index import MatcherIndex
+from src.match_metrics import timings_for
+from src.symptom_matcher import SymptomMatcher
+
+logger = logging.getLogger(__name__)
+
+# Index of the disease shard owned by a shard worker process, built once by _init_shard_worker
+_shard_index = None
+# Database position of the shard's first disease
+_shard_start = 0
+
+def _init_shard_worker(disease_records: List[Tuple[str, Tuple[str, ...]]], prescription_data: Dict[str, Any],
+                       scoring_backend: str, start: int = 0):
+    """Build the index of the disease shard starting at database position ``start`` in its worker process."""
+    global _shard_index, _shard_start
+    _shard_index = MatcherIndex(disease_records, prescription_data, scoring_backend=scoring_backend)
+    _shard_start = start
+
+def restrict_resolution(index: MatcherIndex, resolved: Dict[str, List[Tuple[str, float]]]):
+    """
+    Drop the known symptoms an index does not list from a resolved query.
+
+    Every user symptom is kept, even with no matches left, because the number
+    of user symptoms is part of the score formula.
+    """
+    symptom_ids = index.symptom_ids
+    return {user_symptom: [(known, score) for known, score in known_matches if known in symptom_ids]
+            for user_symptom, known_matches in resolved.items()}
+
+def _rank_shard(resolved: Dict[str, List[Tuple[str, float]]], top_n: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Rank the diseases of this worker's shard for a query resolved against the full vocabulary."""
+    results, match_count, _ = SymptomMatcher._rank(_shard_index, restrict_resolution(_shard_index, resolved), top_n)
+    # Positions within the shard become positions in the whole database
+    for result in results:
+        result['position'] += _shard_start
+    return results, match_count
+
+def shard_bounds(disease_count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split database positions into at most ``shards`` contiguous, non-empty ``(start, end)`` ranges."""
+    shards = max(1, min(shards, disease_count))
+    edges = [disease_count * i // shards for i in range(shards + 1)]
+    return [(start, end) for start, end in zip(edges, edges[1:]) if end > start]
+
+class ShardedSymptomMatcher:
+    """
+    Symptom matcher that partitions the diseases across worker processes.
+
+    Each worker holds the index of one contiguous slice of the database. A query
+    is resolved once here against the full vocabulary, so typo correction and
+    TF-IDF similarity see exactly what a single-process matcher sees, then
+    scattered to every shard. The shards rank their diseases with the same code
+    as SymptomMatcher and their top N lists are merged. Because shards are
+    contiguous and in database order, merging on match score and known symptom
+    count with ties going to the earlier shard reproduces the single-process
+    ranking exactly.
+
+    The matcher serves the data it was created with. Create a new one to pick
+    up changed data files, and call ``close`` (or use it as a context manager)
+    to stop the workers.
+    """
+
+    def __init__(self, shards: Optional[int] = None, **matcher_config):
+        """
+        Load the data and start one worker process per shard.
+
+        Args:
+            shards: Number of worker processes to split the diseases across.
+                Defaults to the number of CPUs.
+            **matcher_config: SymptomMatcher arguments used to load the data, such as
+                ``data_path``, ``scoring_backend``, ``typo_tolerance`` or ``cache_size``
+        """
+        # Resolves queries, owns the cache and metrics and provides the data for the shards
+        self.matcher = SymptomMatcher(**matcher_config)
+        if self.matcher.ranking_mode != 'heuristic':
+            # Posterior probabilities are normalized over every disease, which no single shard sees
+            raise ValueError("Sharded matching only supports the 'heuristic' ranking mode")
+        self.metrics = self.matcher.metrics
+
+        index = self.matcher._index
+        records = index.disease_records
+        self._bounds = shard_bounds(index.disease_count, shards or os.cpu_count() or 1)
+
+        self._executors = []
+        try:
+            for start, end in self._bounds:
+                shard_records = [records[position] for position in range(start, end)]
+                self._executors.append(ProcessPoolExecutor(
+                    max_workers=1, initializer=_init_shard_worker,
+                    initargs=(shard_records, index.prescription_data, self.matcher.scoring_backend, start)))
+        except Exception:
+            self.close()
+            raise
+        logger.info(f"Sharded {index.disease_count} diseases across {len(self._executors)} worker processes")
+
+    @property
+    def shard_count(self) -> int:
+        """Number of shard worker processes."""
+        return len(self._executors)
+
+    @property
+    def prescription_data(self) -> Dict[str, Any]:
+        """Drug reference data being served."""
+        return self.matcher.prescription_data
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return the query cache counters, or None if caching is disabled."""
+        return self.matcher.cache_stats()
+
+    def budget_stats(self) -> Dict[str, int]:
+        """Return how many queries ran with a time budget and how many of those ran out of it."""
+        return self.matcher.budget_stats()
+
+    def metrics_stats(self) -> Optional[Dict[str, Any]]:
+        """Return the per-stage timings and counters, or None if metrics are disabled."""
+        return self.matcher.metrics_stats()
+
+    def resolve_symptoms(self, user_symptoms) -> Dict[str, List[Tuple[str, float]]]:
+        """Resolve user symptoms against the full vocabulary; see SymptomMatcher.resolve_symptoms."""
+        return self.matcher.resolve_symptoms(user_symptoms)
+
+    def match_symptoms(self, user_symptoms: List[str], top_n: int = 5, budget_ms: Optional[float] = None,
+                       deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Match user symptoms against every shard and return the top matches.
+
+        Takes the same arguments and returns the same results as SymptomMatcher.match_symptoms.
+        With a time budget, shards that have not answered when it runs out are left out
+        and the results are flagged ``partial``.
+        """
+        return self.match_symptoms_with_status(user_symptoms, top_n, budget_ms, deadline)[0]
+
+    def match_symptoms_with_status(self, user_symptoms: List[str], top_n: int = 5,
+                                   budget_ms: Optional[float] = None,
+                                   deadline: Optional[float] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Match user symptoms and report whether any shard missed the time budget.
+
+        Returns the same ``(results, partial)`` tuple as SymptomMatcher.match_symptoms_with_status.
+        """
+        if budget_ms is not None:
+            budget_deadline = time.perf_counter() + budget_ms / 1000.0
+            deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+
+        if not user_symptoms or not isinstance(user_symptoms, (list, set)):
+            logger.warning("Invalid user_symptoms provided. Expected a non-empty list.")
+            return [], False
+
+        metrics = self.metrics
+        timings = timings_for(metrics)
+
+        try:
+            # Deduplicated in input order, the order similarities are summed in
+            user_symptoms = list(dict.fromkeys(s.strip().lower() for s in user_symptoms if s and isinstance(s, str)))
+            if not user_symptoms:
+                logger.warning("No valid symptoms provided after cleaning.")
+                return [], False
+            timings.mark('normalize')
+
+            index = self.matcher._index
+            query_cache = self.matcher.query_cache
+            cache_key = (index.version, frozenset(user_symptoms), top_n)
+            if query_cache is not None:
+                cached = query_cache.get(cache_key)
+                if cached is not None:
+                    timings.count('cache_hits')
+                    timings.mark('cache')
+                    if deadline is not None:
+                        self.matcher._record_budget(True)
+                    if metrics is not None:
+                        metrics.record(timings)
+                    return list(cached), False
+                timings.mark('cache')
+
+            resolved = self.matcher._resolve_with(index, user_symptoms)
+            timings.mark('resolve')
+
+            results, diseases_with_matches, complete = [], 0, True
+            if top_n > 0 and any(resolved.values()):
+                futures = [executor.submit(_rank_shard, resolved, top_n) for executor in self._executors]
+                shard_results = []
+                for future in futures:
+                    try:
+                        timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+                        matches, match_count = future.result(timeout=timeout)
+                    except TimeoutError:
+                        # The shard finishes in the background; its answer is simply not waited for
+                        complete = False
+                        continue
+                    shard_results.append(matches)
+                    diseases_with_matches += match_count
+                timings.count('shards', len(futures))
+                timings.mark('scoring')
+
+                # heapq.merge yields equal keys in shard order, which is database order
+                merged = heapq.merge(*shard_results,
+                                     key=lambda match: (-match['match_score'], -match['known_symptom_count']))
+                results = list(itertools.islice(merged, top_n))
+                timings.mark('sort')
+            timings.count('matches_found', diseases_with_matches)
+            if deadline is not None:
+                self.matcher._record_budget(complete, timings)
+            if not complete:
+                results = [dict(result, partial=True) for result in results]
+
+            logger.info(f"Found {diseases_with_matches} of {index.disease_count} diseases with matching symptoms "
+                        f"across {len(self._executors)} shards")
+            timings.mark('logging')
+
+            if query_cache is not None and complete:
+                query_cache.put(cache_key, results)
+                timings.mark('cache')
+            if metrics is not None:
+                metrics.record(timings)
+            return list(results), not complete
+
+        except Exception as e:
+            logger.error(f"Error in sharded match_symptoms: {e}", exc_info=True)
+            return [], False
+
+    def close(self):
+        """Stop the shard worker processes."""
+        for executor in self._executors:
+            executor.shutdown()
+        self._executors = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,339 @@
+# /src/shared_index.py
+
+import json
+import logging
+import mmap
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.matcher_index import MatcherIndex, RESOLUTION_CACHE_SIZE
+from src.prescriptions import PrescriptionIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the array layout changes so stale files are ignored
+SHARED_INDEX_FORMAT_VERSION = 2
+
+SHARED_INDEX_MAGIC = b'SMMAP'
+
+# Arrays start on cache-line boundaries
+_ALIGNMENT = 64
+
+class StringTable:
+    """
+    Read-only table of UTF-8 strings stored as one byte blob plus an offsets array.
+
+    Strings are decoded on access. Tables written in sorted order also support
+    binary-search lookup of a string's ID.
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray, buffer: mmap.mmap, blob_start: int):
+        self._offsets = offsets
+        self._blob = blob
+        self._buffer = buffer
+        self._blob_start = blob_start
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def find(self, value: str) -> Optional[int]:
+        """Return the ID of ``value`` in a sorted table, or None if it is absent."""
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self) and self[low] == value else None
+
+    def containing(self, value: str) -> set:
+        """Return the IDs of every string that contains ``value``."""
+        needle = value.encode('utf-8')
+        start, end = self._blob_start, self._blob_start + len(self._blob)
+        ids = set()
+        position = self._buffer.find(needle, start, end)
+        while position != -1:
+            relative = position - self._blob_start
+            i = int(np.searchsorted(self._offsets, relative, side='right')) - 1
+            # An occurrence spanning two strings is not a match
+            if relative + len(needle) <= self._offsets[i + 1]:
+                ids.add(i)
+            position = self._buffer.find(needle, position + 1, end)
+        return ids
+
+class _SymptomIds:
+    """Mapping view from known symptom to symptom ID, answered by binary search of the string table."""
+
+    def __init__(self, vocabulary: StringTable):
+        self._vocabulary = vocabulary
+
+    def __contains__(self, symptom: str) -> bool:
+        return self._vocabulary.find(symptom) is not None
+
+    def __getitem__(self, symptom: str) -> int:
+        symptom_id = self._vocabulary.find(symptom)
+        if symptom_id is None:
+            raise KeyError(symptom)
+        return symptom_id
+
+class SharedMatcherIndex(MatcherIndex):
+    """
+    MatcherIndex whose disease data lives in a memory-mapped file.
+
+    The symptom string table, disease names, CSR incidence arrays, symptom
+    postings, word index and per-disease constants are all views into one
+    read-only mapping. Every process that opens the same file shares the same
+    physical pages, so a worker's private memory holds little beyond the drug
+    reference and its query memos.
+    """
+
+    def __init__(self, path: str, prescription_data: Dict[str, Any], scoring_backend: str = 'python',
+                 version: int = 1, source_mtimes: Optional[Dict[str, float]] = None):
+        """
+        Map a shared index file written by ``write_shared_index``.
+
+        Args:
+            path: Path of the shared index file
+            prescription_data: Parsed drug reference, keyed by condition name
+            scoring_backend: 'vectorized' to also build the sparse-matrix scorer over the mapped arrays
+            version: Data version, incremented by the matcher on every load
+            source_mtimes: Modification times of the source files when they were read
+        """
+        self.version = version
+        self.source_mtimes = source_mtimes or {}
+        self.path = path
+
+        self.prescription_data = prescription_data
+        self.prescription_index = PrescriptionIndex(prescription_data)
+        self._formatted_prescriptions = {}
+
+        with open(path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = _read_header(self._buffer)
+        arrays = {name: np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=offset)
+                  for name, (dtype, offset, count) in self.header['arrays'].items()}
+        self._arrays = arrays
+
+        def table(name):
+            return StringTable(arrays[f'{name}_offsets'], arrays[f'{name}_bytes'], self._buffer,
+                               self.header['arrays'][f'{name}_bytes'][1])
+
+        self.vocabulary = table('symptoms')
+        self.symptom_ids = _SymptomIds(self.vocabulary)
+        self.tokens = table('tokens')
+        self._disease_names = table('diseases')
+        self.disease_indptr = arrays['disease_indptr']
+        self.disease_symptoms = arrays['disease_symptoms']
+        self.symptom_indptr = arrays['symptom_indptr']
+        self.symptom_diseases = arrays['symptom_diseases']
+        # A plain list, so scores computed from word counts stay Python floats, as with MatcherIndex
+        self.word_counts = arrays['word_counts'].tolist()
+
+        self.resolve_symptom = lru_cache(maxsize=RESOLUTION_CACHE_SIZE)(self._resolve_symptom)
+
+        self.vectorized_scorer = None
+        if scoring_backend == 'vectorized':
+            self.attach_vectorized_scorer()
+
+        self.typo_index = None
+        self.tfidf_scorer = None
+        self.naive_bayes_scorer = None
+
+        logger.info(f"Mapped shared matcher index with {self.disease_count} diseases "
+                    f"and {len(self.vocabulary)} symptoms from: {path}")
+
+    def __getstate__(self):
+        raise TypeError("SharedMatcherIndex cannot be pickled; map the file in each process instead")
+
+    def attach_vectorized_scorer(self) -> bool:
+        try:
+            from src.vectorized_scorer import VectorizedScorer
+        except ImportError as e:
+            logger.warning(f"Vectorized scoring unavailable ({e}), falling back to Python scoring")
+            return False
+
+        arrays = self._arrays
+        self.vectorized_scorer = VectorizedScorer(
+            self.vocabulary, _SymptomIds(self.vocabulary),
+            arrays['disease_indptr'], arrays['disease_symptoms'],
+            arrays['symptom_indptr'], arrays['symptom_diseases'],
+            arrays['word_counts'], known_counts=arrays['known_counts']
+        )
+        return True
+
+    # Word sets are split on demand rather than held for the whole vocabulary
+    def known_words(self, symptom: str) -> frozenset:
+        return frozenset(symptom.split())
+
+    @property
+    def disease_count(self) -> int:
+        return len(self._disease_names)
+
+    def disease_name(self, position: int) -> str:
+        return self._disease_names[position]
+
+    def known_count(self, position: int) -> int:
+        return int(self.disease_indptr[position + 1] - self.disease_indptr[position])
+
+    def incidence_arrays(self):
+        return self.disease_indptr, self.disease_symptoms
+
+    # Plain lists, so the Python scoring path works with ints rather than NumPy scalars
+    def known_symptom_ids(self, position: int) -> List[int]:
+        return self.disease_symptoms[self.disease_indptr[position]:self.disease_indptr[position + 1]].tolist()
+
+    def diseases_with(self, symptom: str) -> List[int]:
+        symptom_id = self.symptom_ids[symptom]
+        return self.symptom_diseases[self.symptom_indptr[symptom_id]:self.symptom_indptr[symptom_id + 1]].tolist()
+
+    def word_frequencies(self) -> Iterator[Tuple[str, int]]:
+        token_indptr = self._arrays['token_indptr']
+        for token_id, token in enumerate(self.tokens):
+            yield token, int(token_indptr[token_id + 1] - token_indptr[token_id])
+
+    def candidate_symptoms(self, user_symptom: str) -> set:
+        """
+        Return the known symptoms that can score above the match threshold for a user symptom.
+
+        Same rules as MatcherIndex, answered from the mapped string tables: a scan of
+        the symptom blob for known symptoms containing the user symptom, binary-search
+        lookups for known symptoms contained in it, and the word postings for shared words.
+        """
+        vocabulary = self.vocabulary
+        candidate_ids = vocabulary.containing(user_symptom)
+
+        substrings = {user_symptom[start:end]
+                      for start in range(len(user_symptom))
+                      for end in range(start + 1, len(user_symptom) + 1)}
+        for substring in substrings:
+            symptom_id = vocabulary.find(substring)
+            if symptom_id is not None:
+                candidate_ids.add(symptom_id)
+
+        token_indptr = self._arrays['token_indptr']
+        token_symptoms = self._arrays['token_symptoms']
+        shared_words = {}
+        for token in set(user_symptom.split()):
+            token_id = self.tokens.find(token)
+            if token_id is None:
+                continue
+            for symptom_id in token_symptoms[token_indptr[token_id]:token_indptr[token_id + 1]].tolist():
+                shared_words[symptom_id] = shared_words.get(symptom_id, 0) + 1
+        candidate_ids.update(symptom_id for symptom_id, count in shared_words.items() if count >= 2)
+
+        return {vocabulary[symptom_id] for symptom_id in candidate_ids}
+
+def _read_header(buffer) -> Dict[str, Any]:
+    """Parse and validate the JSON header at the start of a shared index file."""
+    if buffer[:len(SHARED_INDEX_MAGIC)] != SHARED_INDEX_MAGIC:
+        raise ValueError("Not a shared matcher index file")
+    start = len(SHARED_INDEX_MAGIC)
+    header_length = int.from_bytes(buffer[start:start + 4], 'big')
+    header = json.loads(buffer[start + 4:start + 4 + header_length].decode('utf-8'))
+    if header.get('format_version') != SHARED_INDEX_FORMAT_VERSION:
+        raise ValueError(f"Unsupported shared index format: {header.get('format_version')}")
+    return header
+
+def _string_arrays(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode strings as an offsets array and a byte blob."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+def write_shared_index(index: MatcherIndex, output_path: str, content_hash: str) -> None:
+    """
+    Write a MatcherIndex in the memory-mappable shared layout.
+
+    Args:
+        index: Snapshot built from the source data
+        output_path: Where to write the shared index file
+        content_hash: ``source_hash`` of the CSV and drug reference the snapshot came from
+    """
+    vocabulary = list(index.vocabulary)
+    symptom_ids = {symptom: i for i, symptom in enumerate(vocabulary)}
+    names = [str(index.disease_name(position)) for position in range(index.disease_count)]
+    disease_indptr = np.asarray(index.disease_indptr, dtype=np.int64)
+
+    tokens = {}
+    for symptom in vocabulary:
+        for token in set(symptom.split()):
+            tokens.setdefault(token, []).append(symptom_ids[symptom])
+    token_names = sorted(tokens)
+    token_indptr = [0]
+    token_symptoms = []
+    for token in token_names:
+        token_symptoms.extend(tokens[token])
+        token_indptr.append(len(token_symptoms))
+
+    arrays = {
+        'disease_indptr': disease_indptr,
+        'disease_symptoms': np.asarray(index.disease_symptoms, dtype=np.int32),
+        'symptom_indptr': np.asarray(index.symptom_indptr, dtype=np.int64),
+        'symptom_diseases': np.asarray(index.symptom_diseases, dtype=np.int32),
+        'token_indptr': np.array(token_indptr, dtype=np.int64),
+        'token_symptoms': np.array(token_symptoms, dtype=np.int32),
+        'known_counts': np.diff(disease_indptr).astype(np.float64),
+        'word_counts': np.asarray(index.word_counts, dtype=np.int32),
+    }
+    for name, strings in (('symptoms', vocabulary), ('diseases', names), ('tokens', token_names)):
+        arrays[f'{name}_offsets'], arrays[f'{name}_bytes'] = _string_arrays(strings)
+
+    # Lay out the arrays after a fixed-size header area, each on an aligned offset
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        layout[name] = [array.dtype.str, offset, int(array.size)]
+        offset += array.nbytes
+
+    def header_bytes(data_start):
+        header = {
+            'format_version': SHARED_INDEX_FORMAT_VERSION,
+            'content_hash': content_hash,
+            'arrays': {name: [dtype, data_start + rel, count] for name, (dtype, rel, count) in layout.items()}
+        }
+        return json.dumps(header).encode('utf-8')
+
+    # The header records absolute offsets, so grow the data start until the header fits before it
+    prefix = len(SHARED_INDEX_MAGIC) + 4
+    data_start = 0
+    header = header_bytes(data_start)
+    while prefix + len(header) > data_start:
+        data_start = -(-(prefix + len(header)) // _ALIGNMENT) * _ALIGNMENT
+        header = header_bytes(data_start)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SHARED_INDEX_MAGIC)
+        f.write(len(header).to_bytes(4, 'big'))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][1])
+            f.write(array.tobytes())
+        # Make sure an empty trailing array still lies inside the file
+        f.truncate(max(f.tell(), data_start + offset))
+
+    os.replace(tmp_path, output_path)
+    logger.info(f"Wrote shared matcher index to: {output_path}")
+
+def shared_index_hash(path: str) -> Optional[str]:
+    """Return the source content hash recorded in a shared index file, or None if unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return _read_header(buffer).get('content_hash')
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable shared matcher index {path}: {e}")
+        return None
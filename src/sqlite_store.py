@@ -0,0 +1,404 @@
+# /src/sqlite_store.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.matcher_index import MatcherIndex, RESOLUTION_CACHE_SIZE
+from src.prescriptions import PrescriptionIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the schema changes so stale stores are rejected
+SQLITE_STORE_FORMAT_VERSION = 1
+
+# Number of symptom rows and symptom name lookups memoized per open store
+SYMPTOM_CACHE_SIZE = 65536
+
+# Number of disease symptom counts memoized per open store; ranking reads one per candidate
+DISEASE_CACHE_SIZE = 65536
+
+# Rows inserted per executemany call while importing
+IMPORT_BATCH_SIZE = 10000
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_MAX_PARAMETERS = 900
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- IDs follow alphabetical order, like the symptom IDs of an in-memory MatcherIndex
+CREATE TABLE symptoms (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    word_count INTEGER NOT NULL
+);
+
+-- Positions follow the order of the source CSV
+CREATE TABLE diseases (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    symptom_count INTEGER NOT NULL
+);
+CREATE INDEX diseases_by_name ON diseases (name, position);
+
+-- The primary key answers disease -> symptoms and the covering index symptom -> diseases
+CREATE TABLE disease_symptom (
+    disease INTEGER NOT NULL REFERENCES diseases (position),
+    symptom INTEGER NOT NULL REFERENCES symptoms (id),
+    PRIMARY KEY (disease, symptom)
+) WITHOUT ROWID;
+CREATE INDEX disease_symptom_by_symptom ON disease_symptom (symptom, disease);
+
+CREATE TABLE symptom_words (
+    word TEXT NOT NULL,
+    symptom INTEGER NOT NULL REFERENCES symptoms (id),
+    PRIMARY KEY (word, symptom)
+) WITHOUT ROWID;
+
+-- Drug reference conditions in file order, which partial condition lookups depend on
+CREATE TABLE prescriptions (
+    position INTEGER PRIMARY KEY,
+    condition TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+# Trigram full-text index over the symptom names, answering substring searches
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE symptoms_fts USING fts5 (name, content='symptoms', content_rowid='id', tokenize='trigram');
+INSERT INTO symptoms_fts (symptoms_fts) VALUES ('rebuild');
+"""
+
+def _batches(rows: Iterable[Tuple], size: int = IMPORT_BATCH_SIZE) -> Iterator[List[Tuple]]:
+    """Split an iterable of rows into lists of at most ``size`` rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _chunks(values: List[str], size: int = _MAX_PARAMETERS) -> Iterator[List[str]]:
+    """Split query parameters into lists small enough to bind in one statement."""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def build_sqlite_store(csv_path: str, drug_reference_path: str, output_path: str) -> Dict[str, int]:
+    """
+    Import the disease CSV and drug reference JSON into an on-disk SQLite store.
+
+    The CSV is streamed twice, once to collect the symptom vocabulary and once
+    to insert the diseases, so the import holds the vocabulary in memory but
+    never the disease table. The store is written next to its destination and
+    renamed into place, so matchers never open a partially written file.
+
+    Args:
+        csv_path: Path to the disease-symptom CSV file
+        drug_reference_path: Path to the drug reference JSON file; a missing file imports no prescriptions
+        output_path: Where to write the SQLite store
+
+    Returns:
+        Dictionary with the number of imported ``diseases``, ``symptoms`` and ``prescriptions``.
+    """
+    from src.data_loader import iter_disease_symptom_records
+
+    # Sorted so that symptom IDs, and therefore tie-breaking, match an in-memory index
+    vocabulary = sorted({symptom for _, symptoms in iter_disease_symptom_records(csv_path) for symptom in symptoms})
+    symptom_ids = {symptom: i for i, symptom in enumerate(vocabulary)}
+
+    prescription_data = {}
+    if os.path.exists(drug_reference_path):
+        with open(drug_reference_path, 'r', encoding='utf-8') as f:
+            prescription_data = json.load(f)
+    else:
+        logger.warning(f"Prescription data file not found at: {drug_reference_path}")
+
+    tmp_path = f"{output_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        # The file is renamed into place only once complete, so the import needs no journal
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(SCHEMA)
+
+        connection.executemany("INSERT INTO symptoms (id, name, word_count) VALUES (?, ?, ?)",
+                               ((i, symptom, len(symptom.split())) for i, symptom in enumerate(vocabulary)))
+        connection.executemany("INSERT INTO symptom_words (word, symptom) VALUES (?, ?)",
+                               ((token, i) for i, symptom in enumerate(vocabulary) for token in set(symptom.split())))
+
+        disease_count = 0
+        def disease_rows():
+            nonlocal disease_count
+            for disease, symptoms in iter_disease_symptom_records(csv_path):
+                known_ids = sorted({symptom_ids[symptom] for symptom in symptoms})
+                yield disease_count, disease, known_ids
+                disease_count += 1
+
+        for batch in _batches(disease_rows()):
+            connection.executemany("INSERT INTO diseases (position, name, symptom_count) VALUES (?, ?, ?)",
+                                   ((position, disease, len(known_ids)) for position, disease, known_ids in batch))
+            connection.executemany("INSERT INTO disease_symptom (disease, symptom) VALUES (?, ?)",
+                                   ((position, symptom_id) for position, _, known_ids in batch
+                                    for symptom_id in known_ids))
+
+        connection.executemany("INSERT INTO prescriptions (position, condition, data) VALUES (?, ?, ?)",
+                               ((position, condition, json.dumps(data))
+                                for position, (condition, data) in enumerate(prescription_data.items())))
+
+        try:
+            connection.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            # Substring searches fall back to scanning the symptoms table
+            logger.warning(f"FTS5 trigram index unavailable ({e}), building the store without it")
+
+        connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ('format_version', str(SQLITE_STORE_FORMAT_VERSION)),
+            ('disease_count', str(disease_count)),
+            ('symptom_count', str(len(vocabulary))),
+        ])
+        connection.commit()
+        connection.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, output_path)
+    logger.info(f"Imported {disease_count} diseases, {len(vocabulary)} symptoms and "
+                f"{len(prescription_data)} prescription conditions into SQLite store: {output_path}")
+    return {'diseases': disease_count, 'symptoms': len(vocabulary), 'prescriptions': len(prescription_data)}
+
+class _SymptomNames:
+    """Sequence of known symptoms indexed by symptom ID, read from the store."""
+
+    def __init__(self, store: 'SQLiteMatcherIndex'):
+        self._store = store
+
+    def __len__(self):
+        return self._store.symptom_count
+
+    def __getitem__(self, symptom_id: int) -> str:
+        return self._store.symptom_row(symptom_id)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for (name,) in self._store.connection.execute("SELECT name FROM symptoms ORDER BY id"):
+            yield name
+
+class _WordCounts:
+    """Number of words of every known symptom, indexed by symptom ID."""
+
+    def __init__(self, store: 'SQLiteMatcherIndex'):
+        self._store = store
+
+    def __len__(self):
+        return self._store.symptom_count
+
+    def __getitem__(self, symptom_id: int) -> int:
+        return self._store.symptom_row(symptom_id)[1]
+
+class _SymptomIds:
+    """Mapping view from known symptom to symptom ID, answered by the unique index on symptom names."""
+
+    def __init__(self, store: 'SQLiteMatcherIndex'):
+        self._store = store
+
+    def __contains__(self, symptom: str) -> bool:
+        return self._store.symptom_id(symptom) is not None
+
+    def __getitem__(self, symptom: str) -> int:
+        symptom_id = self._store.symptom_id(symptom)
+        if symptom_id is None:
+            raise KeyError(symptom)
+        return symptom_id
+
+class SQLiteMatcherIndex(MatcherIndex):
+    """
+    MatcherIndex whose disease data lives in an on-disk SQLite store.
+
+    Nothing that grows with the number of diseases is held in memory: disease
+    names, symptom lists and postings are read through indexed queries as
+    candidates are generated and scored, and only bounded memos of symptom rows
+    and resolutions are kept. Substring candidates come from an FTS5 trigram
+    index over the symptom names when the store has one.
+
+    The array-based vectorized and naive Bayes scorers need the whole
+    incidence matrix in memory, so they are unavailable on this index and
+    matching uses the pure Python scorer. Each thread reads through its own
+    read-only connection.
+    """
+
+    def __init__(self, path: str, scoring_backend: str = 'python', version: int = 1,
+                 source_mtimes: Optional[Dict[str, float]] = None):
+        """
+        Open a store written by ``build_sqlite_store``.
+
+        Args:
+            path: Path of the SQLite store
+            scoring_backend: Accepted for interface compatibility; 'vectorized' falls back to Python scoring
+            version: Data version, incremented by the matcher on every load
+            source_mtimes: Modification times of the source files when they were read
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"SQLite store not found at: {path}")
+
+        self.version = version
+        self.source_mtimes = source_mtimes or {}
+        self.path = path
+        self._uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        self._local = threading.local()
+
+        meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if meta.get('format_version') != str(SQLITE_STORE_FORMAT_VERSION):
+            raise ValueError(f"Unsupported SQLite store format: {meta.get('format_version')}")
+        self._disease_count = int(meta['disease_count'])
+        self.symptom_count = int(meta['symptom_count'])
+        self.has_fts = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'symptoms_fts'").fetchone() is not None
+
+        self.prescription_data = {condition: json.loads(data) for condition, data in self.connection.execute(
+            "SELECT condition, data FROM prescriptions ORDER BY position")}
+        self.prescription_index = PrescriptionIndex(self.prescription_data)
+        self._formatted_prescriptions = {}
+
+        self.vocabulary = _SymptomNames(self)
+        self.symptom_ids = _SymptomIds(self)
+        self.word_counts = _WordCounts(self)
+        self.symptom_row = lru_cache(maxsize=SYMPTOM_CACHE_SIZE)(self._symptom_row)
+        self.symptom_id = lru_cache(maxsize=SYMPTOM_CACHE_SIZE)(self._symptom_id)
+        self.known_count = lru_cache(maxsize=DISEASE_CACHE_SIZE)(self._known_count)
+
+        self.resolve_symptom = lru_cache(maxsize=RESOLUTION_CACHE_SIZE)(self._resolve_symptom)
+
+        self.vectorized_scorer = None
+        if scoring_backend == 'vectorized':
+            self.attach_vectorized_scorer()
+
+        self.typo_index = None
+        self.tfidf_scorer = None
+        self.naive_bayes_scorer = None
+
+        logger.info(f"Opened SQLite store with {self._disease_count} diseases "
+                    f"and {self.symptom_count} symptoms from: {path}")
+
+    def __getstate__(self):
+        raise TypeError("SQLiteMatcherIndex cannot be pickled; open the store in each process instead")
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Read-only connection to the store owned by the calling thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._uri, uri=True)
+            self._local.connection = connection
+        return connection
+
+    def attach_vectorized_scorer(self) -> bool:
+        logger.warning("Vectorized scoring is unavailable on a SQLite store, falling back to Python scoring")
+        return False
+
+    def attach_naive_bayes_scorer(self) -> bool:
+        logger.warning("Naive Bayes ranking is unavailable on a SQLite store, falling back to heuristic ranking")
+        return False
+
+    def _symptom_row(self, symptom_id: int) -> Tuple[str, int]:
+        """Return the name and word count of a known symptom."""
+        row = self.connection.execute("SELECT name, word_count FROM symptoms WHERE id = ?",
+                                      (int(symptom_id),)).fetchone()
+        if row is None:
+            raise IndexError(symptom_id)
+        return row
+
+    def _symptom_id(self, symptom: str) -> Optional[int]:
+        """Return the ID of a known symptom, or None if the store does not list it."""
+        row = self.connection.execute("SELECT id FROM symptoms WHERE name = ?", (symptom,)).fetchone()
+        return row[0] if row is not None else None
+
+    # Word sets are split on demand rather than held for the whole vocabulary
+    def known_words(self, symptom: str) -> frozenset:
+        return frozenset(symptom.split())
+
+    @property
+    def disease_count(self) -> int:
+        return self._disease_count
+
+    def disease_name(self, position: int) -> str:
+        row = self.connection.execute("SELECT name FROM diseases WHERE position = ?", (int(position),)).fetchone()
+        if row is None:
+            raise IndexError(position)
+        return row[0]
+
+    def _known_count(self, position: int) -> int:
+        """Return the number of distinct known symptoms of the disease at ``position``."""
+        row = self.connection.execute("SELECT symptom_count FROM diseases WHERE position = ?",
+                                      (int(position),)).fetchone()
+        return row[0]
+
+    # Rows are read from the store one at a time instead
+    def incidence_arrays(self):
+        return None
+
+    def known_symptom_ids(self, position: int) -> List[int]:
+        return [symptom_id for (symptom_id,) in self.connection.execute(
+            "SELECT symptom FROM disease_symptom WHERE disease = ? ORDER BY symptom", (int(position),))]
+
+    def diseases_with(self, symptom: str) -> List[int]:
+        symptom_id = self.symptom_ids[symptom]
+        return [position for (position,) in self.connection.execute(
+            "SELECT disease FROM disease_symptom WHERE symptom = ? ORDER BY disease", (symptom_id,))]
+
+    def word_frequencies(self) -> Iterator[Tuple[str, int]]:
+        yield from self.connection.execute("SELECT word, COUNT(*) FROM symptom_words GROUP BY word")
+
+    def candidate_symptoms(self, user_symptom: str) -> set:
+        """
+        Return the known symptoms that can score above the match threshold for a user symptom.
+
+        Same rules as MatcherIndex, answered with indexed queries: the trigram index
+        for known symptoms containing the user symptom, name lookups for known symptoms
+        contained in it, and the word table for shared words.
+        """
+        connection = self.connection
+
+        # Trigram matches ignore case, so they are confirmed with an exact substring test
+        if self.has_fts and len(user_symptom) >= 3:
+            phrase = '"' + user_symptom.replace('"', '""') + '"'
+            rows = connection.execute("SELECT name FROM symptoms_fts WHERE symptoms_fts MATCH ?", (phrase,))
+        else:
+            rows = connection.execute("SELECT name FROM symptoms WHERE instr(name, ?) > 0", (user_symptom,))
+        candidates = {name for (name,) in rows if user_symptom in name}
+
+        substrings = list({user_symptom[start:end]
+                           for start in range(len(user_symptom))
+                           for end in range(start + 1, len(user_symptom) + 1)})
+        for chunk in _chunks(substrings):
+            placeholders = ', '.join('?' * len(chunk))
+            candidates.update(name for (name,) in connection.execute(
+                f"SELECT name FROM symptoms WHERE name IN ({placeholders})", chunk))
+
+        words = list(set(user_symptom.split()))
+        if len(words) >= 2:
+            placeholders = ', '.join('?' * len(words))
+            candidates.update(name for (name,) in connection.execute(
+                f"SELECT s.name FROM symptom_words w JOIN symptoms s ON s.id = w.symptom "
+                f"WHERE w.word IN ({placeholders}) GROUP BY w.symptom HAVING COUNT(*) >= 2", words))
+
+        return candidates
+
+    def close(self) -> None:
+        """Close the calling thread's connection; it is reopened on next use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -2,45 +2,387 @@
 
 import os
 import json
+import heapq
 import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+
+from src.matcher_index import MatcherIndex, MATCH_THRESHOLD
+from src.match_metrics import MatchMetrics, NULL_TIMINGS, timings_for
+from src.query_cache import QueryCache
+from src.typo_index import MAX_EDIT_DISTANCE
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Available implementations of the disease scoring formula
+SCORING_BACKENDS = ('python', 'vectorized')
+
+# Ways of resolving a user symptom to known symptoms
+SIMILARITY_MODES = ('rules', 'tfidf')
+
+# Ways of ranking diseases once the user symptoms are resolved
+RANKING_MODES = ('heuristic', 'naive_bayes')
+
+# Where the disease data is held while serving queries
+STORAGE_BACKENDS = ('memory', 'sqlite')
+
+# Number of top matches suggest_symptoms weighs when no candidates are given
+SUGGESTION_CANDIDATES = 50
+
+# Candidates scored between deadline checks when match_symptoms has a time budget
+DEADLINE_CHECK_INTERVAL = 16
+
+# Number of queries sent to a batch worker process at a time
+BATCH_CHUNK_SIZE = 64
+
+# Files in the project's data directory that the path arguments default to
+DEFAULT_DATA_FILES = {
+    'data_path': 'disease_symptom_database_300.csv',
+    'drug_reference_path': 'drug_reference.json',
+    'index_path': 'matcher_index.bin',
+    'shared_index_path': 'matcher_index.mmap',
+    'store_path': 'matcher_store.sqlite',
+}
+
+def default_data_path(argument: str) -> str:
+    """Return the file a SymptomMatcher path argument defaults to, such as ``'data_path'``."""
+    return str(Path(__file__).parent.parent / 'data' / DEFAULT_DATA_FILES[argument])
+
+# Matcher owned by a batch worker process, built once by _init_batch_worker
+_worker_matcher = None
+
+def _init_batch_worker(matcher_config: Dict[str, Any]):
+    """Load the matcher in a batch worker process."""
+    global _worker_matcher
+    _worker_matcher = SymptomMatcher(**matcher_config)
+
+def _match_batch_chunk(queries: List[Tuple[str, ...]], top_n: int) -> List[Tuple[Tuple[str, ...], List[Dict[str, Any]]]]:
+    """Match a chunk of normalized queries in a batch worker process."""
+    return [(query, _worker_matcher.match_symptoms(list(query), top_n=top_n)) for query in queries]
+
 class SymptomMatcher:
     """
     Matches user-reported symptoms against a database of diseases and their symptoms.
     Also provides prescription information when available.
     """
     
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, scoring_backend: str = 'python',
+                 cache_size: int = 0, cache_ttl: Optional[float] = None,
+                 drug_reference_path: str = None, index_path: str = None,
+                 use_compiled_index: bool = True, shared_index_path: str = None,
+                 collect_metrics: bool = False, typo_tolerance: int = 0,
+                 similarity_mode: str = 'rules', ranking_mode: str = 'heuristic',
+                 storage_backend: str = 'memory', store_path: str = None):
         """
         Initialize the SymptomMatcher with disease and symptom data.
         
         Args:
             data_path: Path to the disease-symptom CSV file. If not provided, will use the default path.
+            scoring_backend: 'python' to score diseases one by one, or 'vectorized' to score them
+                with sparse-matrix operations (requires NumPy and SciPy). Both produce the same ranking.
+            cache_size: Number of match_symptoms results to keep in an LRU cache. 0 disables caching.
+            cache_ttl: Seconds a cached result stays valid, or None to keep results until evicted.
+            drug_reference_path: Path to the drug reference JSON file. If not provided, will use the default path.
+            index_path: Path to the compiled index built by scripts/build_matcher_index.py.
+                If not provided, will use the default path.
+            use_compiled_index: Load the compiled index when it matches the current data files,
+                instead of parsing the CSV and JSON.
+            shared_index_path: Path to the memory-mapped index built with --shared. When it matches
+                the current data files it is preferred over the compiled index, so every process on
+                the host shares one copy of the disease data. If not provided, will use the default path.
+            collect_metrics: Record per-stage durations and counters of every query in ``self.metrics``.
+                Disabled by default; when off, the hot path only makes a few no-op calls.
+            typo_tolerance: Maximum number of edits (1 or 2) a misspelled word of a user symptom may
+                be corrected by, so "diarhea" still matches "diarrhea". Words shorter than four letters
+                are never corrected and words shorter than seven take at most one edit. 0 disables it;
+                any other value raises ValueError.
+            similarity_mode: 'rules' for the exact, substring and shared-word rules, or 'tfidf' to also
+                resolve free-text phrases to the known symptoms closest by character n-gram TF-IDF cosine
+                similarity (requires scikit-learn).
+            ranking_mode: 'heuristic' for the weighted match ratio and coverage score, or 'naive_bayes'
+                to rank by the posterior probability of a smoothed naive Bayes model of the disease table
+                (requires NumPy and SciPy). In 'naive_bayes' mode ``match_score`` is each match's share of
+                the posterior among the matches returned, and ``posterior`` the probability over every disease.
+            storage_backend: 'memory' to load the disease data into memory, or 'sqlite' to serve it from
+                the on-disk store built by scripts/build_matcher_index.py --sqlite, keeping memory flat
+                however large the database is. The SQLite store always uses Python scoring and
+                heuristic ranking.
+            store_path: Path to the SQLite store. If not provided, will use the default path.
         """
+        if scoring_backend not in SCORING_BACKENDS:
+            raise ValueError(f"Unknown scoring backend '{scoring_backend}'. Expected one of {SCORING_BACKENDS}")
+        self.scoring_backend = scoring_backend
+        if typo_tolerance not in range(MAX_EDIT_DISTANCE + 1):
+            raise ValueError(f"typo_tolerance must be between 0 and {MAX_EDIT_DISTANCE}, got {typo_tolerance!r}")
+        self.typo_tolerance = typo_tolerance
+        if similarity_mode not in SIMILARITY_MODES:
+            raise ValueError(f"Unknown similarity mode '{similarity_mode}'. Expected one of {SIMILARITY_MODES}")
+        self.similarity_mode = similarity_mode
+        if ranking_mode not in RANKING_MODES:
+            raise ValueError(f"Unknown ranking mode '{ranking_mode}'. Expected one of {RANKING_MODES}")
+        self.ranking_mode = ranking_mode
+        if storage_backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend '{storage_backend}'. Expected one of {STORAGE_BACKENDS}")
+        self.storage_backend = storage_backend
+        
         if data_path is None:
-            project_root = Path(__file__).parent.parent
-            data_path = project_root / 'data' / 'disease_symptom_database_300.csv'
-            data_path = str(data_path)
+            data_path = default_data_path('data_path')
+        if drug_reference_path is None:
+            drug_reference_path = default_data_path('drug_reference_path')
+        if index_path is None:
+            index_path = default_data_path('index_path')
+        if shared_index_path is None:
+            shared_index_path = default_data_path('shared_index_path')
+        if store_path is None:
+            store_path = default_data_path('store_path')
 
         self.data_path = data_path
+        self.drug_reference_path = drug_reference_path
+        self.index_path = index_path
+        self.shared_index_path = shared_index_path
+        self.store_path = store_path
+        self.use_compiled_index = use_compiled_index
         logger.info(f"Initializing SymptomMatcher with data from: {self.data_path}")
         
+        # Optional cache of match results; entries are tagged with the data version they came from
+        self.query_cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        
+        # Optional per-stage instrumentation of match_symptoms
+        self.metrics = MatchMetrics() if collect_metrics else None
+        
+        # Queries that ran with a time budget, and how many of them ran out of it
+        self._budget_lock = threading.Lock()
+        self.budgeted_queries = 0
+        self.budget_exceeded = 0
+        
+        # Serializes rebuilds only; queries never take this lock
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher = None
+        
+        self._index = self._build_index(version=1)
+        
+    @property
+    def data_version(self) -> int:
+        """Version of the data currently being served, incremented on every reload."""
+        return self._index.version
+        
+    @property
+    def disease_data(self):
+        """
+        DataFrame of the disease data currently being served, rebuilt from the index on every access.
+        
+        Matching never uses it; it exists for callers that want to inspect the data with pandas.
+        """
+        import pandas as pd
+        
+        records = list(self._index.disease_records)
+        return pd.DataFrame({
+            'disease': [disease for disease, _ in records],
+            'symptoms': [list(known_symptoms) for _, known_symptoms in records],
+            'disease_clean': [str(disease).lower().strip() for disease, _ in records],
+        })
+        
+    @property
+    def prescription_data(self) -> Dict[str, Any]:
+        """Drug reference data currently being served."""
+        return self._index.prescription_data
+        
+    @property
+    def prescription_index(self):
+        """Condition lookup over the drug reference currently being served."""
+        return self._index.prescription_index
+        
+    def _source_mtimes(self) -> Dict[str, Optional[float]]:
+        """Return the modification times of the files the data is loaded from."""
+        # A SQLite store is rebuilt by the importer, so it is the only file to watch
+        paths = (self.store_path,) if self.storage_backend == 'sqlite' else (self.data_path, self.drug_reference_path)
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+        
+    def _build_index(self, version: int) -> MatcherIndex:
+        """Load the disease and prescription data from disk and build a new snapshot."""
+        index = self._load_index(version)
+        if self.typo_tolerance:
+            index.attach_typo_index(self.typo_tolerance)
+        if self.similarity_mode == 'tfidf' and not index.attach_tfidf_scorer():
+            self.similarity_mode = 'rules'
+        if self.ranking_mode == 'naive_bayes' and not index.attach_naive_bayes_scorer():
+            self.ranking_mode = 'heuristic'
+        return index
+        
+    def _load_index(self, version: int) -> MatcherIndex:
+        """Load the snapshot from a compiled index if one is current, otherwise from the source files."""
+        # Taken before reading, so a file that changes during the load is picked up next time
+        source_mtimes = self._source_mtimes()
+        
+        if self.storage_backend == 'sqlite':
+            from src.sqlite_store import SQLiteMatcherIndex
+            index = SQLiteMatcherIndex(self.store_path, scoring_backend=self.scoring_backend, version=version,
+                                       source_mtimes=source_mtimes)
+            self.scoring_backend = 'python'
+            return index
+        
+        if self.use_compiled_index:
+            index = self._load_compiled_index(version, source_mtimes)
+            if index is not None:
+                return index
+        
+        # Load prescription data
+        prescription_data = self._load_prescription_data()
+        logger.info(f"Loaded prescription data for {len(prescription_data)} conditions")
+        
+        # The index is built straight from the CSV stream, so no DataFrame is ever materialized
         try:
-            from src.data_loader import load_disease_symptom_data
-            self.disease_data = load_disease_symptom_data(self.data_path)
-            logger.info(f"Loaded {len(self.disease_data)} disease entries")
+            from src.data_loader import iter_disease_symptom_records
+            index = MatcherIndex(iter_disease_symptom_records(self.data_path), prescription_data,
+                                 scoring_backend=self.scoring_backend, version=version,
+                                 source_mtimes=source_mtimes)
+            logger.info(f"Loaded {index.disease_count} disease entries")
         except Exception as e:
             logger.error(f"Failed to load disease data: {e}", exc_info=True)
             raise
+        
+        if self.scoring_backend == 'vectorized' and index.vectorized_scorer is None:
+            self.scoring_backend = 'python'
+        return index
+        
+    def _load_compiled_index(self, version: int, source_mtimes: Dict[str, Optional[float]]) -> Optional[MatcherIndex]:
+        """Load the shared or compiled index if it was built from the current data files."""
+        from src.index_snapshot import load_index_snapshot, source_hash
+        
+        if not os.path.exists(self.shared_index_path) and not os.path.exists(self.index_path):
+            return None
+        content_hash = source_hash(self.data_path, self.drug_reference_path)
+        
+        if os.path.exists(self.shared_index_path):
+            from src.shared_index import SharedMatcherIndex, shared_index_hash
+            if shared_index_hash(self.shared_index_path) == content_hash:
+                index = SharedMatcherIndex(self.shared_index_path, self._load_prescription_data(),
+                                           scoring_backend=self.scoring_backend, version=version,
+                                           source_mtimes=source_mtimes)
+                if self.scoring_backend == 'vectorized' and index.vectorized_scorer is None:
+                    self.scoring_backend = 'python'
+                return index
+            logger.info(f"Shared matcher index is out of date, ignoring: {self.shared_index_path}")
+        
+        index = load_index_snapshot(self.index_path, content_hash)
+        if index is None:
+            return None
+        
+        index.version = version
+        index.source_mtimes = source_mtimes
+        if self.scoring_backend == 'vectorized' and not index.attach_vectorized_scorer():
+            self.scoring_backend = 'python'
+        logger.info(f"Loaded {index.disease_count} disease entries from compiled index")
+        return index
+        
+    def reload(self, background: bool = False):
+        """
+        Reload the disease CSV and drug reference JSON from disk.
+        
+        The new data and indexes are built while queries keep being served from the
+        current snapshot, then swapped in with a single reference assignment. Queries
+        already running finish on the snapshot they started with, and cached match
+        results from the old data are invalidated. If the rebuild fails, the current
+        data stays in place.
+        
+        Args:
+            background: Rebuild in a daemon thread and return immediately
             
-        # Load prescription data
-        self.prescription_data = self._load_prescription_data()
-        logger.info(f"Loaded prescription data for {len(self.prescription_data)} conditions")
+        Returns:
+            The started thread if ``background`` is set, otherwise True if new data was swapped in.
+        """
+        if background:
+            thread = threading.Thread(target=self.reload, name='SymptomMatcherReload', daemon=True)
+            thread.start()
+            return thread
+            
+        with self._reload_lock:
+            logger.info(f"Reloading SymptomMatcher data from: {self.data_path}")
+            try:
+                index = self._build_index(self._index.version + 1)
+            except Exception as e:
+                logger.error(f"Reload failed, still serving data version {self._index.version}: {e}", exc_info=True)
+                return False
+                
+            self._index = index
+            if self.query_cache is not None:
+                self.query_cache.clear()
+            logger.info(f"Now serving data version {index.version}")
+            return True
+            
+    def check_for_updates(self) -> bool:
+        """
+        Reload if the disease CSV or drug reference JSON changed since they were last read.
+        
+        Returns:
+            True if new data was swapped in.
+        """
+        if self._source_mtimes() == self._index.source_mtimes:
+            return False
+        return self.reload()
+        
+    def start_watching(self, interval: float = 5.0):
+        """
+        Poll the data files in a daemon thread and reload them when they change.
+        
+        Args:
+            interval: Seconds between modification time checks
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+            
+        def watch():
+            while not self._watch_stop.wait(interval):
+                try:
+                    self.check_for_updates()
+                except Exception as e:
+                    logger.error(f"Error checking data files for updates: {e}", exc_info=True)
+                    
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=watch, name='SymptomMatcherWatcher', daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching data files for changes every {interval} seconds")
+        
+    def stop_watching(self):
+        """Stop the thread started by start_watching."""
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return the query cache counters, or None if caching is disabled."""
+        return self.query_cache.stats() if self.query_cache is not None else None
+        
+    def budget_stats(self) -> Dict[str, int]:
+        """Return how many queries ran with a time budget and how many of those ran out of it."""
+        with self._budget_lock:
+            return {'budgeted_queries': self.budgeted_queries, 'budget_exceeded': self.budget_exceeded}
+        
+    def _record_budget(self, complete: bool, timings=NULL_TIMINGS) -> None:
+        """Count one query that ran with a time budget."""
+        with self._budget_lock:
+            self.budgeted_queries += 1
+            if not complete:
+                self.budget_exceeded += 1
+        if not complete:
+            timings.count('budget_exceeded')
+            logger.warning("Time budget ran out, returning the best matches scored so far")
+        
+    def metrics_stats(self) -> Optional[Dict[str, Any]]:
+        """Return the per-stage timings and counters, or None if metrics are disabled."""
+        return self.metrics.stats() if self.metrics is not None else None
         
     def _load_prescription_data(self) -> Dict[str, Any]:
         """
@@ -50,8 +392,7 @@ class SymptomMatcher:
             Dictionary containing prescription information keyed by condition name.
         """
         try:
-            project_root = Path(__file__).parent.parent
-            drug_ref_path = project_root / 'data' / 'drug_reference.json'
+            drug_ref_path = Path(self.drug_reference_path)
             
             if not drug_ref_path.exists():
                 logger.warning(f"Prescription data file not found at: {drug_ref_path}")
@@ -70,92 +411,256 @@ class SymptomMatcher:
             logger.error(f"Error loading prescription data: {e}", exc_info=True)
             return {}
     
-    def _get_prescription_info(self, disease_name):
-        """Get prescription information for a specific disease."""
-        if not self.prescription_data:
-            return None
+    @staticmethod
+    def _resolve_with(index: MatcherIndex, user_symptoms) -> Dict[str, List[Tuple[str, float]]]:
+        """Resolve user symptoms against one snapshot's vocabulary."""
+        resolved = {}
+        for symptom in user_symptoms:
+            if not symptom or not isinstance(symptom, str):
+                continue
+            symptom = symptom.strip().lower()
+            if symptom and symptom not in resolved:
+                resolved[symptom] = list(index.resolve_symptom(symptom))
+        return resolved
+
+    def resolve_symptoms(self, user_symptoms) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Resolve user symptoms against the deduplicated vocabulary of known symptoms.
+        
+        Each distinct symptom is compared with the vocabulary once and the result is
+        memoized, so repeated symptoms across queries cost a dictionary lookup.
+        
+        Args:
+            user_symptoms: Iterable of symptom strings as entered by the user
             
-        # Try to find an exact match first
-        for condition_name, condition_data in self.prescription_data.items():
-            if condition_name.lower() == disease_name.lower():
-                return self._format_prescription_info(condition_data)
-                
-        # Try partial match if no exact match found
-        for condition_name, condition_data in self.prescription_data.items():
-            if disease_name.lower() in condition_name.lower():
-                return self._format_prescription_info(condition_data)
-                
-        return None
+        Returns:
+            Dictionary mapping each normalized user symptom to a list of
+            ``(known_symptom, similarity)`` tuples, best match first. Symptoms
+            with no match above the threshold map to an empty list.
+        """
+        return self._resolve_with(self._index, user_symptoms)
+
+    @staticmethod
+    def _build_match_result(index: MatcherIndex, position: int, matching_symptoms: Dict[str, float],
+                            match_score: float) -> Dict[str, Any]:
+        """Build the result record returned by match_symptoms for one scored disease."""
+        disease = index.disease_name(position)
         
-    def _format_prescription_info(self, condition_data):
-        """Format prescription information from the condition data."""
-        recommendations = []
+        # Get prescription info if available
+        prescription = index.prescription_info(disease)
         
-        # Add OTC medications if available
-        if 'otc_medications' in condition_data and condition_data['otc_medications']:
-            for med in condition_data['otc_medications']:
-                recommendations.append(f"{med['name']}: {med['dosage']} - {med['purpose']}")
+        return {
+            'disease': disease,
+            'match_score': round(match_score, 4),
+            'matching_symptoms': sorted(matching_symptoms.keys()),
+            'known_symptom_count': index.known_count(position),
+            'prescription': prescription or {},
+            'match_quality': round(sum(matching_symptoms.values()) / len(matching_symptoms), 2),
+            'position': position
+        }
+
+    @staticmethod
+    def _score_disease(known_ids, scores_by_user: List[Dict[int, float]], word_counts):
+        """
+        Apply the match score formula to one disease.
         
-        # Add home remedies if available
-        if 'home_remedies' in condition_data and condition_data['home_remedies']:
-            recommendations.extend(condition_data['home_remedies'])
+        Args:
+            known_ids: The disease's known symptom IDs, sorted
+            scores_by_user: For each user symptom, its resolved known symptom IDs mapped to similarity
+            word_counts: Number of words in each known symptom, indexed by ID
+            
+        Returns:
+            Tuple ``(match_score, matching_ids)``; ``matching_ids`` maps matched symptom IDs
+            to similarity and is empty if nothing matched.
+        """
+        # Match each user symptom to the best known symptom this disease lists
+        matching_ids = {}
+        for scores in scores_by_user:
+            best_match, best_score = None, MATCH_THRESHOLD
+            for known in known_ids:
+                score = scores.get(known, 0.0)
+                if score > best_score:
+                    best_match, best_score = known, score
+            if best_match is not None:
+                matching_ids[best_match] = max(matching_ids.get(best_match, 0), best_score)
         
-        # Add medical attention note if available
-        if 'medical_attention' in condition_data and condition_data['medical_attention']:
-            recommendations.append(f"Medical Attention: {condition_data['medical_attention']}")
+        if not matching_ids:
+            return 0.0, matching_ids
         
-        # Add a note to consult a doctor if symptoms persist
-        recommendations.append("If symptoms persist or worsen, please consult a healthcare professional.")
+        # Calculate match score with weights
+        match_ratio = sum(matching_ids.values()) / len(known_ids)
+        symptom_coverage = len(matching_ids) / len(scores_by_user)
         
-        return {
-            'recommendations': recommendations
-        }
+        # More weight to diseases where we matched more of the user's symptoms
+        match_score = (match_ratio * 0.6) + (symptom_coverage * 0.4)
+        
+        # Boost score for more specific symptoms (longer symptom descriptions)
+        symptom_specificity = sum(word_counts[known] for known in matching_ids) / len(matching_ids)
+        match_score = min(1.0, match_score * (1.0 + 0.1 * symptom_specificity))
+        
+        return match_score, matching_ids
 
-    def _symptom_similarity(self, symptom1: str, symptom2: str) -> float:
-        """Calculate similarity between two symptoms using Levenshtein distance."""
-        # Simple implementation - can be replaced with more sophisticated string similarity if needed
-        if not symptom1 or not symptom2:
-            return 0.0
-            
-        # Exact match
-        if symptom1 == symptom2:
-            return 1.0
-            
-        # Check for substring matches
-        if symptom1 in symptom2 or symptom2 in symptom1:
-            return 0.8
-            
-        # Check for common words
-        words1 = set(symptom1.split())
-        words2 = set(symptom2.split())
-        common_words = words1.intersection(words2)
-        
-        if common_words:
-            # More weight to matches with more common words
-            return min(0.7, 0.3 + 0.1 * len(common_words))
-            
-        return 0.0
-        
-    def _find_best_symptom_match(self, user_symptom: str, known_symptoms: set) -> tuple:
-        """Find the best matching symptom from known symptoms."""
-        best_match = None
-        best_score = 0.5  # Minimum threshold
-        
-        for known_symptom in known_symptoms:
-            score = self._symptom_similarity(user_symptom, known_symptom)
-            if score > best_score:
-                best_score = score
-                best_match = known_symptom
-                
-        return best_match, best_score
+    @classmethod
+    def _rank(cls, index: MatcherIndex, resolved: Dict[str, List[Tuple[str, float]]], top_n: int,
+              timings=NULL_TIMINGS, deadline: Optional[float] = None):
+        """
+        Rank the diseases of one snapshot for a resolved query with whichever scorer it has.
+        
+        Args:
+            deadline: ``time.perf_counter()`` value to stop scoring at. Only the pure Python
+                scorer can stop early; the array-based scorers always run to completion.
+        
+        Returns:
+            Tuple ``(results, match_count, complete)``: up to ``top_n`` result records sorted
+            by match score (highest first), the number of diseases with any match, and False
+            if the deadline cut the ranking short.
+        """
+        if index.naive_bayes_scorer is not None:
+            ranked, diseases_with_matches = index.naive_bayes_scorer.rank(resolved, top_n, timings)
+            results = []
+            for position, share, matching_symptoms, probability in ranked:
+                result = cls._build_match_result(index, position, matching_symptoms, share)
+                result['posterior'] = probability
+                results.append(result)
+            timings.mark('prescriptions')
+            return results, diseases_with_matches, True
+        scorer = index.vectorized_scorer
+        if scorer is not None:
+            ranked, diseases_with_matches = scorer.rank(resolved, top_n, timings)
+            results = [cls._build_match_result(index, position, matching_symptoms, match_score)
+                       for position, match_score, matching_symptoms in ranked]
+            timings.mark('prescriptions')
+            return results, diseases_with_matches, True
+        return cls._rank_candidates(index, resolved, top_n, timings, deadline)
+
+    @classmethod
+    def _rank_candidates(cls, index: MatcherIndex, resolved: Dict[str, List[Tuple[str, float]]], top_n: int,
+                         timings=NULL_TIMINGS, deadline: Optional[float] = None):
+        """
+        Score diseases matching a resolved query in pure Python and keep the best ``top_n``.
+        
+        Each candidate first gets a cheap upper bound on its score from the number of user
+        symptoms it can match. Candidates are visited best bound first and the scan stops
+        once no remaining bound can enter the current top N, so only the survivors are
+        scored exactly and turned into result records.
+        
+        With a deadline, postings are scanned rarest user symptom first, since rare symptoms
+        single out the most relevant diseases, and both the scan and the scoring stop once
+        the deadline passes, keeping the best candidates scored so far.
+        
+        Returns:
+            Tuple ``(results, match_count, complete)``: up to ``top_n`` result records sorted
+            by match score (highest first), the number of diseases with any match, and False
+            if the deadline cut the ranking short.
+        """
+        clock = time.perf_counter
+        complete = True
+        
+        # Every match contributes at most best_similarity and at most max_words words
+        best_similarity, max_words = 0.0, 0
+        for known_matches in resolved.values():
+            for known, score in known_matches:
+                best_similarity = max(best_similarity, score)
+                max_words = max(max_words, index.word_counts[index.symptom_ids[known]])
+        
+        query = list(resolved.values())
+        if deadline is not None:
+            query.sort(key=lambda known_matches: sum(len(index.diseases_with(known)) for known, _ in known_matches))
+        
+        # Count how many user symptoms each disease can match
+        hits = {}
+        for known_matches in query:
+            # The rarest symptom's postings are always scanned so there is something to return
+            if deadline is not None and hits and clock() > deadline:
+                complete = False
+                break
+            # A single posting slice has no duplicates, so only unions need a set
+            if len(known_matches) == 1:
+                positions = index.diseases_with(known_matches[0][0])
+            else:
+                positions = set()
+                for known, _ in known_matches:
+                    positions.update(index.diseases_with(known))
+            for position in positions:
+                hits[position] = hits.get(position, 0) + 1
+        
+        timings.mark('scan')
+        if top_n <= 0 or not hits:
+            return [], len(hits), complete
+        
+        user_count = len(resolved)
+        boost = 1.0 + 0.1 * max_words
+        def upper_bound(position):
+            matched = hits[position]
+            known_count = index.known_count(position)
+            bound = ((matched * best_similarity / known_count) * 0.6 + (matched / user_count) * 0.4) * boost
+            # Small margin so float rounding can never push an exact score above its bound
+            return min(1.0, bound + 1e-9)
+        
+        symptom_ids = index.symptom_ids
+        scores_by_user = [{symptom_ids[known]: score for known, score in known_matches}
+                          for known_matches in resolved.values()]
+        word_counts = index.word_counts
+        
+        # Min-heap of the best candidates so far, ordered as the final ranking:
+        # rounded score, then known symptom count, then database order
+        heap = []
+        order = sorted(hits, key=lambda p: (-upper_bound(p), p))
+        timings.mark('scan')
+        scored = comparisons = 0
+        for position in order:
+            if len(heap) == top_n and round(upper_bound(position), 4) < heap[0][0]:
+                break
+            # Reading the clock costs more than scoring a small disease, so only check it periodically,
+            # and only once top_n candidates have been scored
+            if (deadline is not None and scored >= top_n and scored % DEADLINE_CHECK_INTERVAL == 0
+                    and clock() > deadline):
+                complete = False
+                break
+            known_ids = index.known_symptom_ids(position)
+            scored += 1
+            comparisons += len(known_ids) * user_count
+            try:
+                match_score, matching_ids = cls._score_disease(known_ids, scores_by_user, word_counts)
+            except Exception as e:
+                logger.error(f"Error processing disease {index.disease_name(position)}: {e}", exc_info=True)
+                continue
+            if not matching_ids:
+                continue
+            entry = (round(match_score, 4), len(known_ids), -position, match_score, matching_ids)
+            if len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry[:3] > heap[0][:3]:
+                heapq.heapreplace(heap, entry)
+        
+        timings.count('diseases_scanned', scored)
+        timings.count('comparisons', comparisons)
+        timings.mark('scoring')
+        
+        heap.sort(key=lambda entry: entry[:3], reverse=True)
+        timings.mark('sort')
+        results = []
+        vocabulary = index.vocabulary
+        for _, _, negative_position, match_score, matching_ids in heap:
+            matching_symptoms = {vocabulary[known]: score for known, score in matching_ids.items()}
+            logger.debug(f"Match found for {index.disease_name(-negative_position)}: "
+                         f"{matching_symptoms} (score: {match_score:.2f})")
+            results.append(cls._build_match_result(index, -negative_position, matching_symptoms, match_score))
+        timings.mark('prescriptions')
+        return results, len(hits), complete
 
-    def match_symptoms(self, user_symptoms: List[str], top_n: int = 5) -> List[Dict[str, Any]]:
+    def match_symptoms(self, user_symptoms: List[str], top_n: int = 5, budget_ms: Optional[float] = None,
+                       deadline: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Match user symptoms against known diseases and return top matches.
         
         Args:
             user_symptoms: List of symptoms reported by the user
             top_n: Maximum number of top matches to return
+            budget_ms: Milliseconds the query may take. When they run out, the best matches
+                scored so far are returned instead of the exhaustive ranking.
+            deadline: Absolute ``time.perf_counter()`` value to stop at, such as the deadline
+                of the request being served. The earlier of this and ``budget_ms`` applies.
             
         Returns:
             List of dictionaries containing disease matches and scores, sorted by match score (highest first).
@@ -165,89 +670,292 @@ class SymptomMatcher:
             - matching_symptoms: List of symptoms that matched
             - known_symptom_count: Total number of known symptoms for this disease
             - prescription: Dictionary with prescription info if available, empty dict otherwise
+            - position: Row of the disease in the database, which tells apart rows sharing a name
+            - posterior: Only in 'naive_bayes' ranking mode, the posterior probability of the
+              disease over the whole database; ``match_score`` is then its share of the
+              posterior among the returned matches
+            - partial: Only present, and True, when the time budget ran out before every
+              candidate was scored. A budget can run out before any match is found, so use
+              match_symptoms_with_status to tell that apart from an empty result.
+        """
+        return self.match_symptoms_with_status(user_symptoms, top_n, budget_ms, deadline)[0]
+
+    def match_symptoms_with_status(self, user_symptoms: List[str], top_n: int = 5,
+                                   budget_ms: Optional[float] = None,
+                                   deadline: Optional[float] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Match user symptoms like match_symptoms and also report whether the time budget ran out.
+        
+        Args:
+            user_symptoms: List of symptoms reported by the user
+            top_n: Maximum number of top matches to return
+            budget_ms: Milliseconds the query may take
+            deadline: Absolute ``time.perf_counter()`` value to stop at
+            
+        Returns:
+            Tuple of (results, partial), where results is what match_symptoms returns and partial
+            is True when the budget ran out before every candidate was scored, even if no match
+            was found by then
         """
+        if budget_ms is not None:
+            budget_deadline = time.perf_counter() + budget_ms / 1000.0
+            deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+        
         if not user_symptoms or not isinstance(user_symptoms, (list, set)):
             logger.warning("Invalid user_symptoms provided. Expected a non-empty list.")
-            return []
+            return [], False
             
+        metrics = self.metrics
+        timings = timings_for(metrics)
+        
         # Clean and normalize user symptoms
         try:
-            user_symptoms = {s.strip().lower() for s in user_symptoms if s and isinstance(s, str)}
+            # Deduplicated in input order, the order similarities are summed in
+            user_symptoms = list(dict.fromkeys(s.strip().lower() for s in user_symptoms if s and isinstance(s, str)))
             if not user_symptoms:
                 logger.warning("No valid symptoms provided after cleaning.")
-                return []
+                return [], False
+            timings.mark('normalize')
                 
             logger.info(f"Matching against symptoms: {user_symptoms}")
+            timings.mark('logging')
             
-            results = []
-            total_diseases = 0
-            diseases_with_matches = 0
+            # Use one snapshot for the whole query, even if a reload swaps in new data meanwhile
+            index = self._index
             
-            # Process each disease in the database
-            for _, row in self.disease_data.iterrows():
-                try:
-                    total_diseases += 1
-                    disease = row.get('disease', 'Unknown Disease')
-                    known_symptoms = set(row.get('symptoms', []))
-                    
-                    if not known_symptoms:
-                        logger.debug(f"No symptoms found for disease: {disease}")
-                        continue
-                        
-                    # Calculate matching symptoms with similarity scores
-                    matching_symptoms = {}
-                    
-                    # Try to match each user symptom to the best matching known symptom
-                    for user_symptom in user_symptoms:
-                        best_match, score = self._find_best_symptom_match(user_symptom, known_symptoms)
-                        if best_match and score > 0.5:  # Only consider good matches
-                            matching_symptoms[best_match] = max(matching_symptoms.get(best_match, 0), score)
-                    
-                    if matching_symptoms:
-                        # Calculate match score with weights
-                        match_ratio = sum(matching_symptoms.values()) / len(known_symptoms)
-                        symptom_coverage = len(matching_symptoms) / len(user_symptoms)
-                        
-                        # More weight to diseases where we matched more of the user's symptoms
-                        match_score = (match_ratio * 0.6) + (symptom_coverage * 0.4)
-                        
-                        # Boost score for more specific symptoms (longer symptom descriptions)
-                        symptom_specificity = sum(len(s.split()) for s in matching_symptoms) / len(matching_symptoms)
-                        match_score = min(1.0, match_score * (1.0 + 0.1 * symptom_specificity))
-                        
-                        logger.debug(f"Match found for {disease}: {matching_symptoms} (score: {match_score:.2f})")
-                        diseases_with_matches += 1
-                        
-                        # Get prescription info if available
-                        prescription = self._get_prescription_info(disease)
-                        
-                        results.append({
-                            'disease': disease,
-                            'match_score': round(match_score, 4),
-                            'matching_symptoms': sorted(matching_symptoms.keys()),
-                            'known_symptom_count': len(known_symptoms),
-                            'prescription': prescription or {},
-                            'match_quality': round(sum(matching_symptoms.values()) / len(matching_symptoms), 2)
-                        })
-                        
-                except Exception as e:
-                    logger.error(f"Error processing disease {disease}: {e}", exc_info=True)
-                    continue
+            cache_key = (index.version, frozenset(user_symptoms), top_n)
+            if self.query_cache is not None:
+                cached = self.query_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug("Returning cached matches")
+                    timings.count('cache_hits')
+                    timings.mark('cache')
+                    if deadline is not None:
+                        self._record_budget(True)
+                    if metrics is not None:
+                        metrics.record(timings)
+                    return list(cached), False
+                timings.mark('cache')
+            
+            total_diseases = index.disease_count
+            
+            # Resolve every user symptom against the vocabulary once for this query
+            resolved = self._resolve_with(index, user_symptoms)
+            timings.mark('resolve')
             
-            # Sort by match score (descending) and get top N
-            results.sort(key=lambda x: (-x['match_score'], -x['known_symptom_count']))
+            results, diseases_with_matches, complete = self._rank(index, resolved, top_n, timings, deadline)
+            if deadline is not None:
+                self._record_budget(complete, timings)
+            if not complete:
+                for result in results:
+                    result['partial'] = True
+            timings.count('matches_found', diseases_with_matches)
             
-            logger.info(f"Processed {total_diseases} diseases, found {diseases_with_matches} with matching symptoms")
-            logger.info(f"Returning top {min(top_n, len(results))} matches out of {len(results)} total matches")
+            logger.info(f"Found {diseases_with_matches} of {total_diseases} diseases with matching symptoms")
+            logger.info(f"Returning top {min(top_n, diseases_with_matches)} matches out of {diseases_with_matches} total matches")
             
             # Log the top matches for debugging
             for i, result in enumerate(results[:min(3, len(results))], 1):
                 logger.info(f"Match #{i}: {result['disease']} (score: {result['match_score']:.2f}), "
                            f"matching symptoms: {result['matching_symptoms']}")
             
-            return results[:top_n]
+            timings.mark('logging')
+            
+            results = results[:top_n]
+            # Partial results would keep serving a less exhaustive answer after the spike is over
+            if self.query_cache is not None and complete:
+                self.query_cache.put(cache_key, results)
+                timings.mark('cache')
+            if metrics is not None:
+                metrics.record(timings)
+            return list(results), not complete
             
         except Exception as e:
             logger.error(f"Error in match_symptoms: {e}", exc_info=True)
+            return [], False
+
+    def start_session(self, top_n: int = 5):
+        """
+        Start a MatchSession for symptoms reported one at a time.
+
+        Each added or removed symptom only updates the diseases it touches, instead of
+        matching the whole symptom list again.
+
+        Args:
+            top_n: Number of matches the session reports after each step
+
+        Returns:
+            A new MatchSession on the data currently being served.
+        """
+        if self.ranking_mode != 'heuristic':
+            raise ValueError("Match sessions only support the 'heuristic' ranking mode")
+        from src.match_session import MatchSession
+        return MatchSession(self, top_n=top_n)
+
+    def suggest_symptoms(self, user_symptoms: List[str], limit: int = 1,
+                         candidates: Optional[List[Dict[str, Any]]] = None,
+                         exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Suggest the follow-up symptoms that best tell the current candidate diseases apart.
+        
+        Every known symptom not yet asked about is scored by its expected information
+        gain over the candidate distribution, computed for the whole vocabulary at once
+        over the candidates' rows of the disease-symptom incidence matrix (requires NumPy).
+        
+        Args:
+            user_symptoms: Symptoms reported so far
+            limit: Maximum number of symptoms to suggest
+            candidates: Current matches as returned by ``match_symptoms``, each disease weighted
+                by its match score. Defaults to the top matches for ``user_symptoms``.
+            exclude: Further symptoms already asked about, such as ones the user denied
+            
+        Returns:
+            Up to ``limit`` ``(symptom, information_gain)`` tuples, most informative first,
+            with the gain in bits. Empty if no symptom separates the candidates.
+        """
+        try:
+            import numpy as np
+            from src.information_gain import symptom_information_gain
+        except ImportError as e:
+            logger.warning(f"Follow-up suggestions unavailable ({e})")
             return []
+        
+        # Use one snapshot for the whole suggestion, even if a reload swaps in new data meanwhile
+        index = self._index
+        if candidates is None:
+            candidates = self.match_symptoms(user_symptoms, top_n=SUGGESTION_CANDIDATES)
+        if limit <= 0:
+            return []
+        # Weighted by database row, so diseases sharing a name keep their own symptom sets
+        positions = np.fromiter((match['position'] for match in candidates), dtype=np.int64, count=len(candidates))
+        weight_values = np.fromiter((match['match_score'] for match in candidates), dtype=np.float64,
+                                    count=len(candidates))
+        # Only the candidates' rows of the incidence matrix matter, in database order
+        order = np.argsort(positions, kind='stable')
+        keep = weight_values[order] > 0
+        positions, weight_values = positions[order][keep], weight_values[order][keep]
+        if not len(positions):
             return []
+        
+        incidence = index.incidence_arrays()
+        if incidence is not None:
+            # The matrix is in memory, so the rows are gathered from it in one vectorized step
+            disease_indptr, disease_symptoms = incidence
+            starts = disease_indptr[positions]
+            lengths = disease_indptr[positions + 1] - starts
+            indptr = np.zeros(len(positions) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=indptr[1:])
+            symptoms = disease_symptoms[np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])]
+        else:
+            # Otherwise the rows are read one at a time
+            rows = [index.known_symptom_ids(position) for position in positions.tolist()]
+            indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(row) for row in rows])
+            symptoms = np.fromiter((symptom_id for row in rows for symptom_id in row), dtype=np.int64,
+                                   count=indptr[-1])
+        gain = symptom_information_gain(indptr, symptoms, len(index.vocabulary), np.arange(len(positions)),
+                                        weight_values)
+        
+        # Symptoms already reported, or the known symptoms they resolve to, count as asked
+        asked = list(user_symptoms or []) + list(exclude)
+        for known_matches in self._resolve_with(index, asked).values():
+            for known, _ in known_matches:
+                gain[index.symptom_ids[known]] = 0.0
+        
+        # Stable sort so equally informative symptoms come out alphabetically
+        order = np.argsort(-gain, kind='stable')[:limit]
+        suggestions = [(index.vocabulary[int(i)], float(gain[i])) for i in order if gain[i] > 0]
+        logger.debug(f"Suggested follow-up symptoms: {suggestions}")
+        return suggestions
+
+    @staticmethod
+    def _normalize_query(user_symptoms) -> Tuple[str, ...]:
+        """Return the normalized symptoms match_symptoms would use for a query, in the order it uses them."""
+        if not user_symptoms or not isinstance(user_symptoms, (list, set)):
+            return ()
+        return tuple(dict.fromkeys(s.strip().lower() for s in user_symptoms if s and isinstance(s, str)))
+
+    def iter_match_symptoms_many(self, symptom_lists: Iterable[List[str]], top_n: int = 5,
+                                 processes: Optional[int] = None) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Match a batch of symptom lists, yielding each result as soon as it is ready.
+        
+        Queries that normalize to the same symptom set are matched once, and every
+        query shares the memoized vocabulary resolution.
+        
+        Args:
+            symptom_lists: Symptom lists, each as accepted by match_symptoms
+            top_n: Maximum number of top matches to return per query
+            processes: Number of worker processes to fan out to. None or 1 matches in this process.
+            
+        Yields:
+            ``(index, matches)`` tuples, where ``index`` is the position of the query in
+            ``symptom_lists``. Duplicate queries receive the same matches list.
+        """
+        # Each distinct symptom set is matched in the order its first query gave it, as match_symptoms
+        # would for that query; later queries with the same set share the result, as with the query cache
+        indices_by_query = {}
+        queries = []
+        for index, user_symptoms in enumerate(symptom_lists):
+            query = self._normalize_query(user_symptoms)
+            indices = indices_by_query.get(frozenset(query))
+            if indices is None:
+                indices = indices_by_query[frozenset(query)] = []
+                queries.append(query)
+            indices.append(index)
+        
+        for query, matches in self._iter_unique_matches(queries, top_n, processes):
+            for index in indices_by_query[frozenset(query)]:
+                yield index, matches
+
+    def _worker_config(self) -> Dict[str, Any]:
+        """Constructor arguments that reproduce this matcher's data in another process."""
+        return {
+            'data_path': self.data_path,
+            'scoring_backend': self.scoring_backend,
+            'drug_reference_path': self.drug_reference_path,
+            'index_path': self.index_path,
+            'shared_index_path': self.shared_index_path,
+            'use_compiled_index': self.use_compiled_index,
+            'typo_tolerance': self.typo_tolerance,
+            'similarity_mode': self.similarity_mode,
+            'ranking_mode': self.ranking_mode,
+            'storage_backend': self.storage_backend,
+            'store_path': self.store_path
+        }
+
+    def _iter_unique_matches(self, queries: List[Tuple[str, ...]], top_n: int,
+                             processes: Optional[int]) -> Iterator[Tuple[Tuple[str, ...], List[Dict[str, Any]]]]:
+        """Match distinct normalized queries, in this process or across a process pool."""
+        if not processes or processes <= 1 or len(queries) <= 1:
+            for query in queries:
+                yield query, self.match_symptoms(list(query), top_n=top_n) if query else []
+            return
+        
+        chunks = [queries[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(queries), BATCH_CHUNK_SIZE)]
+        logger.info(f"Matching {len(queries)} distinct queries across {processes} worker processes")
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker,
+                                 initargs=(self._worker_config(),)) as executor:
+            futures = [executor.submit(_match_batch_chunk, chunk, top_n) for chunk in chunks]
+            for future in as_completed(futures):
+                for query, matches in future.result():
+                    yield query, matches
+
+    def match_symptoms_many(self, symptom_lists: Iterable[List[str]], top_n: int = 5,
+                            processes: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Match a batch of symptom lists.
+        
+        Args:
+            symptom_lists: Symptom lists, each as accepted by match_symptoms
+            top_n: Maximum number of top matches to return per query
+            processes: Number of worker processes to fan out to. None or 1 matches in this process.
+            
+        Returns:
+            List of match_symptoms results, in the same order as ``symptom_lists``.
+        """
+        symptom_lists = list(symptom_lists)
+        results = [None] * len(symptom_lists)
+        for index, matches in self.iter_match_symptoms_many(symptom_lists, top_n=top_n, processes=processes):
+            results[index] = matches
+        return results
@@ -0,0 +1,59 @@
+# /src/tfidf_similarity.py
+
+import logging
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+logger = logging.getLogger(__name__)
+
+# Character n-gram lengths; short enough to survive inflections and typos, long enough to stay specific
+NGRAM_RANGE = (2, 4)
+
+# Most known symptoms one user phrase may resolve to through n-gram similarity
+MAX_TFIDF_MATCHES = 10
+
+class TfidfSymptomScorer:
+    """
+    Character n-gram TF-IDF model of the known-symptom vocabulary.
+
+    The vectorizer is fitted once per snapshot and the vocabulary matrix is kept,
+    so scoring a user phrase against every known symptom is one sparse
+    matrix-vector product. Rows are L2-normalized, so the product is the cosine
+    similarity.
+    """
+
+    def __init__(self, vocabulary: Iterable[str]):
+        """
+        Fit the vectorizer over the known symptoms.
+
+        Args:
+            vocabulary: Every known symptom, normalized
+        """
+        self.vocabulary = sorted(vocabulary)
+        self.vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=NGRAM_RANGE, sublinear_tf=True)
+        # Transposed once so each query is a single (1 x ngrams) @ (ngrams x symptoms) product
+        self.matrix_t = self.vectorizer.fit_transform(self.vocabulary).T.tocsr()
+
+        logger.info(f"Fitted character n-gram TF-IDF over {len(self.vocabulary)} symptoms "
+                    f"with {self.matrix_t.shape[0]} n-grams")
+
+    def similar(self, phrase: str, min_similarity: float, limit: int = MAX_TFIDF_MATCHES) -> List[Tuple[str, float]]:
+        """
+        Return the known symptoms most similar to a phrase.
+
+        Args:
+            phrase: Normalized user symptom
+            min_similarity: Cosine similarity a known symptom must exceed
+            limit: Maximum number of known symptoms to return
+
+        Returns:
+            Up to ``limit`` ``(known_symptom, similarity)`` tuples, most similar first.
+        """
+        similarities = (self.vectorizer.transform([phrase]) @ self.matrix_t).toarray().ravel()
+        candidates = np.flatnonzero(similarities > min_similarity)
+        # Vocabulary is sorted, so a stable sort on similarity breaks ties alphabetically
+        candidates = candidates[np.argsort(-similarities[candidates], kind='stable')[:limit]]
+        # Cosines can overshoot 1.0 by a rounding error
+        return [(self.vocabulary[i], min(1.0, float(similarities[i]))) for i in candidates]
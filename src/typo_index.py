@@ -0,0 +1,131 @@
+# /src/typo_index.py
+
+import logging
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest edit distance the index is built for
+MAX_EDIT_DISTANCE = 2
+
+def allowed_distance(word: str, max_distance: int = MAX_EDIT_DISTANCE) -> int:
+    """
+    Return how many edits a word of this length may be corrected by.
+
+    Short words tolerate fewer edits, otherwise "ache" would happily become "back".
+    """
+    if len(word) < 4:
+        return 0
+    if len(word) < 7:
+        return min(1, max_distance)
+    return min(2, max_distance)
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance between two words, counting a swap of
+    adjacent letters as one edit.
+
+    Gives up early and returns ``max_distance + 1`` once the distance is known to exceed the bound.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Return every string reachable from ``word`` by deleting up to ``distance`` characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+class SymSpellIndex:
+    """
+    Symmetric-delete spelling index over the words of the symptom vocabulary.
+
+    Every vocabulary word is stored under each string obtained by deleting up to
+    ``max_distance`` of its characters. A misspelled word is looked up by its own
+    deletes, so finding corrections takes a bounded number of dictionary lookups
+    instead of an edit distance computation against the whole vocabulary.
+    """
+
+    def __init__(self, word_frequencies: Dict[str, int], max_distance: int = MAX_EDIT_DISTANCE):
+        """
+        Args:
+            word_frequencies: Vocabulary words mapped to how many known symptoms use them;
+                more frequent words win ties between equally close corrections
+            max_distance: Largest number of edits a correction may take
+        """
+        self.max_distance = max_distance
+        self.word_frequencies = dict(word_frequencies)
+        self._deletes = {}
+        for word in self.word_frequencies:
+            for delete in _deletes(word, allowed_distance(word, max_distance)):
+                self._deletes.setdefault(delete, []).append(word)
+
+        logger.info(f"Built spelling index over {len(self.word_frequencies)} words "
+                    f"with {len(self._deletes)} delete entries")
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_frequencies
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """
+        Return the closest vocabulary word and its edit distance, or None if nothing is close enough.
+
+        Words already in the vocabulary are returned unchanged at distance 0.
+        """
+        if word in self.word_frequencies:
+            return word, 0
+
+        max_distance = allowed_distance(word, self.max_distance)
+        if max_distance == 0:
+            return None
+
+        best = None
+        seen = set()
+        for delete in _deletes(word, max_distance):
+            for candidate in self._deletes.get(delete, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(word, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                # Closest first, then the word more symptoms use, then alphabetical
+                key = (distance, -self.word_frequencies[candidate], candidate)
+                if best is None or key < best:
+                    best = key
+        return (best[2], best[0]) if best is not None else None
+
+    def correct_with_distance(self, phrase: str) -> Tuple[str, int]:
+        """
+        Replace every unknown word of a phrase with its closest vocabulary word, where there is one.
+
+        Returns:
+            The corrected phrase and the total edit distance over its corrected words.
+        """
+        words = []
+        distance = 0
+        for word in phrase.split():
+            match = self.lookup(word)
+            if match is None:
+                words.append(word)
+            else:
+                words.append(match[0])
+                distance += match[1]
+        return ' '.join(words), distance
@@ -0,0 +1,136 @@
+# /src/vectorized_scorer.py
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.match_metrics import NULL_TIMINGS
+
+logger = logging.getLogger(__name__)
+
+class VectorizedScorer:
+    """
+    Array-based implementation of the SymptomMatcher scoring formula.
+
+    Holds the disease x symptom incidence as a sparse matrix together with the
+    per-disease symptom counts and per-symptom word counts, so a query is scored
+    for every candidate disease with a handful of NumPy operations instead of a
+    Python loop per disease.
+    """
+
+    def __init__(self, vocabulary, symptom_ids, indptr: np.ndarray, indices: np.ndarray,
+                 postings_indptr: np.ndarray, postings_indices: np.ndarray, word_counts: np.ndarray,
+                 known_counts: np.ndarray = None):
+        """
+        Wrap prebuilt incidence arrays.
+
+        Args:
+            vocabulary: Sequence of known symptoms, indexed by symptom ID in alphabetical order
+            symptom_ids: Mapping from known symptom to symptom ID
+            indptr, indices: CSR layout of the disease x symptom incidence
+            postings_indptr, postings_indices: CSC layout of the same incidence (symptom -> diseases)
+            word_counts: Number of words in each known symptom, indexed by symptom ID
+            known_counts: Number of known symptoms per disease; derived from ``indptr`` if omitted
+        """
+        self.vocabulary = vocabulary
+        self.symptom_ids = symptom_ids
+        self.incidence = sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), indices, indptr),
+            shape=(len(indptr) - 1, len(vocabulary))
+        )
+        self._postings_indptr = postings_indptr
+        self._postings_indices = postings_indices
+        self.known_counts = np.asarray(known_counts if known_counts is not None else np.diff(indptr),
+                                       dtype=np.float64)
+        self.word_counts = np.asarray(word_counts, dtype=np.float64)
+
+        logger.info(f"Built {self.incidence.shape[0]}x{self.incidence.shape[1]} incidence matrix "
+                    f"with {self.incidence.nnz} entries")
+
+    def _diseases_for(self, symptom_id: int) -> np.ndarray:
+        """Return the row positions of diseases listing a symptom."""
+        start, end = self._postings_indptr[symptom_id], self._postings_indptr[symptom_id + 1]
+        return self._postings_indices[start:end]
+
+    def rank(self, resolved: Dict[str, List[Tuple[str, float]]], top_n: int, timings=NULL_TIMINGS):
+        """
+        Score and rank every disease matching a resolved query.
+
+        Args:
+            resolved: Output of ``SymptomMatcher.resolve_symptoms``
+            top_n: Number of ranked diseases to return
+            timings: QueryTimings to record the scan, scoring and sort stages into
+
+        Returns:
+            Tuple ``(ranked, match_count)`` where ``ranked`` lists up to ``top_n``
+            ``(position, match_score, matching_symptoms)`` tuples in rank order and
+            ``match_count`` is the number of diseases with any match.
+        """
+        positions, user_ids, ranks, symptom_ids, scores = [], [], [], [], []
+        for user_id, known_matches in enumerate(resolved.values()):
+            for rank, (known, score) in enumerate(known_matches):
+                symptom_id = self.symptom_ids[known]
+                diseases = self._diseases_for(symptom_id)
+                positions.append(diseases)
+                user_ids.append(np.full(len(diseases), user_id))
+                ranks.append(np.full(len(diseases), rank))
+                symptom_ids.append(np.full(len(diseases), symptom_id))
+                scores.append(np.full(len(diseases), score))
+
+        if not positions:
+            timings.mark('scan')
+            return [], 0
+
+        positions = np.concatenate(positions)
+        timings.count('comparisons', len(positions))
+        timings.mark('scan')
+        user_ids = np.concatenate(user_ids)
+        ranks = np.concatenate(ranks)
+        symptom_ids = np.concatenate(symptom_ids)
+        scores = np.concatenate(scores)
+
+        # Keep the best-ranked known symptom per (disease, user symptom) pair
+        order = np.lexsort((ranks, user_ids, positions))
+        positions, user_ids, symptom_ids, scores = (
+            positions[order], user_ids[order], symptom_ids[order], scores[order])
+        first = np.ones(len(positions), dtype=bool)
+        first[1:] = (positions[1:] != positions[:-1]) | (user_ids[1:] != user_ids[:-1])
+        positions, symptom_ids, scores = positions[first], symptom_ids[first], scores[first]
+
+        # A known symptom matched by several user symptoms counts once, at its best score
+        order = np.lexsort((-scores, symptom_ids, positions))
+        positions, symptom_ids, scores = positions[order], symptom_ids[order], scores[order]
+        first = np.ones(len(positions), dtype=bool)
+        first[1:] = (positions[1:] != positions[:-1]) | (symptom_ids[1:] != symptom_ids[:-1])
+        positions, symptom_ids, scores = positions[first], symptom_ids[first], scores[first]
+
+        candidates, starts, inverse = np.unique(positions, return_index=True, return_inverse=True)
+        score_sums = np.bincount(inverse, weights=scores)
+        match_counts = np.bincount(inverse).astype(np.float64)
+        word_sums = np.bincount(inverse, weights=self.word_counts[symptom_ids])
+        known_counts = self.known_counts[candidates]
+        timings.count('diseases_scanned', len(candidates))
+
+        match_ratio = score_sums / known_counts
+        symptom_coverage = match_counts / len(resolved)
+        match_scores = (match_ratio * 0.6) + (symptom_coverage * 0.4)
+        symptom_specificity = word_sums / match_counts
+        match_scores = np.minimum(1.0, match_scores * (1.0 + 0.1 * symptom_specificity))
+
+        # Same ordering as the Python path: score, then known symptom count, then database order
+        timings.mark('scoring')
+        order = np.lexsort((candidates, -known_counts, -np.round(match_scores, 4)))[:top_n]
+
+        ranked = []
+        ends = np.append(starts[1:], len(positions))
+        for i in order:
+            matching_symptoms = {
+                self.vocabulary[symptom_id]: float(score)
+                for symptom_id, score in zip(symptom_ids[starts[i]:ends[i]], scores[starts[i]:ends[i]])
+            }
+            ranked.append((int(candidates[i]), float(match_scores[i]), matching_symptoms))
+        timings.mark('sort')
+
+        return ranked, len(candidates)
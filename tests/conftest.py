@@ -0,0 +1,67 @@
+# /tests/conftest.py
+
+import logging
+import os
+import sys
+
+import pytest
+
+# Make the project root importable when pytest is run from anywhere
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.synthetic_data import write_dataset, generate_queries
+from src.symptom_matcher import SymptomMatcher
+
+# Small enough to build every backend in a few seconds, large enough for ties and pruning
+DATASET_DISEASES = 600
+DATASET_QUERIES = 80
+
+@pytest.fixture(scope='session', autouse=True)
+def quiet_logging():
+    """Per-query log lines would drown the test output."""
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+@pytest.fixture(scope='session')
+def dataset(tmp_path_factory):
+    """A seeded synthetic disease CSV and drug reference, with a mix of queries against them."""
+    data_dir = str(tmp_path_factory.mktemp('data'))
+    data = write_dataset(data_dir, DATASET_DISEASES, seed=7)
+    data['dir'] = data_dir
+    data['queries'] = [query['symptoms'] for query in
+                       generate_queries(data['diseases'], data['vocabulary'], DATASET_QUERIES, seed=7)]
+    return data
+
+@pytest.fixture(scope='session')
+def matcher_paths(dataset):
+    """SymptomMatcher path arguments that load the dataset from source, never from a compiled artifact."""
+    return {
+        'data_path': dataset['csv_path'],
+        'drug_reference_path': dataset['drug_reference_path'],
+        'index_path': os.path.join(dataset['dir'], 'missing_index.bin'),
+        'shared_index_path': os.path.join(dataset['dir'], 'missing_index.mmap'),
+    }
+
+@pytest.fixture(scope='session')
+def memory_matcher(matcher_paths):
+    return SymptomMatcher(**matcher_paths)
+
+@pytest.fixture(scope='session')
+def shared_matcher(dataset, matcher_paths):
+    pytest.importorskip('numpy')
+    from src.index_snapshot import build_shared_index
+    shared_path = os.path.join(dataset['dir'], 'matcher_index.mmap')
+    build_shared_index(dataset['csv_path'], dataset['drug_reference_path'], shared_path)
+    matcher = SymptomMatcher(**dict(matcher_paths, shared_index_path=shared_path))
+    assert type(matcher._index).__name__ == 'SharedMatcherIndex'
+    return matcher
+
+@pytest.fixture(scope='session')
+def sqlite_matcher(dataset, matcher_paths):
+    from src.sqlite_store import build_sqlite_store
+    store_path = os.path.join(dataset['dir'], 'matcher_store.sqlite')
+    build_sqlite_store(dataset['csv_path'], dataset['drug_reference_path'], store_path)
+    return SymptomMatcher(**matcher_paths, storage_backend='sqlite', store_path=store_path)
@@ -0,0 +1,35 @@
+# /tests/test_assistant.py
+
+import pytest
+
+from src.assistant import HealthAssistant
+from src.symptom_matcher import SymptomMatcher
+
+@pytest.fixture(scope='module')
+def assistant(matcher_paths):
+    return HealthAssistant(SymptomMatcher(**matcher_paths))
+
+@pytest.mark.parametrize('top_n', [3, 5])
+def test_diagnose_with_follow_up_matches_separate_calls(assistant, dataset, top_n):
+    pytest.importorskip('numpy')
+    for query in dataset['queries']:
+        results, follow_up = assistant.diagnose_with_follow_up(query, top_n=top_n)
+        assert results == assistant.diagnose(query, top_n=top_n), query
+        expected_follow_up = assistant.suggest_question(query) if results else None
+        assert follow_up == expected_follow_up, query
+
+def test_diagnose_with_follow_up_ranks_once(assistant, dataset, monkeypatch):
+    pytest.importorskip('numpy')
+    calls = []
+    match_symptoms = assistant.matcher.match_symptoms
+    monkeypatch.setattr(assistant.matcher, 'match_symptoms',
+                        lambda *args, **kwargs: calls.append(kwargs) or match_symptoms(*args, **kwargs))
+    assistant.diagnose_with_follow_up(dataset['queries'][0], top_n=3)
+    assert len(calls) == 1
+
+def test_diagnose_many_matches_diagnose(assistant, dataset):
+    queries = dataset['queries']
+    # The same symptoms in another order share the result of the first query that gave them
+    reordered = [list(reversed(query)) for query in queries[:10]]
+    expected = [assistant.diagnose(query) for query in queries]
+    assert assistant.diagnose_many(queries + reordered) == expected + expected[:10]
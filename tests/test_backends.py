@@ -0,0 +1,63 @@
+# /tests/test_backends.py
+
+import pytest
+
+from src.symptom_matcher import SymptomMatcher
+
+TOP_N = 10
+
+def assert_same_matches(expected_matcher, actual_matcher, queries):
+    for query in queries:
+        expected = expected_matcher.match_symptoms(query, top_n=TOP_N)
+        actual = actual_matcher.match_symptoms(query, top_n=TOP_N)
+        assert actual == expected, query
+        assert_python_floats(actual)
+
+def assert_python_floats(results):
+    # Equal values are not enough; NumPy scalars would leak into JSON output
+    for match in results:
+        assert type(match['match_score']) is float
+        assert type(match['match_quality']) is float
+
+def test_shared_index_matches_memory(memory_matcher, shared_matcher, dataset):
+    assert_same_matches(memory_matcher, shared_matcher, dataset['queries'])
+
+def test_shared_index_session_matches_memory(memory_matcher, shared_matcher, dataset):
+    for query in dataset['queries'][:20]:
+        expected, actual = memory_matcher.start_session(TOP_N), shared_matcher.start_session(TOP_N)
+        for symptom in query:
+            matches = actual.add(symptom)
+            assert matches == expected.add(symptom), query
+            assert_python_floats(matches)
+
+@pytest.fixture(scope='module')
+def vectorized_matcher(matcher_paths):
+    pytest.importorskip('numpy')
+    pytest.importorskip('scipy')
+    matcher = SymptomMatcher(**matcher_paths, scoring_backend='vectorized')
+    assert matcher._index.vectorized_scorer is not None
+    return matcher
+
+@pytest.fixture(scope='module')
+def sharded_matcher(matcher_paths):
+    from src.sharded_matcher import ShardedSymptomMatcher
+    with ShardedSymptomMatcher(shards=2, **matcher_paths) as matcher:
+        yield matcher
+
+def test_sqlite_store_matches_memory(memory_matcher, sqlite_matcher, dataset):
+    assert type(sqlite_matcher._index).__name__ == 'SQLiteMatcherIndex'
+    assert_same_matches(memory_matcher, sqlite_matcher, dataset['queries'])
+
+def test_vectorized_backend_matches_memory(memory_matcher, vectorized_matcher, dataset):
+    assert_same_matches(memory_matcher, vectorized_matcher, dataset['queries'])
+
+def test_sharded_matcher_matches_memory(memory_matcher, sharded_matcher, dataset):
+    assert_same_matches(memory_matcher, sharded_matcher, dataset['queries'])
+
+@pytest.mark.parametrize('top_n', [1, 3, 25])
+def test_backends_agree_on_every_top_n(memory_matcher, shared_matcher, sqlite_matcher, vectorized_matcher,
+                                       sharded_matcher, dataset, top_n):
+    for query in dataset['queries'][:20]:
+        expected = memory_matcher.match_symptoms(query, top_n=top_n)
+        for matcher in (shared_matcher, sqlite_matcher, vectorized_matcher, sharded_matcher):
+            assert matcher.match_symptoms(query, top_n=top_n) == expected, (type(matcher).__name__, query)
@@ -0,0 +1,49 @@
+# /tests/test_budget.py
+
+import time
+
+import pytest
+
+from src.symptom_matcher import SymptomMatcher
+
+@pytest.fixture
+def matcher(matcher_paths):
+    # A fresh matcher per test so budget_stats starts from zero
+    return SymptomMatcher(**matcher_paths)
+
+def multi_symptom_queries(dataset):
+    return [query for query in dataset['queries'] if len(query) >= 2]
+
+def test_expired_deadline_is_reported_partial(matcher, dataset):
+    query = multi_symptom_queries(dataset)[0]
+    results, partial = matcher.match_symptoms_with_status(query, deadline=time.perf_counter() - 1)
+    assert partial
+    assert all(result['partial'] for result in results)
+    assert matcher.budget_stats() == {'budgeted_queries': 1, 'budget_exceeded': 1}
+
+def test_zero_budget_is_reported_partial(matcher, dataset):
+    query = multi_symptom_queries(dataset)[0]
+    results, partial = matcher.match_symptoms_with_status(query, budget_ms=0)
+    assert partial
+    assert matcher.match_symptoms(query, budget_ms=0) == results
+
+def test_no_budget_is_never_partial(matcher, dataset):
+    for query in dataset['queries'][:10]:
+        results, partial = matcher.match_symptoms_with_status(query)
+        assert not partial
+        assert results == matcher.match_symptoms(query)
+        assert not any('partial' in result for result in results)
+    assert matcher.budget_stats() == {'budgeted_queries': 0, 'budget_exceeded': 0}
+
+def test_query_without_matches_is_not_partial(matcher):
+    assert matcher.match_symptoms_with_status(['zzzz qqqq xxxx'], budget_ms=1000) == ([], False)
+
+def test_sharded_budget_spent_before_any_shard_answers(matcher_paths, dataset):
+    from src.sharded_matcher import ShardedSymptomMatcher
+    with ShardedSymptomMatcher(shards=2, **matcher_paths) as sharded:
+        # Keep every worker busy so no shard can answer within the budget
+        for executor in sharded._executors:
+            executor.submit(time.sleep, 0.5)
+        results, partial = sharded.match_symptoms_with_status(dataset['queries'][0], budget_ms=0)
+        assert (results, partial) == ([], True)
+        assert sharded.budget_stats() == {'budgeted_queries': 1, 'budget_exceeded': 1}
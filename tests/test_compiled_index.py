@@ -0,0 +1,62 @@
+# /tests/test_compiled_index.py
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from src.index_snapshot import build_index_snapshot, load_index_snapshot, source_hash
+from src.symptom_matcher import SymptomMatcher
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loads the matcher from a compiled index in a fresh interpreter, with reading the CSV made to fail
+LOAD_SCRIPT = """
+import json, sys
+import src.data_loader
+def no_csv(csv_path):
+    raise AssertionError('read the CSV instead of the compiled index')
+src.data_loader.iter_disease_symptom_records = no_csv
+from src.symptom_matcher import SymptomMatcher
+matcher = SymptomMatcher(sys.argv[1], drug_reference_path=sys.argv[2], index_path=sys.argv[3],
+                         shared_index_path=sys.argv[4])
+print(json.dumps({'diseases': matcher._index.disease_count, 'pandas': 'pandas' in sys.modules}))
+"""
+
+@pytest.fixture
+def compiled(matcher_paths, tmp_path):
+    """A private copy of the data with a compiled index built from it."""
+    paths = dict(matcher_paths,
+                 data_path=shutil.copy(matcher_paths['data_path'], str(tmp_path / 'diseases.csv')),
+                 index_path=str(tmp_path / 'matcher_index.bin'))
+    build_index_snapshot(paths['data_path'], paths['drug_reference_path'], paths['index_path'])
+    return paths
+
+def current_hash(paths):
+    return source_hash(paths['data_path'], paths['drug_reference_path'])
+
+def test_current_index_loads(compiled, memory_matcher):
+    index = load_index_snapshot(compiled['index_path'], current_hash(compiled))
+    assert index is not None
+    assert index.disease_count == memory_matcher._index.disease_count
+
+def test_stale_index_is_rejected(compiled):
+    with open(compiled['data_path'], 'a', encoding='utf-8') as f:
+        f.write('Zebra fever,"zebra stripes"\n')
+    assert load_index_snapshot(compiled['index_path'], current_hash(compiled)) is None
+
+    # The matcher falls back to the changed CSV instead of serving the stale snapshot
+    matcher = SymptomMatcher(**compiled)
+    assert matcher.match_symptoms(['zebra stripes'])[0]['disease'] == 'Zebra fever'
+
+def test_loading_compiled_index_skips_pandas(compiled, memory_matcher, tmp_path):
+    env = dict(os.environ, PYTHONPATH=project_root)
+    completed = subprocess.run(
+        [sys.executable, '-c', LOAD_SCRIPT, compiled['data_path'], compiled['drug_reference_path'],
+         compiled['index_path'], compiled['shared_index_path']],
+        cwd=str(tmp_path), env=env, capture_output=True, text=True, check=True)
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert loaded == {'diseases': memory_matcher._index.disease_count, 'pandas': False}
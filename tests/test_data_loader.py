@@ -0,0 +1,52 @@
+# /tests/test_data_loader.py
+
+import pytest
+
+from src.data_loader import MISSING_VALUES, iter_disease_symptom_records, load_disease_symptom_data
+
+MESSY_CSV = '''Disease,Symptoms
+Flu,"fever, cough"
+
+Cold,"sneezing,  RUNNY NOSE  "
+Overflow,"rash",extra field
+Short row
+NoSymptoms,
+,"orphan symptom"
+NA,"headache"
+Migraine,NA
+Gout,"null"
+Pneumonia,"N/A"
+Measles,"n/a, rash"
+Bronchitis,", , "
+Asthma,"wheezing, shortness of breath"
+
+
+Anemia,"fatigue"
+'''
+
+def write_csv(tmp_path, text, name='diseases.csv'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def loaded_records(csv_path):
+    pytest.importorskip('pandas')
+    df = load_disease_symptom_data(csv_path)
+    return [(disease, symptoms) for disease, symptoms in zip(df['disease'], df['symptoms'])]
+
+@pytest.mark.filterwarnings('ignore:Skipping line')
+def test_streamed_rows_match_the_pandas_loader(tmp_path):
+    csv_path = write_csv(tmp_path, MESSY_CSV)
+    streamed = list(iter_disease_symptom_records(csv_path))
+    assert streamed == loaded_records(csv_path)
+    assert [disease for disease, _ in streamed] == ['Flu', 'Cold', 'Measles', 'Asthma', 'Anemia']
+
+@pytest.mark.parametrize('marker', sorted(MISSING_VALUES - {''}))
+def test_missing_value_markers_drop_the_row(tmp_path, marker):
+    csv_path = write_csv(tmp_path, f'Disease,Symptoms\n{marker},"fever"\nFlu,"{marker}"\nCold,"cough"\n')
+    streamed = list(iter_disease_symptom_records(csv_path))
+    assert streamed == loaded_records(csv_path)
+    assert streamed == [('Cold', ['cough'])]
+
+def test_streaming_matches_the_synthetic_dataset(dataset):
+    assert list(iter_disease_symptom_records(dataset['csv_path'])) == loaded_records(dataset['csv_path'])
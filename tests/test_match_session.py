@@ -0,0 +1,43 @@
+# /tests/test_match_session.py
+
+import random
+
+import pytest
+
+import src.match_session as match_session
+from src.symptom_matcher import SymptomMatcher
+
+@pytest.fixture(scope='module')
+def matcher(matcher_paths):
+    # Uncached, so every step is matched from scratch in the order given
+    return SymptomMatcher(**matcher_paths)
+
+def conversations(dataset, count=20, length=4):
+    """Long symptom lists built from consecutive queries, with repeats and removals mixed in."""
+    rng = random.Random(3)
+    queries = dataset['queries']
+    for start in range(0, count * length, length):
+        symptoms = [symptom for query in queries[start:start + length] for symptom in query]
+        yield rng, symptoms + [rng.choice(symptoms) for _ in range(3)]
+
+@pytest.mark.parametrize('scan_fraction', [0, match_session.DIRTY_SCAN_FRACTION, 10 ** 9])
+@pytest.mark.parametrize('top_n', [1, 5])
+def test_session_matches_match_symptoms_after_each_step(matcher, dataset, monkeypatch, scan_fraction, top_n):
+    # 0 always ranks from the sorted terms, a huge fraction always scans every disease
+    monkeypatch.setattr(match_session, 'DIRTY_SCAN_FRACTION', scan_fraction)
+    for rng, symptoms in conversations(dataset):
+        session = matcher.start_session(top_n)
+        current = []
+        for symptom in symptoms:
+            normalized = symptom.strip().lower()
+            if normalized in current and rng.random() < 0.5:
+                matches = session.remove(symptom)
+                current.remove(normalized)
+            else:
+                matches = session.add(symptom)
+                if normalized not in current:
+                    current.append(normalized)
+            assert session.symptoms == current
+            assert matches == (matcher.match_symptoms(current, top_n=top_n) if current else []), current
+            # Asking again without a change gives the same answer
+            assert session.matches() == matches
@@ -0,0 +1,51 @@
+# /tests/test_naive_bayes.py
+
+import pytest
+
+from src.assistant import HealthAssistant
+from src.symptom_matcher import SymptomMatcher
+
+@pytest.fixture(scope='module')
+def bayes_matcher(matcher_paths):
+    pytest.importorskip('numpy')
+    pytest.importorskip('scipy')
+    matcher = SymptomMatcher(**matcher_paths, ranking_mode='naive_bayes')
+    assert matcher._index.naive_bayes_scorer is not None
+    return matcher
+
+@pytest.mark.parametrize('top_n', [1, 5, 20])
+def test_ranking_follows_the_posterior(bayes_matcher, dataset, top_n):
+    index = bayes_matcher._index
+    for query in dataset['queries']:
+        results = bayes_matcher.match_symptoms(query, top_n=top_n)
+        if not results:
+            continue
+        probabilities, listed = index.naive_bayes_scorer.posterior(bayes_matcher.resolve_symptoms(query))
+        # Most probable first, ties in database order, over the diseases listing a matched symptom
+        expected = sorted((position for position in range(index.disease_count) if listed[position] > 0),
+                          key=lambda position: (-probabilities[position], position))[:top_n]
+        assert [result['position'] for result in results] == expected, query
+        for result in results:
+            assert result['posterior'] == pytest.approx(probabilities[result['position']])
+
+def test_match_scores_are_shares_of_the_returned_posterior(bayes_matcher, dataset):
+    for query in dataset['queries']:
+        results = bayes_matcher.match_symptoms(query, top_n=5)
+        if not results:
+            continue
+        scores = [result['match_score'] for result in results]
+        assert all(0.0 <= score <= 1.0 for score in scores)
+        assert scores == sorted(scores, reverse=True)
+        assert sum(scores) == pytest.approx(1.0, abs=1e-3)
+        # The best of the returned matches always holds at least an even share
+        assert scores[0] >= 1.0 / len(scores) - 1e-4
+        total_posterior = sum(result['posterior'] for result in results)
+        for result in results:
+            assert result['match_score'] == pytest.approx(result['posterior'] / total_posterior, abs=1e-4)
+
+def test_confidence_is_never_zero_for_the_top_match(bayes_matcher, dataset):
+    assistant = HealthAssistant(bayes_matcher)
+    for query in dataset['queries']:
+        results = assistant.diagnose(query)
+        if results:
+            assert results[0]['confidence'] != '0%', query
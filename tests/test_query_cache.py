@@ -0,0 +1,42 @@
+# /tests/test_query_cache.py
+
+import shutil
+
+import pytest
+
+from src.symptom_matcher import SymptomMatcher
+
+@pytest.fixture
+def cached_matcher(matcher_paths, tmp_path):
+    # A private copy of the data, so reloading never races another test
+    data_path = shutil.copy(matcher_paths['data_path'], tmp_path / 'diseases.csv')
+    return SymptomMatcher(**dict(matcher_paths, data_path=str(data_path)), cache_size=16)
+
+def two_symptom_query(dataset):
+    return next(query for query in dataset['queries'] if len(query) >= 2)
+
+def test_cache_key_ignores_case_whitespace_and_order(cached_matcher, dataset):
+    first, second = two_symptom_query(dataset)[:2]
+    expected = cached_matcher.match_symptoms([first, second])
+    assert cached_matcher.cache_stats()['misses'] == 1
+
+    for variant in ([f"  {first.upper()} ", second], [second.title(), f"{first}\t"], [first, second, first]):
+        assert cached_matcher.match_symptoms(variant) == expected, variant
+    stats = cached_matcher.cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (3, 1, 1)
+
+def test_cache_key_includes_top_n(cached_matcher, dataset):
+    query = two_symptom_query(dataset)
+    cached_matcher.match_symptoms(query, top_n=5)
+    cached_matcher.match_symptoms(query, top_n=3)
+    assert cached_matcher.cache_stats()['misses'] == 2
+
+def test_reload_clears_the_cache(cached_matcher, dataset):
+    query = two_symptom_query(dataset)
+    expected = cached_matcher.match_symptoms(query)
+    assert cached_matcher.cache_stats()['size'] == 1
+
+    assert cached_matcher.reload()
+    assert cached_matcher.cache_stats()['size'] == 0
+    assert cached_matcher.match_symptoms(query) == expected
+    assert cached_matcher.cache_stats()['misses'] == 2
@@ -0,0 +1,33 @@
+# /tests/test_registry.py
+
+import os
+
+import pytest
+
+from src.registry import _config_key, clear_registry, get_health_assistant, get_symptom_matcher
+from src.symptom_matcher import default_data_path
+
+@pytest.fixture
+def registry():
+    clear_registry()
+    yield
+    clear_registry()
+
+def test_default_arguments_share_a_key():
+    assert _config_key({}) == _config_key({'data_path': default_data_path('data_path')})
+    assert _config_key({}) == _config_key({'store_path': None, 'cache_size': 0, 'storage_backend': 'memory'})
+    assert _config_key({}) == _config_key({'index_path': os.path.relpath(default_data_path('index_path'))})
+    assert _config_key({}) != _config_key({'cache_size': 10})
+    assert _config_key({}) != _config_key({'typo_tolerance': 0})
+
+def test_default_arguments_share_a_matcher(registry, matcher_paths):
+    matcher = get_symptom_matcher(**matcher_paths)
+    assert get_symptom_matcher(**matcher_paths, cache_size=0, scoring_backend='python') is matcher
+    relative_paths = {name: os.path.relpath(path) for name, path in matcher_paths.items()}
+    assert get_symptom_matcher(**relative_paths) is matcher
+    assert get_symptom_matcher(**matcher_paths, cache_size=10) is not matcher
+    assert get_health_assistant(**matcher_paths, collect_metrics=False).matcher is matcher
+
+def test_unknown_argument_is_rejected(registry):
+    with pytest.raises(TypeError):
+        get_symptom_matcher(data_file='diseases.csv')
@@ -0,0 +1,76 @@
+# /tests/test_reload.py
+
+import os
+import shutil
+import threading
+
+import pytest
+
+from src.symptom_matcher import SymptomMatcher
+
+NEW_DISEASE = 'Zebra fever'
+NEW_SYMPTOM = 'zebra stripes'
+
+@pytest.fixture
+def data_path(matcher_paths, tmp_path):
+    # A private copy of the data, so the tests can change it
+    return shutil.copy(matcher_paths['data_path'], str(tmp_path / 'diseases.csv'))
+
+@pytest.fixture
+def matcher(matcher_paths, data_path):
+    return SymptomMatcher(**dict(matcher_paths, data_path=data_path))
+
+def add_new_disease(data_path):
+    with open(data_path, 'a', encoding='utf-8') as f:
+        f.write(f'{NEW_DISEASE},"{NEW_SYMPTOM}, zebra spots"\n')
+
+def test_reload_serves_the_new_data(matcher, data_path):
+    version = matcher._index.version
+    assert matcher.match_symptoms([NEW_SYMPTOM]) == []
+
+    add_new_disease(data_path)
+    assert matcher.reload()
+    assert matcher._index.version == version + 1
+    assert matcher.match_symptoms([NEW_SYMPTOM])[0]['disease'] == NEW_DISEASE
+
+def test_running_queries_finish_on_the_old_snapshot(matcher, data_path, monkeypatch):
+    resolving, release = threading.Event(), threading.Event()
+    resolve_with = matcher._resolve_with
+
+    def paused_resolve_with(index, user_symptoms):
+        resolving.set()
+        assert release.wait(10)
+        return resolve_with(index, user_symptoms)
+
+    monkeypatch.setattr(matcher, '_resolve_with', paused_resolve_with)
+    in_flight = []
+    query = threading.Thread(target=lambda: in_flight.append(matcher.match_symptoms([NEW_SYMPTOM])))
+    query.start()
+    assert resolving.wait(10)
+
+    # The query has taken its snapshot; the reload swaps in new data while it is paused
+    add_new_disease(data_path)
+    assert matcher.reload()
+    release.set()
+    query.join(10)
+
+    assert in_flight == [[]]
+    assert matcher.match_symptoms([NEW_SYMPTOM])[0]['disease'] == NEW_DISEASE
+
+def test_sessions_keep_the_snapshot_they_started_on(matcher, data_path):
+    session = matcher.start_session()
+    add_new_disease(data_path)
+    assert matcher.reload()
+
+    assert session.add(NEW_SYMPTOM) == []
+    assert matcher.start_session().add(NEW_SYMPTOM)[0]['disease'] == NEW_DISEASE
+
+def test_failed_reload_keeps_serving_the_old_data(matcher, data_path, dataset):
+    query = dataset['queries'][0]
+    expected = matcher.match_symptoms(query)
+    index = matcher._index
+
+    os.remove(data_path)
+    assert matcher.reload() is False
+    assert matcher._index is index
+    assert matcher.match_symptoms(query) == expected
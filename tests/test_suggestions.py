@@ -0,0 +1,66 @@
+# /tests/test_suggestions.py
+
+import pytest
+
+from src.symptom_matcher import SUGGESTION_CANDIDATES
+
+@pytest.fixture(autouse=True)
+def numpy():
+    return pytest.importorskip('numpy')
+
+def top_candidates(matcher, query):
+    return matcher.match_symptoms(query, top_n=SUGGESTION_CANDIDATES)
+
+def all_diseases(matcher):
+    return [{'position': position, 'match_score': 1.0} for position in range(matcher._index.disease_count)]
+
+@pytest.mark.parametrize('backend', ['memory_matcher', 'shared_matcher'])
+def test_in_memory_indexes_gather_rows_without_python_loops(request, monkeypatch, dataset, backend):
+    matcher = request.getfixturevalue(backend)
+    assert matcher._index.incidence_arrays() is not None
+    queries = dataset['queries'][:10]
+    candidates = [top_candidates(matcher, query) for query in queries] + [all_diseases(matcher)]
+
+    def read_row(position):
+        raise AssertionError("rows are gathered from the CSR arrays")
+    # Matching reads rows too, so only the suggestions run with row reads disabled
+    monkeypatch.setattr(matcher._index, 'known_symptom_ids', read_row)
+    for query, query_candidates in zip(queries + queries[:1], candidates):
+        assert matcher.suggest_symptoms(query, limit=3, candidates=query_candidates)
+
+def test_suggestions_agree_across_backends(memory_matcher, shared_matcher, sqlite_matcher, dataset):
+    assert sqlite_matcher._index.incidence_arrays() is None
+    for query in dataset['queries'][:20]:
+        expected = memory_matcher.suggest_symptoms(query, limit=3)
+        for matcher in (shared_matcher, sqlite_matcher):
+            actual = matcher.suggest_symptoms(query, limit=3)
+            assert [symptom for symptom, _ in actual] == [symptom for symptom, _ in expected], query
+            assert [gain for _, gain in actual] == pytest.approx([gain for _, gain in expected])
+
+def test_suggestion_over_top_candidates_is_fast(memory_matcher, dataset):
+    # A coarse guard against reintroducing per-row Python work; the benchmark tracks real latency
+    import time
+    queries = dataset['queries']
+    candidates = [top_candidates(memory_matcher, query) for query in queries]
+    start = time.perf_counter()
+    for query, query_candidates in zip(queries, candidates):
+        memory_matcher.suggest_symptoms(query, candidates=query_candidates)
+    assert (time.perf_counter() - start) / len(queries) < 0.02
+
+def test_rows_sharing_a_name_keep_their_own_symptoms(tmp_path):
+    from src.assistant import HealthAssistant
+    from src.symptom_matcher import SymptomMatcher
+    csv_path = tmp_path / 'diseases.csv'
+    csv_path.write_text('Disease,Symptoms\n'
+                        'Flu,"fever, cough"\n'
+                        'Flu,"rash, itching, swelling"\n'
+                        'Allergy,"rash, sneezing"\n')
+    matcher = SymptomMatcher(str(csv_path), drug_reference_path=str(tmp_path / 'missing.json'),
+                             index_path=str(tmp_path / 'missing.bin'),
+                             shared_index_path=str(tmp_path / 'missing.mmap'))
+    matches = matcher.match_symptoms(['rash'], top_n=5)
+    assert sorted(match['position'] for match in matches) == [1, 2]
+    # The second Flu row separates the candidates; the first one is not a candidate at all
+    assert matcher.suggest_symptoms(['rash'], limit=3) == matcher.suggest_symptoms(['rash'], limit=3, candidates=matches)
+    assert [symptom for symptom, _ in matcher.suggest_symptoms(['rash'], limit=3)] == ['itching', 'sneezing', 'swelling']
+    assert HealthAssistant(matcher).diagnose_with_follow_up(['rash'])[1] == 'Do you also have itching?'
@@ -0,0 +1,62 @@
+# /tests/test_tfidf_similarity.py
+
+import logging
+import sys
+
+import pytest
+
+from src.matcher_index import MATCH_THRESHOLD
+from src.symptom_matcher import SymptomMatcher
+
+# Misspelled beyond what the exact, substring and shared-word rules accept
+MISSPELLED = 'shortnes of breth'
+# Close to more known symptoms than one phrase may resolve to
+CRAMPS = 'stomak cramps'
+
+@pytest.fixture(scope='module')
+def tfidf_matcher(matcher_paths):
+    pytest.importorskip('sklearn')
+    matcher = SymptomMatcher(**matcher_paths, similarity_mode='tfidf')
+    assert matcher.similarity_mode == 'tfidf'
+    return matcher
+
+def test_resolves_phrases_the_rules_miss(tfidf_matcher, memory_matcher):
+    assert memory_matcher.resolve_symptoms([MISSPELLED]) == {MISSPELLED: []}
+    assert memory_matcher.match_symptoms([MISSPELLED]) == []
+
+    known, score = tfidf_matcher.resolve_symptoms([MISSPELLED])[MISSPELLED][0]
+    assert known == 'shortness of breath'
+    assert MATCH_THRESHOLD < score <= 1.0
+    matches = tfidf_matcher.match_symptoms([MISSPELLED])
+    assert matches and all(match['matching_symptoms'] == ['shortness of breath'] for match in matches)
+
+def test_rule_matches_are_kept(tfidf_matcher, memory_matcher, dataset):
+    for symptom in dataset['vocabulary'][:50]:
+        tfidf_scores = dict(tfidf_matcher.resolve_symptoms([symptom])[symptom])
+        for known, score in memory_matcher.resolve_symptoms([symptom])[symptom]:
+            assert tfidf_scores[known] >= score, (symptom, known)
+
+def test_matches_per_phrase_are_capped(tfidf_matcher):
+    from src.tfidf_similarity import MAX_TFIDF_MATCHES
+    index = tfidf_matcher._index
+    similar = index.tfidf_scorer.similar(CRAMPS, MATCH_THRESHOLD, limit=len(index.vocabulary))
+    assert len(similar) > MAX_TFIDF_MATCHES
+
+    resolved = tfidf_matcher.resolve_symptoms([CRAMPS])[CRAMPS]
+    assert resolved == similar[:MAX_TFIDF_MATCHES]
+
+def test_falls_back_to_rules_without_scikit_learn(matcher_paths, memory_matcher, dataset, monkeypatch, caplog):
+    # A None entry makes the import raise ImportError, as if scikit-learn were not installed
+    for module in ('sklearn', 'sklearn.feature_extraction.text'):
+        monkeypatch.setitem(sys.modules, module, None)
+    monkeypatch.delitem(sys.modules, 'src.tfidf_similarity', raising=False)
+
+    with caplog.at_level(logging.WARNING, logger='src.matcher_index'):
+        matcher = SymptomMatcher(**matcher_paths, similarity_mode='tfidf')
+    assert matcher.similarity_mode == 'rules'
+    assert matcher._index.tfidf_scorer is None
+    assert any('TF-IDF similarity unavailable' in record.getMessage() for record in caplog.records)
+
+    assert matcher.resolve_symptoms([MISSPELLED]) == {MISSPELLED: []}
+    for query in dataset['queries'][:20]:
+        assert matcher.match_symptoms(query) == memory_matcher.match_symptoms(query)
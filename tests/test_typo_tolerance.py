@@ -0,0 +1,53 @@
+# /tests/test_typo_tolerance.py
+
+import pytest
+
+from src.registry import clear_registry, get_symptom_matcher
+from src.symptom_matcher import SymptomMatcher
+from src.typo_index import MAX_EDIT_DISTANCE
+
+@pytest.fixture(scope='module')
+def typo_matcher(matcher_paths):
+    return SymptomMatcher(**matcher_paths, typo_tolerance=MAX_EDIT_DISTANCE)
+
+@pytest.fixture
+def registry():
+    clear_registry()
+    yield
+    clear_registry()
+
+def misspelled_vocabulary(dataset, count=40):
+    """Known symptoms with a word long enough to stay correctable once misspelled."""
+    symptoms = [symptom for symptom in dataset['vocabulary'] if max(map(len, symptom.split())) >= 6]
+    return symptoms[:count]
+
+def misspell(symptom):
+    # Drop one letter of the longest word, which is long enough to be corrected
+    word = max(symptom.split(), key=len)
+    return symptom.replace(word, word[:2] + word[3:], 1)
+
+def test_corrected_phrase_scores_below_exact_match(typo_matcher, dataset):
+    index = typo_matcher._index
+    for symptom in misspelled_vocabulary(dataset):
+        assert index.resolve_symptom(symptom)[0] == (symptom, 1.0)
+        typo = misspell(symptom)
+        scores = dict(index.resolve_symptom(typo))
+        assert symptom in scores, typo
+        assert 0.5 < scores[symptom] < 1.0, typo
+
+def test_typo_never_outranks_exact_match(typo_matcher, dataset):
+    for symptom in misspelled_vocabulary(dataset):
+        exact = {match['disease']: match['match_score'] for match in typo_matcher.match_symptoms([symptom], top_n=50)}
+        corrected = {match['disease']: match['match_score']
+                     for match in typo_matcher.match_symptoms([misspell(symptom)], top_n=50)}
+        for disease, score in corrected.items():
+            assert score <= exact.get(disease, 1.0), symptom
+
+def test_shared_matchers_correct_typos_by_default(registry, matcher_paths):
+    assert get_symptom_matcher(**matcher_paths).typo_tolerance == MAX_EDIT_DISTANCE
+    assert get_symptom_matcher(**matcher_paths, typo_tolerance=0).typo_tolerance == 0
+
+@pytest.mark.parametrize('typo_tolerance', [-1, MAX_EDIT_DISTANCE + 1, 10])
+def test_typo_tolerance_out_of_range_is_rejected(matcher_paths, typo_tolerance):
+    with pytest.raises(ValueError):
+        SymptomMatcher(**matcher_paths, typo_tolerance=typo_tolerance)
@@ -46,7 +46,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from src.assistant import HealthAssistant
+from src.registry import get_health_assistant
 
 def inject_now():
     return {'now': datetime.now(timezone.utc).isoformat()}
@@ -165,7 +165,8 @@ def logout():
     flash('You were successfully logged out', 'success')
     return redirect(url_for('home'))
 
-assistant = HealthAssistant()
+# Shared with the voice assistant and diagnosis engine, so the data is loaded once per process
+assistant = get_health_assistant()
 
 # Voice Assistant Process Management
 voice_process = None
@@ -374,7 +375,7 @@ def home():
     logger.info("Rendered home page")
     return response
 
-def format_diagnosis_response(results, symptoms, csrf_token, error=None, status_code=200):
+def format_diagnosis_response(results, symptoms, csrf_token, error=None, status_code=200, follow_up=None):
     """Format the diagnosis response as JSON."""
     if results is None and error is None:
         return jsonify({
@@ -426,6 +427,7 @@ def format_diagnosis_response(results, symptoms, csrf_token, error=None, status_
     response = {
         'results': formatted_results,
         'symptoms': symptoms,
+        'follow_up_question': follow_up,
         'csrf_token': csrf_token,
         'success': True,
         'error': None,
@@ -538,8 +540,9 @@ def diagnose():
         logger.info(f"Processing symptoms: {user_symptoms}")
         
         try:
-            # Generate diagnosis results
-            results = assistant.diagnose(user_symptoms)
+            # Generate diagnosis results and suggest the symptom that best separates
+            # the likely conditions, both from one ranking
+            results, follow_up = assistant.diagnose_with_follow_up(user_symptoms)
             logger.debug(f"Diagnosis results: {results}")
             
             # Generate a new CSRF token for the next request
@@ -550,7 +553,8 @@ def diagnose():
                 return format_diagnosis_response(
                     results,
                     raw_symptoms,
-                    new_csrf_token
+                    new_csrf_token,
+                    follow_up=follow_up
                 )
             else:
                 return render_template("diagnose.html", 